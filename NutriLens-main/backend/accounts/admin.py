@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, IntakeRecord, DailyHistory, IntakeImage
+from .models import CustomUser, IntakeRecord, DailyHistory, IntakeImage, ImageBlob, ImageRecognition, EvaluationJob, UploadSession, HistoryRollup, EvaluationFlight, ProfileSnapshot
 
 class CustomUserAdmin(UserAdmin):
     model = CustomUser
@@ -32,25 +32,21 @@ class DailyHistoryAdmin(admin.ModelAdmin):
     readonly_fields = (
         'user', 'date', 'total_intake_text',
         'score_macro', 'reason_macro', 'advice_macro',
+        'carbs_g', 'protein_g', 'fat_g', 'last_record_id', 'incremental_steps',
         'score_disease', 'reason_disease', 'advice_disease',
         'score_goal', 'reason_goal', 'advice_goal',
-        'total_grade',
-        'gender', 'age', 'height', 'weight', 'diet_goal',
-        'has_diabetes', 'has_hypertension', 'has_hyperlipidemia',
-        'has_anemia', 'has_obesity', 'has_metabolic_syndrome',
-        'has_gout', 'has_hyperhomocysteinemia', 'has_ibs',
-        'has_gastritis_or_ulcer', 'has_constipation', 'has_fatty_liver'
+        'total_grade', 'profile',
     )
 
     fieldsets = (
         ('기본 정보', {
-            'fields': ('user', 'date', 'total_grade')
+            'fields': ('user', 'date', 'total_grade', 'last_record_id', 'incremental_steps')
         }),
         ('총 섭취 내용', {
             'fields': ('total_intake_text',)
         }),
         ('Macro 평가', {
-            'fields': ('score_macro', 'reason_macro', 'advice_macro')
+            'fields': ('score_macro', 'reason_macro', 'advice_macro', 'carbs_g', 'protein_g', 'fat_g')
         }),
         ('Disease 평가', {
             'fields': ('score_disease', 'reason_disease', 'advice_disease')
@@ -59,18 +55,16 @@ class DailyHistoryAdmin(admin.ModelAdmin):
             'fields': ('score_goal', 'reason_goal', 'advice_goal')
         }),
         ('사용자 프로필 스냅샷', {
-            'fields': ('gender', 'age', 'height', 'weight', 'diet_goal')
-        }),
-        ('질병 상태 스냅샷', {
-            'fields': (
-                'has_diabetes', 'has_hypertension', 'has_hyperlipidemia',
-                'has_anemia', 'has_obesity', 'has_metabolic_syndrome',
-                'has_gout', 'has_hyperhomocysteinemia', 'has_ibs',
-                'has_gastritis_or_ulcer', 'has_constipation', 'has_fatty_liver'
-            )
+            'fields': ('profile',)
         }),
     )
 
+@admin.register(ProfileSnapshot)
+class ProfileSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('id', 'gender', 'age', 'height', 'weight', 'diet_goal', 'digest')
+    list_filter = ('gender', 'diet_goal')
+    readonly_fields = ('digest',) + ProfileSnapshot.FIELDS
+
 
 
 admin.site.register(CustomUser, CustomUserAdmin)
@@ -78,6 +72,46 @@ admin.site.register(IntakeRecord)
 
 @admin.register(IntakeImage)
 class IntakeImageAdmin(admin.ModelAdmin):
-    list_display = ('user', 'date', 'created_at', 'image', 'note')
+    list_display = ('user', 'date', 'created_at', 'image', 'blob', 'note')
     list_filter = ('date',)
-    search_fields = ('user__username', 'note')
\ No newline at end of file
+    search_fields = ('user__username', 'note')
+    raw_id_fields = ('blob',)
+
+@admin.register(ImageBlob)
+class ImageBlobAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'file', 'size', 'ref_count', 'status', 'width', 'height', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('sha256',)
+    readonly_fields = ('sha256', 'file', 'size', 'ref_count', 'width', 'height', 'derivatives', 'error',
+                       'created_at', 'claimed_at', 'processed_at', 'phash', 'dhash')
+    raw_id_fields = ('recognition',)
+
+@admin.register(ImageRecognition)
+class ImageRecognitionAdmin(admin.ModelAdmin):
+    list_display = ('phash', 'model', 'hits', 'total_tokens', 'created_at')
+    search_fields = ('phash',)
+    readonly_fields = ('phash', 'band0', 'band1', 'band2', 'band3', 'model', 'latency_ms', 'total_tokens',
+                       'hits', 'created_at')
+
+@admin.register(EvaluationJob)
+class EvaluationJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'date', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'date')
+    search_fields = ('user__username',)
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'filename', 'received', 'size', 'status', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('user__username', 'filename')
+
+@admin.register(HistoryRollup)
+class HistoryRollupAdmin(admin.ModelAdmin):
+    list_display = ('user', 'period', 'start', 'days', 'score_macro_sum', 'score_disease_sum', 'score_goal_sum', 'updated_at')
+    list_filter = ('period',)
+    search_fields = ('user__username',)
+
+@admin.register(EvaluationFlight)
+class EvaluationFlightAdmin(admin.ModelAdmin):
+    list_display = ('user', 'date', 'owner', 'started_at', 'expires_at')
+    search_fields = ('user__username',)
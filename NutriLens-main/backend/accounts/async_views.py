@@ -0,0 +1,176 @@
+"""
+ASGI(backend.asgi)에서 스레드를 잡지 않고 기다리는 async 뷰
+- DRF는 async 뷰를 지원하지 않으므로 Django async 뷰 + async_api_view로 인증/파싱/렌더링만 DRF와 맞춤
+- WSGI에서도 그대로 동작 (Django가 요청마다 이벤트 루프에서 실행)
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from . import metrics
+from .evaluation import EvaluationError, NoIntakeRecords, aevaluate_day, evaluation_payload
+from .imaging import image_payload
+from .models import IntakeRecord, business_date
+from .uploads import UploadError, create_images, store_files
+
+
+def _prepare(request):
+    # 인증 + 본문 파싱(멀티파트는 임시 파일 쓰기) — 둘 다 동기 코드라 스레드에서 한 번에
+    if not request.user.is_authenticated:
+        raise exceptions.NotAuthenticated()
+    request.data
+
+
+def _exception_response(request, exc):
+    # APIView.handle_exception과 같은 규칙: 인증 헤더를 줄 수 있으면 401, 아니면 403
+    headers = {}
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        authenticator = request.authenticators[0] if request.authenticators else None
+        header = getattr(authenticator, 'authenticate_header', lambda request: None)(request)
+        if header:
+            headers['WWW-Authenticate'] = header
+        else:
+            exc.status_code = status.HTTP_403_FORBIDDEN
+    return Response({'detail': exc.detail}, status=exc.status_code, headers=headers)
+
+
+def async_api_view(http_method_names):
+    """
+    DRF @api_view의 async 버전 — 뷰는 DRF Request를 받아 Response를 반환
+    - 인증은 DEFAULT_AUTHENTICATION_CLASSES, 로그인 필수 (IsAuthenticated)
+    - APIClient.force_authenticate도 DRF Request가 그대로 처리
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            drf_request = Request(
+                request,
+                parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+                authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+            )
+            if request.method not in http_method_names:
+                response = _exception_response(drf_request, exceptions.MethodNotAllowed(request.method))
+            else:
+                try:
+                    await sync_to_async(_prepare)(drf_request)
+                    response = await view(drf_request, *args, **kwargs)
+                except exceptions.APIException as exc:
+                    response = _exception_response(drf_request, exc)
+            # 렌더링은 Django가 응답을 돌려주기 전에 (DRF Response는 TemplateResponse 계열)
+            response.accepted_renderer = JSONRenderer()
+            response.accepted_media_type = JSONRenderer.media_type
+            response.renderer_context = {'request': drf_request, 'response': response}
+            return response
+
+        wrapper.csrf_exempt = True  # 토큰 인증만 사용 (DRF APIView와 동일)
+        return wrapper
+    return decorator
+
+
+@async_api_view(['POST'])
+async def evaluate_now(request):
+    """
+    evaluate/ 와 달리 대기열 없이 바로 평가해 결과 반환 (ASGI용)
+    - GPT 응답을 기다리는 동안 스레드를 잡지 않으므로 프로세스 하나가 많은 평가를 동시에 기다릴 수 있음
+    - WSGI로 띄우면 요청마다 스레드를 잡으므로 evaluate/ (run_eval_worker)를 사용
+    """
+    target_date = business_date()
+    try:
+        history, raw_answer = await aevaluate_day(request.user, target_date)
+    except NoIntakeRecords as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except EvaluationError as e:
+        return Response(
+            {'error': 'Failed to evaluate daily intake', 'detail': e.detail, 'raw': e.raw},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+    return Response(evaluation_payload(history, raw_answer))
+
+
+@transaction.atomic
+def _save_upload(user, stored, note, diet_date, record_text):
+    images = create_images(user, stored, note, diet_date)
+    record = IntakeRecord.objects.create(user=user, content=record_text, date=diet_date)
+    return [image_payload(image) for image in images], record
+
+
+def _record_payload(record):
+    return {
+        'id': record.id,
+        'content': record.content,
+        'date': record.date.isoformat(),
+    }
+
+
+@async_api_view(['POST'])
+async def image_analyze(request):
+    """
+    이미지 업로드 전용(텍스트는 선택적 note)
+    - 프런트: images (여러개), note(옵션)
+    - 응답: ingested_count, images[], record
+    - 디코딩/썸네일 생성은 run_image_worker가 처리 (images[].status가 ready가 되면 derivatives에 URL)
+    """
+    files = request.FILES.getlist('images')
+    note = request.data.get('note', '').strip()
+
+    if not files:
+        return Response({'error': 'No images uploaded.'}, status=400)
+
+    diet_date = business_date()
+
+    metrics.record_upload('multipart', [f.size for f in files])
+
+    # 파일 쓰기는 DB를 쓰지 않으므로 공용 동기 스레드 밖에서, 행은 한 트랜잭션에서 bulk_create
+    stored = await sync_to_async(store_files, thread_sensitive=False)(files)
+    record_text = f"[Image] {len(stored)} image(s) uploaded." + (f" Note: {note}" if note else "")
+    try:
+        saved_images, record = await sync_to_async(_save_upload)(request.user, stored, note, diet_date, record_text)
+    except UploadError as e:
+        return Response({'error': str(e)}, status=e.status)
+
+    return Response({
+        'ingested_count': len(saved_images),
+        'images': saved_images,
+        'record': _record_payload(record),
+    }, status=200)
+
+
+@async_api_view(['POST'])
+async def hybrid_analyze(request):
+    """
+    하이브리드(텍스트 + 이미지)
+    - 프런트: images (0개 이상), text(옵션)
+    - 응답: images[], record
+    """
+    files = request.FILES.getlist('images')
+    text = request.data.get('text', '').strip()
+    diet_date = business_date()
+
+    if files:
+        metrics.record_upload('multipart', [f.size for f in files])
+    stored = await sync_to_async(store_files, thread_sensitive=False)(files) if files else []
+
+    # 텍스트/이미지 내용을 IntakeRecord에 합쳐 기록
+    parts = []
+    if text:
+        parts.append(f"Text: {text}")
+    if stored:
+        parts.append(f"Images: {len(stored)} uploaded")
+    record_text = "[Hybrid] " + " | ".join(parts) if parts else "[Hybrid] (no content)"
+
+    # 하이브리드에서는 업로드 시 텍스트를 note로도 남김
+    try:
+        saved_images, record = await sync_to_async(_save_upload)(request.user, stored, text, diet_date, record_text)
+    except UploadError as e:
+        return Response({'error': str(e)}, status=e.status)
+
+    return Response({
+        'images': saved_images,
+        'record': _record_payload(record),
+    }, status=200)
@@ -0,0 +1,92 @@
+"""
+토큰 인증 결과 캐시 — 요청마다 Token + CustomUser 조인 조회를 하지 않도록
+- 토큰 → (사용자, 토큰 발급 시각)을 'auth' 캐시(settings.CACHES)에 AUTH_TOKEN_CACHE_TTL 동안 캐시
+- 로그아웃/토큰 삭제, 사용자 저장(비밀번호·프로필·활성 상태 변경 등) 때 signals에서 무효화
+  'auth' 캐시는 프로세스 간에 공유되는 백엔드여야 함 (다른 워커의 로그아웃도 바로 반영, 아니면 system check 오류)
+  시그널 없이 바꾼 행(QuerySet.update, 직접 SQL)은 TTL이 지나야 반영
+- AUTH_TOKEN_TTL(초)을 설정하면 발급 후 그 시간이 지난 토큰은 거부하고 삭제
+"""
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.connection import ConnectionProxy
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+AUTH_CACHE_ALIAS = 'auth'
+auth_cache = ConnectionProxy(caches, AUTH_CACHE_ALIAS)
+
+
+@checks.register(checks.Tags.caches)
+def check_auth_cache(app_configs, **kwargs):
+    # 프로세스별 캐시면 다른 워커에서 로그아웃/비활성화해도 이 워커는 TTL 동안 계속 인증
+    if isinstance(caches[AUTH_CACHE_ALIAS], LocMemCache):
+        return [checks.Error(
+            f"CACHES['{AUTH_CACHE_ALIAS}'] must be shared between processes (not LocMemCache).",
+            hint='Use FileBasedCache, RedisCache or PyMemcacheCache.',
+            id='accounts.E001',
+        )]
+    return []
+
+
+def _token_cache_key(key):
+    # 캐시 백엔드에 토큰 원문을 남기지 않음
+    return f'auth:token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def _user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def token_expired(created):
+    ttl = settings.AUTH_TOKEN_TTL
+    return ttl is not None and created < timezone.now() - timezone.timedelta(seconds=ttl)
+
+
+def _delete_cached(user_id):
+    token_key = auth_cache.get(_user_cache_key(user_id))
+    if token_key is not None:
+        auth_cache.delete_many([token_key, _user_cache_key(user_id)])
+
+
+def invalidate_user(user_id):
+    """사용자의 캐시된 토큰 인증 결과 삭제 — 지금, 그리고 커밋 후 한 번 더"""
+    # 커밋 전 다른 요청이 이전 행을 읽어 다시 캐시했을 수 있음
+    _delete_cached(user_id)
+    transaction.on_commit(partial(_delete_cached, user_id))
+
+
+def issue_token(user):
+    """로그인 시 토큰 발급 — 기존 토큰이 있으면 재사용, 만료됐으면 새로 발급"""
+    token, created = Token.objects.get_or_create(user=user)
+    if not created and token_expired(token.created):
+        token.delete()
+        token = Token.objects.create(user=user)
+    return token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication과 같은 헤더(Authorization: Token <key>), 검증 결과만 캐시"""
+
+    def authenticate_credentials(self, key):
+        cache_key = _token_cache_key(key)
+        cached = auth_cache.get(cache_key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            cached = (user, token.created)
+            auth_cache.set_many({cache_key: cached, _user_cache_key(user.pk): cache_key},
+                                settings.AUTH_TOKEN_CACHE_TTL)
+
+        user, created = cached
+        if token_expired(created):
+            Token.objects.filter(key=key).delete()  # post_delete에서 캐시도 삭제
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        # request.auth는 TokenAuthentication과 같은 Token 인스턴스 (캐시 적중 시 조회 없이 구성)
+        return user, Token(key=key, user=user, created=created)
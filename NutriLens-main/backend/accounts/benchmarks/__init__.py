@@ -0,0 +1,57 @@
+"""
+성능 벤치마크 모음 — python manage.py benchmark <name> [옵션]
+
+각 모듈은 add_arguments(parser)와 run(stdout, options)을 제공한다.
+실제 DB를 건드리지 않도록 임시 테스트 DB(isolated_database)에서 실행한다.
+"""
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def isolated_database(test_name=None):
+    """
+    마이그레이션까지 적용된 임시 테스트 DB를 만들고 끝나면 삭제
+    - test_name: 테스트 DB 이름 (SQLite 파일 경로 등, 기본은 설정값 — SQLite면 메모리 DB)
+    """
+    old_name = connection.settings_dict['NAME']
+    old_test_name = connection.settings_dict['TEST'].get('NAME')
+    if test_name:
+        connection.settings_dict['TEST']['NAME'] = test_name
+    try:
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield connection
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    finally:
+        connection.settings_dict['TEST']['NAME'] = old_test_name
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def measure(fn, repeat):
+    """fn을 repeat번 실행한 소요 시간(ms) 목록"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def summarize(samples):
+    return {
+        'mean_ms': round(statistics.fmean(samples), 3) if samples else 0.0,
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+    }
@@ -0,0 +1,132 @@
+"""
+동시 평가 처리 — WSGI 스레드 풀 vs ASGI (evaluate/now/, async LLM 클라이언트)
+
+python manage.py benchmark async_evaluate --evaluations 200 --latency 1.0 --threads 8
+
+- 가짜 LLM 백엔드(응답 지연 --latency초), 평가 결과 캐시는 끔 — 모든 요청이 GPT 응답을 기다림
+- Before: Django 테스트 Client(WSGI 핸들러)를 --threads개 스레드에서 (gunicorn gthread 워커 하나와 같은 구조)
+- After: AsyncClient(ASGI 핸들러)로 모든 요청을 이벤트 루프 하나에서 동시에
+- 두 경우 모두 사용자를 따로 만들어 같은 조건 (사용자마다 오늘 기록 1개, 평가 기록 없음)
+- 응답 시간은 요청이 한꺼번에 도착했다고 보고 시작 시점부터 (스레드를 기다린 시간 포함)
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from accounts.benchmarks import isolated_database, summarize
+from accounts.models import CustomUser, IntakeRecord, business_date
+
+
+def add_arguments(parser):
+    parser.add_argument('--evaluations', type=int, default=200, help='동시 평가 요청 수')
+    parser.add_argument('--latency', type=float, default=1.0, help='가짜 LLM 응답 지연(초)')
+    parser.add_argument('--threads', type=int, default=8, help='Before(WSGI) 요청 처리 스레드 수')
+
+
+def _seed(prefix, count):
+    users = CustomUser.objects.bulk_create([
+        CustomUser(username=f'{prefix}{n}', name='bench', gender='F', age=30, height=160, weight=55,
+                   diet_goal='maintain')
+        for n in range(count)
+    ])
+    today = business_date()
+    IntakeRecord.objects.bulk_create([
+        IntakeRecord(user=user, content=f'아침: 현미밥, 된장국 ({user.username})', date=today) for user in users
+    ])
+    return [token.key for token in Token.objects.bulk_create([
+        Token(key=Token.generate_key(), user=user) for user in users
+    ])]
+
+
+class ThreadPeak:
+    """실행 중 프로세스 스레드 수의 최댓값 (10ms 간격 측정)"""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._done.wait(0.01):
+            self.peak = max(self.peak, threading.active_count() - 1)  # 측정 스레드 제외
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+
+
+def _wsgi_request(path, token, started):
+    response = Client().post(path, HTTP_AUTHORIZATION=f'Token {token}')
+    connections.close_all()  # request_finished처럼 스레드의 연결 정리
+    return response.status_code, (time.perf_counter() - started) * 1000
+
+
+def _run_wsgi(path, tokens, threads):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(lambda token: _wsgi_request(path, token, started), tokens))
+
+
+async def _run_asgi(path, tokens):
+    client = AsyncClient()
+    started = time.perf_counter()
+
+    async def request(token):
+        response = await client.post(path, headers={'Authorization': f'Token {token}'})
+        return response.status_code, (time.perf_counter() - started) * 1000
+
+    try:
+        return await asyncio.gather(*(request(token) for token in tokens))
+    finally:
+        await sync_to_async(connections.close_all)()
+
+
+def _report(stdout, title, run):
+    with ThreadPeak() as threads:
+        started = time.perf_counter()
+        results = run()
+        elapsed = time.perf_counter() - started
+    latencies = [ms for _, ms in results]
+    errors = sum(code != 200 for code, _ in results)
+    stats = summarize(latencies)
+    stdout.write(
+        f'[{title}] {elapsed:.2f}s, {len(results) / elapsed:.1f} evaluations/s, {errors} errors, '
+        f'p50 {stats["p50_ms"]:.0f}ms, p95 {stats["p95_ms"]:.0f}ms, peak {threads.peak} threads'
+    )
+
+
+def run(stdout, options):
+    work_dir = tempfile.mkdtemp(prefix='async-eval-bench-')
+    try:
+        # 스레드/이벤트 루프 양쪽에서 같은 DB를 보도록 파일 DB
+        with isolated_database(os.path.join(work_dir, 'bench.sqlite3')), override_settings(
+            LLM_BACKEND='fake', LLM_FAKE_LATENCY=options['latency'], EVAL_CACHE_ENABLED=False,
+            ALLOWED_HOSTS=['testserver'],
+        ):
+            cache.clear()
+            path = reverse('evaluate-now')
+            count = options['evaluations']
+            wsgi_tokens, asgi_tokens = _seed('wsgi', count), _seed('asgi', count)
+            connections.close_all()
+            stdout.write(f"{count} concurrent evaluations, LLM latency {options['latency']}s")
+            _report(stdout, f"Before (WSGI, {options['threads']} threads)",
+                    lambda: _run_wsgi(path, wsgi_tokens, options['threads']))
+            _report(stdout, 'After (ASGI, async views)', lambda: asyncio.run(_run_asgi(path, asgi_tokens)))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,304 @@
+"""
+주요 API 엔드포인트 부하 측정 — register/login/chat/image-analyze/hybrid-analyze/evaluate/history
+
+python manage.py benchmark endpoints                        # Django 테스트 클라이언트 + 임시 DB (가짜 LLM)
+python manage.py benchmark endpoints --save-baseline bench.json
+python manage.py benchmark endpoints --baseline bench.json  # p95/쿼리 수가 기준보다 나빠지면 실패
+
+LLM_BACKEND=fake python manage.py runserver                 # (또는 gunicorn backend.wsgi -w 4)
+python manage.py benchmark endpoints --mode http --url http://127.0.0.1:8000 --concurrency 16
+
+- client: 요청을 순서대로 보내고 요청당 SQL 수까지 기록, 사용자/기록/평가 이력을 bulk_create로 미리 채움
+- http: 실행 중인 서버에 동시 요청 (사용자는 API로 가입시키므로 대상 서버 DB에 bench-* 계정, MEDIA_ROOT에 업로드 사진이 남음)
+- evaluate는 evaluate/stream/ (모델 호출까지 요청 안에서 끝나는 경로), 서버의 LLM_BACKEND=fake 필요
+"""
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from accounts import synthetic
+from accounts.benchmarks import isolated_database, summarize
+from accounts.models import CustomUser
+
+SCENARIOS = ['register', 'login', 'chat', 'image_analyze', 'hybrid_analyze', 'evaluate', 'history']
+PASSWORD = 'bench-pass-1234'
+FOODS = [
+    '현미밥 한 공기', '된장찌개', '닭가슴살 샐러드', '김치볶음밥', '아메리카노', '바나나 1개', '삼겹살 200g',
+    '비빔밥', '라면 1봉지', '그릭요거트', '연어 스테이크', '떡볶이', '오트밀 우유', '고구마 2개', '멀티비타민',
+]
+
+
+def add_arguments(parser):
+    parser.add_argument('--mode', choices=['client', 'http'], default='client')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='http 모드 대상 서버')
+    parser.add_argument('--requests', type=int, default=100, help='시나리오당 요청 수')
+    parser.add_argument('--concurrency', type=int, default=8, help='http 모드 동시 요청 수')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--days', type=int, default=90, help='client 모드에서 사용자별로 미리 채울 합성 데이터 기간(일)')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, dest='scenarios',
+                        help='이 시나리오만 (여러 번 지정 가능, 기본 전체)')
+    parser.add_argument('--database', choices=['memory', 'file'], default='memory', help='client 모드 SQLite 종류')
+    parser.add_argument('--baseline', help='비교할 기준 결과(JSON) — 회귀가 있으면 실패')
+    parser.add_argument('--save-baseline', help='이번 결과를 기준으로 저장할 경로')
+    parser.add_argument('--threshold', type=float, default=20.0, help='p95 허용 악화율(%%)')
+    parser.add_argument('--seed', type=int, default=21)
+
+
+def _photo(seed, size=(640, 480)):
+    # 그라데이션 + 잡음 JPEG (실제 사진과 비슷한 크기/압축률)
+    from PIL import Image
+    rng = random.Random(seed)
+    image = Image.linear_gradient('L').resize(size).convert('RGB')
+    image = Image.blend(image, Image.effect_noise(size, 40).convert('RGB'), 0.3)
+    out = io.BytesIO()
+    image.rotate(rng.randint(0, 359)).save(out, 'JPEG', quality=85)
+    return out.getvalue()
+
+
+class Scenarios:
+    """시나리오별 i번째 요청 → (method, path, 인증 토큰, json, 파일 목록)"""
+
+    def __init__(self, users, prefix, seed):
+        self.users = users  # [(username, token)]
+        self.prefix = prefix
+        self.rng = random.Random(seed)
+        self.photos = [_photo(seed + n) for n in range(4)]
+
+    def user(self, i):
+        return self.users[i % len(self.users)]
+
+    def food(self):
+        return self.rng.choice(FOODS)
+
+    def register(self, i):
+        return 'POST', '/api/accounts/register/', None, {
+            'username': f'{self.prefix}-reg{i}', 'password': PASSWORD, 'password2': PASSWORD, 'name': 'bench',
+            'gender': 'F', 'age': 30, 'height': 165, 'weight': 58, 'diet_goal': 'maintain',
+        }, None
+
+    def login(self, i):
+        return 'POST', '/api/accounts/login/', None, {'username': self.user(i)[0], 'password': PASSWORD}, None
+
+    def chat(self, i):
+        return 'POST', '/api/accounts/chat/', self.user(i)[1], {'content': self.food()}, None
+
+    def image_analyze(self, i):
+        photo = self.photos[i % len(self.photos)]
+        return 'POST', '/api/accounts/image-analyze/', self.user(i)[1], {'note': self.food()}, [photo]
+
+    def hybrid_analyze(self, i):
+        photo = self.photos[i % len(self.photos)]
+        return 'POST', '/api/accounts/hybrid-analyze/', self.user(i)[1], {'text': self.food()}, [photo]
+
+    def evaluate(self, i):
+        return 'POST', '/api/accounts/evaluate/stream/', self.user(i)[1], None, None
+
+    def history(self, i):
+        return 'GET', '/api/accounts/history/?page_size=10', self.user(i)[1], None, None
+
+
+# --- Django 테스트 클라이언트 ---
+
+def _seed_database(options):
+    """사용자 + 토큰 + 사용자별 최대 days일치 합성 기록/평가 이력 (accounts.synthetic, 주/월 집계 포함)"""
+    _, user_ids = synthetic.populate(options['users'], days=options['days'], seed=options['seed'], prefix='bench',
+                                     password=make_password(PASSWORD), image_variants=0)
+    users = CustomUser.objects.filter(pk__in=user_ids).order_by('pk')
+    tokens = Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in users])
+    return [(user.username, token.key) for user, token in zip(users, tokens)]
+
+
+def _run_client(scenarios, name, options):
+    build = getattr(scenarios, name)
+    client = APIClient()
+    samples, queries, errors = [], 0, 0
+    started = time.perf_counter()
+    for i in range(options['requests']):
+        method, path, token, data, files = build(i)
+        client.credentials(**({'HTTP_AUTHORIZATION': f'Token {token}'} if token else {}))
+        if files:
+            data = dict(data, images=[io.BytesIO(photo) for photo in files])
+            for n, fp in enumerate(data['images']):
+                fp.name = f'meal{n}.jpg'
+        with CaptureQueriesContext(connection) as captured:
+            request_started = time.perf_counter()
+            if method == 'GET':
+                response = client.get(path)
+            else:
+                response = client.post(path, data, format='multipart' if files else 'json')
+            if response.streaming:
+                b''.join(response.streaming_content)
+                response.close()
+            samples.append((time.perf_counter() - request_started) * 1000)
+        queries += len(captured)
+        errors += response.status_code >= 400
+    elapsed = time.perf_counter() - started
+    return samples, elapsed, errors, queries / max(options['requests'], 1)
+
+
+def _client_mode(options, stdout):
+    work_dir = tempfile.mkdtemp(prefix='endpoint_bench')
+    test_name = os.path.join(work_dir, 'bench.sqlite3') if options['database'] == 'file' else None
+    try:
+        with isolated_database(test_name), override_settings(
+            LLM_BACKEND='fake', MEDIA_ROOT=os.path.join(work_dir, 'media'),
+            UPLOAD_TEMP_DIR=os.path.join(work_dir, 'upload_tmp'), ALLOWED_HOSTS=['testserver'],
+        ):
+            cache.clear()
+            users = _seed_database(options)
+            stdout.write(f'Seeded {len(users)} users x {options["days"]} days ({options["database"]} SQLite)')
+            scenarios = Scenarios(users, 'bench', options['seed'])
+            return {name: _result(*_run_client(scenarios, name, options)) for name in options['scenarios']}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# --- 실행 중인 서버에 HTTP 동시 요청 ---
+
+def _http_request(session, base_url, spec):
+    method, path, token, data, files = spec
+    headers = {'Authorization': f'Token {token}'} if token else {}
+    kwargs = {'headers': headers, 'timeout': 120}
+    if files:
+        kwargs.update(data=data, files=[('images', (f'meal{n}.jpg', photo, 'image/jpeg')) for n, photo in enumerate(files)])
+    elif data is not None:
+        kwargs['json'] = data
+    started = time.perf_counter()
+    try:
+        response = session.request(method, base_url + path, **kwargs)
+        response.content  # 스트리밍 응답은 끝까지 받기
+        ok = response.status_code < 400
+    except requests.RequestException:
+        ok = False
+    return (time.perf_counter() - started) * 1000, ok
+
+
+def _http_users(base_url, options, prefix):
+    # 가입 → 로그인으로 토큰 확보, 최근 며칠 기록을 chat/batch로 채움
+    session = requests.Session()
+    users = []
+    rng = random.Random(options['seed'])
+    for i in range(options['users']):
+        username = f'{prefix}-user{i}'
+        session.post(f'{base_url}/api/accounts/register/', json={
+            'username': username, 'password': PASSWORD, 'password2': PASSWORD, 'name': 'bench',
+            'gender': 'M', 'age': 35, 'height': 175, 'weight': 72, 'diet_goal': 'maintain',
+        }, timeout=30).raise_for_status()
+        token = session.post(f'{base_url}/api/accounts/login/', json={'username': username, 'password': PASSWORD},
+                             timeout=30).json()['token']
+        now = timezone.now()
+        entries = [
+            {'content': rng.choice(FOODS), 'timestamp': (now - timedelta(hours=h)).isoformat()}
+            for h in range(0, 72, 6)
+        ]
+        session.post(f'{base_url}/api/accounts/chat/batch/', json={'entries': entries},
+                     headers={'Authorization': f'Token {token}'}, timeout=30)
+        users.append((username, token))
+    return users
+
+
+def _http_mode(options, stdout):
+    base_url = options['url'].rstrip('/')
+    prefix = f'bench-{uuid.uuid4().hex[:6]}'
+    try:
+        users = _http_users(base_url, options, prefix)
+    except (requests.RequestException, KeyError, ValueError) as e:
+        raise CommandError(f'Could not prepare users on {base_url}: {e}')
+    stdout.write(f'Registered {len(users)} users on {base_url} ({prefix}-*), concurrency {options["concurrency"]}')
+
+    scenarios = Scenarios(users, prefix, options['seed'])
+    results = {}
+    for name in options['scenarios']:
+        build = getattr(scenarios, name)
+        specs = [build(i) for i in range(options['requests'])]
+        sessions = {}
+
+        def send(spec):
+            # 스레드마다 연결 유지 (keep-alive)
+            session = sessions.setdefault(threading.get_ident(), requests.Session())
+            return _http_request(session, base_url, spec)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            outcomes = list(pool.map(send, specs))
+        elapsed = time.perf_counter() - started
+        samples = [ms for ms, _ in outcomes]
+        results[name] = _result(samples, elapsed, sum(not ok for _, ok in outcomes), None)
+    return results
+
+
+# --- 결과/기준 비교 ---
+
+def _result(samples, elapsed, errors, queries):
+    stats = summarize(samples)
+    stats.update(
+        requests=len(samples), errors=errors, rps=round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        queries=round(queries, 1) if queries is not None else None,
+    )
+    return stats
+
+
+def _write_results(stdout, results):
+    for name, r in results.items():
+        queries = f', {r["queries"]} queries/req' if r['queries'] is not None else ''
+        stdout.write(
+            f'[{name}] {r["requests"]} requests, {r["errors"]} errors, p50 {r["p50_ms"]}ms, '
+            f'p95 {r["p95_ms"]}ms, p99 {r["p99_ms"]}ms, {r["rps"]} req/s{queries}'
+        )
+
+
+def compare(results, baseline, threshold):
+    """기준 대비 회귀 목록 — p95가 threshold% 넘게 느려졌거나 요청당 쿼리 수가 늘었거나 오류가 난 경우"""
+    problems = []
+    for name, current in results.items():
+        if current['errors']:
+            problems.append(f'{name}: {current["errors"]} failed request(s)')
+        base = baseline.get(name)
+        if base is None:
+            continue
+        limit = base['p95_ms'] * (1 + threshold / 100)
+        if current['p95_ms'] > limit:
+            problems.append(f'{name}: p95 {current["p95_ms"]}ms > {limit:.3f}ms (baseline {base["p95_ms"]}ms)')
+        if None not in (current['queries'], base.get('queries')) and current['queries'] > base['queries']:
+            problems.append(f'{name}: {current["queries"]} queries/req > baseline {base["queries"]}')
+    return problems
+
+
+def run(stdout, options):
+    options['scenarios'] = options['scenarios'] or SCENARIOS
+    results = _client_mode(options, stdout) if options['mode'] == 'client' else _http_mode(options, stdout)
+    _write_results(stdout, results)
+
+    if options['save_baseline']:
+        with open(options['save_baseline'], 'w') as fp:
+            json.dump({'mode': options['mode'], 'results': results}, fp, indent=2)
+        stdout.write(f'Baseline saved to {options["save_baseline"]}')
+
+    baseline = {}
+    if options['baseline']:
+        with open(options['baseline']) as fp:
+            data = json.load(fp)
+        if data.get('mode') != options['mode']:
+            raise CommandError(f'Baseline was recorded in {data.get("mode")} mode, not {options["mode"]}.')
+        baseline = data['results']
+    problems = compare(results, baseline, options['threshold'])
+    if problems:
+        raise CommandError('Benchmark regressions:\n  ' + '\n  '.join(problems))
@@ -0,0 +1,84 @@
+"""
+이미지 여러 장 업로드 저장 시간/쿼리 수 — 장별 create 반복(기존) vs 병렬 쓰기 + bulk_create
+
+python manage.py benchmark image_upload --images 20 --database file
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from accounts.benchmarks import isolated_database, summarize
+from accounts.models import CustomUser, IntakeImage, IntakeRecord, business_date
+from accounts.uploads import store_files, create_images
+
+
+def add_arguments(parser):
+    parser.add_argument('--images', type=int, default=20, help='요청당 이미지 수')
+    parser.add_argument('--size-kb', type=int, default=500, help='이미지당 크기(KB)')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--threads', type=int, default=4, help='IMAGE_UPLOAD_WRITE_THREADS')
+    parser.add_argument('--database', choices=['memory', 'file'], default='memory',
+                        help='memory: 테스트 실행과 같은 메모리 SQLite, file: 운영과 같은 파일 SQLite')
+
+
+def _files(options):
+    # 매번 다른 내용 (중복 제거로 쓰기를 건너뛰지 않도록)
+    return [
+        SimpleUploadedFile(f'meal{i}.jpg', os.urandom(options['size_kb'] * 1024), content_type='image/jpeg')
+        for i in range(options['images'])
+    ]
+
+
+def _before(user, files, diet_date):
+    # 기존 방식: 장마다 파일 쓰기 + INSERT (autocommit), 마지막에 기록 INSERT
+    for f in files:
+        IntakeImage.objects.create(user=user, image=f, date=diet_date)
+    IntakeRecord.objects.create(user=user, content=f'[Image] {len(files)} image(s) uploaded.', date=diet_date)
+
+
+def _after(user, files, diet_date):
+    stored = store_files(files)
+    with transaction.atomic():
+        images = create_images(user, stored, '', diet_date)
+        IntakeRecord.objects.create(user=user, content=f'[Image] {len(images)} image(s) uploaded.', date=diet_date)
+
+
+def _report(stdout, title, save, user, options):
+    samples, queries = [], 0
+    diet_date = business_date()
+    for _ in range(options['repeat']):
+        files = _files(options)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            save(user, files, diet_date)
+            samples.append((time.perf_counter() - started) * 1000)
+        queries = len(captured)
+    stats = summarize(samples)
+    stdout.write(
+        f'[{title}] mean {stats["mean_ms"]}ms, p50 {stats["p50_ms"]}ms, p95 {stats["p95_ms"]}ms, '
+        f'{queries} queries per upload'
+    )
+
+
+def run(stdout, options):
+    work_dir = tempfile.mkdtemp(prefix='image_upload_bench')
+    test_name = os.path.join(work_dir, 'bench.sqlite3') if options['database'] == 'file' else None
+    try:
+        with isolated_database(test_name), override_settings(
+            MEDIA_ROOT=os.path.join(work_dir, 'media'), IMAGE_UPLOAD_WRITE_THREADS=options['threads'],
+        ):
+            user = CustomUser.objects.create(username='upload-bench', name='bench', gender='M', age=30,
+                                             height=170, weight=70, diet_goal='maintain')
+            stdout.write(
+                f'{options["images"]} x {options["size_kb"]}KB images, {options["repeat"]} runs, '
+                f'{options["database"]} SQLite'
+            )
+            _report(stdout, 'Before (create per image)', _before, user, options)
+            _report(stdout, 'After (thread pool + bulk_create)', _after, user, options)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,137 @@
+"""
+evaluate/history 쿼리의 실행 계획과 소요 시간 — 인덱스/유니크 제약 적용 전후 비교
+
+python manage.py benchmark query_plans --users 200 --days 120
+"""
+import random
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.benchmarks import isolated_database, measure, summarize
+from accounts.models import CustomUser, IntakeRecord, IntakeImage, DailyHistory, ProfileSnapshot
+
+# 비교할 인덱스와 (user, date) 유니크 제약 (전: 제거한 상태, 후: 다시 추가한 상태)
+SCHEMA_ITEMS = [
+    (IntakeRecord, 'index', 'intakerecord_user_date_ts_idx'),
+    (IntakeImage, 'index', 'intakeimage_user_date_idx'),
+    (DailyHistory, 'constraint', 'dailyhistory_user_date_uniq'),
+]
+# 평가 기록의 프로필 스냅샷 (모든 사용자가 공유)
+PROFILE = dict(gender='M', age=30, height=170, weight=70, diet_goal='maintain')
+
+
+def add_arguments(parser):
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--days', type=int, default=120, help='사용자별 기록 일수')
+    parser.add_argument('--records-per-day', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=200, help='쿼리당 측정 횟수')
+    parser.add_argument('--seed', type=int, default=8)
+
+
+def _seed(options):
+    rng = random.Random(options['seed'])
+    users = CustomUser.objects.bulk_create([
+        CustomUser(username=f'plan{i}', password='!', name='bench', gender='M', age=30,
+                   height=170, weight=70, diet_goal='maintain')
+        for i in range(options['users'])
+    ])
+    start = date(2025, 1, 1)
+    now = timezone.now()
+    profile = ProfileSnapshot.get_for(PROFILE)
+    records, histories, images = [], [], []
+    for user in users:
+        for d in range(options['days']):
+            day = start + timedelta(days=d)
+            for n in range(options['records_per_day']):
+                records.append(IntakeRecord(user=user, content=f'meal {n}', date=day, timestamp=now))
+            histories.append(DailyHistory(
+                user=user, date=day, total_intake_text='meal', total_grade='B', profile=profile,
+                score_macro=rng.randint(0, 10), score_disease=rng.randint(0, 10), score_goal=rng.randint(0, 10),
+            ))
+            if d % 7 == 0:
+                images.append(IntakeImage(user=user, image='intake_images/bench.jpg', date=day))
+    IntakeRecord.objects.bulk_create(records, batch_size=5000)
+    DailyHistory.objects.bulk_create(histories, batch_size=5000)
+    IntakeImage.objects.bulk_create(images, batch_size=5000)
+    return users, start + timedelta(days=options['days'] // 2)
+
+
+def _queries(user, day):
+    middle = DailyHistory.objects.filter(user=user, date=day).first()
+    return {
+        'evaluate: records of the day': IntakeRecord.objects.filter(user=user, date=day).order_by('timestamp'),
+        'evaluate: previous history': DailyHistory.objects.filter(user=user, date=day),
+        'history: first page': DailyHistory.objects.filter(user=user).select_related('profile')
+        .order_by('-date', '-id')[:11],
+        'history: page after cursor': DailyHistory.objects.filter(user=user, date__lt=middle.date)
+        .select_related('profile').order_by('-date', '-id')[:11],
+        'images of the day': IntakeImage.objects.filter(user=user, date=day),
+    }
+
+
+def _report(stdout, title, user, day, repeat):
+    stdout.write(f'\n=== {title} ===')
+    for name, queryset in _queries(user, day).items():
+        stats = summarize(measure(lambda: list(queryset.all()), repeat))
+        stdout.write(f'\n[{name}] mean {stats["mean_ms"]}ms, p95 {stats["p95_ms"]}ms')
+        for line in queryset.explain().splitlines():
+            stdout.write(f'    {line}')
+
+
+def _set_schema(enabled):
+    with connection.schema_editor() as editor:
+        for model, kind, name in SCHEMA_ITEMS:
+            if kind == 'index':
+                index = next(i for i in model._meta.indexes if i.name == name)
+                (editor.add_index if enabled else editor.remove_index)(model, index)
+            elif enabled:
+                constraint = next(c for c in model._meta.constraints if c.name == name)
+                editor.add_constraint(model, constraint)
+            else:
+                # SQLite는 테이블을 다시 만들며 제약을 지우는데, 이때 모델 Meta 기준으로 만들기 때문에
+                # 제약을 뺀 Meta로 잠시 바꿔서 재생성
+                constraints = model._meta.constraints
+                model._meta.constraints = [c for c in constraints if c.name != name]
+                try:
+                    editor.remove_constraint(model, next(c for c in constraints if c.name == name))
+                finally:
+                    model._meta.constraints = constraints
+
+
+def _save_before(user, day):
+    # 기존 방식: 트랜잭션 없이 delete 후 create
+    DailyHistory.objects.filter(user=user, date=day).delete()
+    DailyHistory.objects.create(user=user, date=day, total_intake_text='meal', total_grade='B',
+                                score_macro=5, score_disease=5, score_goal=5, profile=ProfileSnapshot.get_for(PROFILE))
+
+
+def _save_after(user, day):
+    with transaction.atomic():
+        DailyHistory.objects.update_or_create(user=user, date=day, defaults=dict(
+            total_intake_text='meal', total_grade='B', score_macro=5, score_disease=5, score_goal=5,
+            profile=ProfileSnapshot.get_for(PROFILE),
+        ))
+
+
+def _report_write(stdout, save, user, day, repeat):
+    stats = summarize(measure(lambda: save(user, day), repeat))
+    stdout.write(f'\n[evaluate: save history] mean {stats["mean_ms"]}ms, p95 {stats["p95_ms"]}ms')
+
+
+def run(stdout, options):
+    with isolated_database():
+        stdout.write('Seeding benchmark data...')
+        users, day = _seed(options)
+        user = users[len(users) // 2]
+
+        _set_schema(False)
+        connection.cursor().execute('ANALYZE')
+        _report(stdout, 'Before (no composite indexes / unique constraint)', user, day, options['repeat'])
+        _report_write(stdout, _save_before, user, day, options['repeat'])
+
+        _set_schema(True)
+        connection.cursor().execute('ANALYZE')
+        _report(stdout, 'After', user, day, options['repeat'])
+        _report_write(stdout, _save_after, user, day, options['repeat'])
@@ -0,0 +1,141 @@
+"""
+SQLite 동시 쓰기 처리량 — 기본 sqlite3 백엔드 vs backend.sqlite (WAL/PRAGMA, BEGIN IMMEDIATE, 연결 재사용)
+
+python manage.py benchmark sqlite_writes --writers 8 --ops 200 --readers 2
+
+- 임시 폴더의 파일 DB 두 개에 각각 마이그레이션한 뒤 같은 작업을 실행
+- 쓰기 한 번 = 요청 하나: atomic() 안에서 오늘 기록 수 조회 → IntakeRecord INSERT → history_version 증가
+  (읽은 뒤 쓰는 트랜잭션 — evaluation._save_history와 같은 형태), 끝나면 request_finished처럼 연결 정리
+- 읽기 스레드는 쓰기가 끝날 때까지 history 목록 조회를 반복
+- gunicorn 워커 여러 개 대신 스레드 (sqlite3 모듈은 SQL 실행/잠금 대기 중 GIL을 놓음)
+"""
+import copy
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management import call_command
+from django.db import OperationalError, connections, transaction
+from django.db.models import F
+
+from accounts.benchmarks import isolated_database, summarize
+from accounts.models import CustomUser, DailyHistory, IntakeRecord, business_date
+
+VARIANTS = {
+    'Before (django.db.backends.sqlite3)': {'ENGINE': 'django.db.backends.sqlite3', 'CONN_MAX_AGE': 0, 'OPTIONS': {}},
+    'After (backend.sqlite)': {
+        'ENGINE': 'backend.sqlite', 'CONN_MAX_AGE': 600, 'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    },
+}
+
+
+def add_arguments(parser):
+    parser.add_argument('--writers', type=int, default=8, help='동시 쓰기 스레드 수')
+    parser.add_argument('--ops', type=int, default=200, help='쓰기 스레드당 요청 수')
+    parser.add_argument('--readers', type=int, default=2, help='동시 읽기 스레드 수')
+
+
+def _setup(alias, path, variant, writers):
+    settings_dict = copy.deepcopy(connections['default'].settings_dict)
+    settings_dict.update(NAME=path, **copy.deepcopy(variant))
+    connections.settings[alias] = settings_dict
+    call_command('migrate', database=alias, verbosity=0, interactive=False)
+    users = CustomUser.objects.using(alias).bulk_create([
+        CustomUser(username=f'writer{n}', name='bench', gender='F', age=30, height=160, weight=55, diet_goal='maintain')
+        for n in range(writers)
+    ])
+    return [user.pk for user in users]
+
+
+def _write(alias, user_id, ops, start):
+    conn = connections[alias]
+    today = business_date()
+    latencies, errors = [], 0
+    start.wait()
+    for _ in range(ops):
+        started = time.perf_counter()
+        try:
+            with transaction.atomic(using=alias):
+                count = IntakeRecord.objects.using(alias).filter(user_id=user_id, date=today).count()
+                IntakeRecord.objects.using(alias).create(user_id=user_id, content=f'기록 {count + 1}')
+                CustomUser.objects.using(alias).filter(pk=user_id).update(history_version=F('history_version') + 1)
+        except OperationalError:  # database is locked
+            errors += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+        conn.close_if_unusable_or_obsolete()  # CONN_MAX_AGE=0이면 요청마다 닫힘
+    conn.close()
+    return latencies, errors
+
+
+def _read(alias, user_id, start, done):
+    conn = connections[alias]
+    reads, errors = 0, 0
+    start.wait()
+    while not done.is_set():
+        try:
+            list(DailyHistory.objects.using(alias).filter(user_id=user_id).order_by('-date')[:10])
+            list(IntakeRecord.objects.using(alias).filter(user_id=user_id).order_by('-id')[:20])
+            reads += 1
+        except OperationalError:
+            errors += 1
+        conn.close_if_unusable_or_obsolete()
+    conn.close()
+    return reads, errors
+
+
+def _run_variant(alias, user_ids, options):
+    start = threading.Barrier(options['writers'] + options['readers'])
+    done = threading.Event()
+    with ThreadPoolExecutor(max_workers=options['writers'] + options['readers']) as executor:
+        readers = [executor.submit(_read, alias, user_ids[n % len(user_ids)], start, done)
+                   for n in range(options['readers'])]
+        started = time.perf_counter()
+        writers = [executor.submit(_write, alias, user_id, options['ops'], start) for user_id in user_ids]
+        results = [future.result() for future in writers]
+        elapsed = time.perf_counter() - started
+        done.set()
+        reads = [future.result() for future in readers]
+
+    latencies = [ms for samples, _ in results for ms in samples]
+    write_errors = sum(errors for _, errors in results)
+    return {
+        'elapsed': elapsed,
+        'writes': len(latencies) - write_errors,
+        'write_errors': write_errors,
+        'reads': sum(n for n, _ in reads),
+        'read_errors': sum(errors for _, errors in reads),
+        **summarize(latencies),
+    }
+
+
+def _report(stdout, title, alias, path, variant, options):
+    try:
+        user_ids = _setup(alias, path, variant, options['writers'])
+        with connections[alias].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+        connections[alias].close()
+        r = _run_variant(alias, user_ids, options)
+    finally:
+        connections[alias].close()
+        del connections.settings[alias]
+    stdout.write(
+        f"[{title}] journal={journal_mode}: {r['writes'] / r['elapsed']:.0f} writes/s, "
+        f"{r['write_errors']} locked, p50 {r['p50_ms']}ms, p95 {r['p95_ms']}ms, p99 {r['p99_ms']}ms; "
+        f"{r['reads'] / r['elapsed']:.0f} reads/s, {r['read_errors']} locked"
+    )
+
+
+def run(stdout, options):
+    stdout.write(f"{options['writers']} writers x {options['ops']} requests, {options['readers']} readers")
+    work_dir = tempfile.mkdtemp(prefix='sqlite-bench-')
+    try:
+        # 마이그레이션의 RunPython은 default DB에 쓰므로 default도 임시 DB로
+        with isolated_database():
+            for n, (title, variant) in enumerate(VARIANTS.items()):
+                _report(stdout, title, f'sqlite_bench_{n}', os.path.join(work_dir, f'{n}.sqlite3'), variant, options)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,48 @@
+"""
+요청당 토큰 인증 비용 — TokenAuthentication(기존) vs CachedTokenAuthentication
+
+python manage.py benchmark token_auth --requests 2000
+"""
+import tempfile
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from accounts.authentication import CachedTokenAuthentication
+from accounts.benchmarks import isolated_database, measure, summarize
+from accounts.models import CustomUser
+
+
+def add_arguments(parser):
+    parser.add_argument('--requests', type=int, default=2000)
+
+
+def _report(stdout, title, backend, request, options):
+    backend.authenticate(request)  # 캐시 채우기 (기존 방식은 영향 없음)
+    with CaptureQueriesContext(connection) as captured:
+        backend.authenticate(request)
+    stats = summarize(measure(lambda: backend.authenticate(request), options['requests']))
+    stdout.write(
+        f'[{title}] mean {stats["mean_ms"]}ms, p50 {stats["p50_ms"]}ms, p99 {stats["p99_ms"]}ms, '
+        f'{len(captured)} queries per request'
+    )
+
+
+def run(stdout, options):
+    # 'auth' 캐시는 설정 그대로의 백엔드, 위치만 임시 디렉터리
+    with tempfile.TemporaryDirectory() as cache_dir, isolated_database(), override_settings(CACHES={
+        **settings.CACHES, 'auth': {**settings.CACHES['auth'], 'LOCATION': cache_dir},
+    }):
+        user = CustomUser.objects.create_user(username='auth-bench', password='bench-pass-123', name='bench',
+                                              gender='M', age=30, height=170, weight=70, diet_goal='maintain')
+        token = Token.objects.create(user=user)
+        request = Request(APIRequestFactory().get('/api/accounts/my-info/', HTTP_AUTHORIZATION=f'Token {token.key}'))
+
+        stdout.write(f'{options["requests"]} authentications')
+        _report(stdout, 'Before (TokenAuthentication)', TokenAuthentication(), request, options)
+        _report(stdout, 'After (CachedTokenAuthentication)', CachedTokenAuthentication(), request, options)
@@ -0,0 +1,59 @@
+"""
+조건부 GET — 사용자별 버전 카운터로 ETag/Last-Modified를 만들고, 바뀌지 않았으면 직렬화 전에 304
+- history: DailyHistory 저장/삭제 때 증가 (history/, dashboard/summary/)
+- profile: CustomUser 저장 때 증가 — my_info PUT, admin, ORM 모두 (signals, my-info/)
+"""
+import hashlib
+
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .models import CustomUser
+
+HISTORY = 'history'
+PROFILE = 'profile'
+
+
+def bump(user_id, scope):
+    """scope(history/profile) 버전 증가 — 데이터를 바꾼 트랜잭션 안에서 호출"""
+    CustomUser.objects.filter(pk=user_id).update(**{
+        f'{scope}_version': F(f'{scope}_version') + 1,
+        f'{scope}_changed_at': timezone.now(),
+    })
+
+
+class Validators:
+    def __init__(self, etag, last_modified):
+        self.etag = etag
+        self.last_modified = last_modified  # timestamp(초) 또는 None
+
+    def not_modified(self, request):
+        """If-None-Match / If-Modified-Since가 맞으면 304 응답, 아니면 None"""
+        response = get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+        if response is not None:
+            self.apply(response)
+        return response
+
+    def apply(self, response):
+        response.headers['ETag'] = self.etag
+        if self.last_modified is not None:
+            response.headers['Last-Modified'] = http_date(self.last_modified)
+        # 사용자별 응답 — 공유 캐시에는 저장하지 않고, 브라우저는 매번 재검증
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+
+def validators(request, scope):
+    """
+    요청 사용자의 scope 검증값 (PK 조회 한 번 — 인증에서 읽은 사용자 행이 캐시돼 있어도 최신 값 사용)
+    - ETag에는 쿼리 문자열도 포함 (cursor, page_size 등이 다르면 다른 응답)
+    """
+    version, changed_at = CustomUser.objects.filter(pk=request.user.pk).values_list(
+        f'{scope}_version', f'{scope}_changed_at',
+    ).get()
+    query = hashlib.sha1(request.META.get('QUERY_STRING', '').encode()).hexdigest()[:12]
+    etag = f'W/"{scope}-{request.user.pk}-{version}-{query}"'
+    return Validators(etag, int(changed_at.timestamp()) if changed_at else None)
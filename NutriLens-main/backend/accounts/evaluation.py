@@ -0,0 +1,369 @@
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from . import conditional, evaluation_cache, rollups, singleflight
+from .history import invalidate_history_total
+from .llm import get_client
+from .models import IntakeRecord, IntakeImage, DailyHistory, ProfileSnapshot
+from .prompting import build_prompt
+from .serializers import UserInfoSerializer
+
+logger = logging.getLogger(__name__)
+
+# 프롬프트나 응답 형식을 바꾸면 올려서 이전 캐시 결과를 무효화
+# 2: accounts.prompting (system/user 분리, 잡음 줄 제거, 토큰 예산)
+PROMPT_VERSION = 2
+
+# 평가 항목 (GPT 응답 JSON의 최상위 키)
+CATEGORIES = ('macro', 'disease', 'goal')
+
+
+class NoIntakeRecords(Exception):
+    """해당 사업일자에 평가할 섭취 기록이 없음"""
+
+
+class EvaluationError(Exception):
+    """GPT 호출 또는 응답 파싱 실패"""
+
+    def __init__(self, detail, raw=None):
+        super().__init__(detail)
+        self.detail = detail
+        self.raw = raw
+
+
+def _to_int_safe(x, default=None):
+    try:
+        # float로 한번 받아서 반올림 후 int 처리
+        return int(round(float(x)))
+    except Exception:
+        return default
+
+
+def _grade(score_total):
+    if score_total <= 4:
+        return 'D'
+    elif score_total <= 14:
+        return 'C'
+    elif score_total <= 24:
+        return 'B'
+    return 'A'
+
+
+def parse_result(result):
+    """GPT JSON(dict) → DailyHistory 평가 필드"""
+    macro = result.get('macro', {})
+    disease = result.get('disease', {})
+    goal = result.get('goal', {})
+
+    carbs_g = _to_int_safe(macro.get('carbs_g'), default=None)
+    protein_g = _to_int_safe(macro.get('protein_g'), default=None)
+    fat_g = _to_int_safe(macro.get('fat_g'), default=None)
+
+    # 1줄 요약(line 1) 구성: Carbs ~~g, Protein ~~g, Fat ~~g
+    if carbs_g is not None and protein_g is not None and fat_g is not None:
+        macro_line1 = f"Carbs {carbs_g}g, Protein {protein_g}g, Fat {fat_g}g"
+    else:
+        # 백업 형식(혹시 모델이 누락한 경우)
+        c = f"{carbs_g}g" if carbs_g is not None else "N/A"
+        p = f"{protein_g}g" if protein_g is not None else "N/A"
+        f = f"{fat_g}g" if fat_g is not None else "N/A"
+        macro_line1 = f"Carbs {c}, Protein {p}, Fat {f}"
+
+    fields = {
+        'carbs_g': max(carbs_g, 0) if carbs_g is not None else None,
+        'protein_g': max(protein_g, 0) if protein_g is not None else None,
+        'fat_g': max(fat_g, 0) if fat_g is not None else None,
+
+        'score_macro': int(macro.get('score', 0)),
+        # 최종 reason_macro: 1줄 요약 + 개행 + 기존 이유(2줄째)
+        'reason_macro': f"{macro_line1}\n{(macro.get('reason', '') or '').strip()}",
+        'advice_macro': macro.get('advice', '') or '',
+
+        'score_disease': int(disease.get('score', 0)),
+        'reason_disease': disease.get('reason', '') or '',
+        'advice_disease': disease.get('advice', '') or '',
+
+        'score_goal': int(goal.get('score', 0)),
+        'reason_goal': goal.get('reason', '') or '',
+        'advice_goal': goal.get('advice', '') or '',
+    }
+    fields['total_grade'] = _grade(fields['score_macro'] + fields['score_disease'] + fields['score_goal'])
+    return fields
+
+
+def profile_snapshot(profile):
+    """
+    사용자 프로필(UserInfoSerializer) → ProfileSnapshot.FIELDS 값
+    - 위염/궤양은 CustomUser.has_gastritis, 고호모시스테인혈증은 사용자 필드가 없어 항상 False
+    """
+    return dict(
+        gender=profile['gender'],
+        age=profile['age'],
+        height=profile['height'],
+        weight=profile['weight'],
+        diet_goal=profile['diet_goal'],
+
+        has_diabetes=profile.get('has_diabetes', False),
+        has_hypertension=profile.get('has_hypertension', False),
+        has_hyperlipidemia=profile.get('has_hyperlipidemia', False),
+        has_anemia=profile.get('has_anemia', False),
+        has_obesity=profile.get('has_obesity', False),
+        has_metabolic_syndrome=profile.get('has_metabolic_syndrome', False),
+        has_gout=profile.get('has_gout', False),
+        has_hyperhomocysteinemia=False,
+        has_ibs=profile.get('has_ibs', False),
+        has_gastritis_or_ulcer=profile.get('has_gastritis', False),
+        has_constipation=profile.get('has_constipation', False),
+        has_fatty_liver=profile.get('has_fatty_liver', False),
+    )
+
+
+def photo_foods(user, target_date):
+    """
+    그날 올린 사진의 음식 인식 결과 → 프롬프트에 넣을 줄 목록 (올린 순서, 사진마다)
+    - 인식 전이거나 인식에 실패한 사진은 빠짐 (accounts.recognition, run_image_worker)
+    """
+    results = (
+        IntakeImage.objects.filter(user=user, date=target_date, blob__recognition__isnull=False)
+        .order_by('created_at', 'id').values_list('blob__recognition__result', flat=True)
+    )
+    lines = []
+    for result in results:
+        for food in result.get('foods') or []:
+            lines.append(f"{food['name']} ({food['portion']})" if food.get('portion') else food['name'])
+    return lines
+
+
+class EvaluationPlan:
+    """GPT 호출 전 준비 결과 (기록/프로필/캐시 조회/프롬프트)"""
+
+    def __init__(self, user, target_date, all_text, last_record_id, profile, snapshot, previous, key, cached):
+        self.user = user
+        self.target_date = target_date
+        self.all_text = all_text
+        self.last_record_id = last_record_id
+        self.profile = profile
+        self.snapshot = snapshot
+        self.previous = previous
+        self.key = key
+        self.cached = cached
+        self.prompt = None  # accounts.prompting.Prompt
+        self.latest = None  # 방금 끝난 같은 평가의 DailyHistory (reuse_latest)
+        self.incremental_steps = 0
+
+    @property
+    def messages(self):
+        return self.prompt.messages
+
+
+def prepare_evaluation(user, target_date, incremental=True, reuse_latest=False):
+    """
+    평가 준비: 기록 조회, 캐시 조회, (캐시 미스 시) 프롬프트 구성
+    - 기록이 없으면 NoIntakeRecords
+    - incremental: 가능하면 마지막 평가 이후 추가된 기록만 전송
+    - reuse_latest: 저장된 평가가 지금 기록/프로필을 그대로 포함하면 plan.latest로 반환 (단일 실행 대기 후)
+    """
+    records = list(IntakeRecord.objects.filter(user=user, date=target_date).order_by('timestamp'))
+    if not records:
+        raise NoIntakeRecords(f'No intake records found for {target_date}.')
+
+    all_text = "\n".join([r.content for r in records])
+    profile = UserInfoSerializer(user).data
+    snapshot = profile_snapshot(profile)
+    previous = (
+        DailyHistory.objects.filter(user=user, date=target_date).select_related('profile').order_by('-id').first()
+    )
+
+    photos = photo_foods(user, target_date)
+
+    # 같은 기록/프로필(/사진 인식 결과)로 이미 평가한 적이 있으면 GPT 호출 없이 재사용
+    key = evaluation_cache.cache_key(all_text, profile, PROMPT_VERSION, photos)
+    last_record_id = max(r.id for r in records)
+    if reuse_latest and _covers(previous, all_text, last_record_id, snapshot):
+        plan = EvaluationPlan(user, target_date, all_text, last_record_id, profile, snapshot, previous, key, None)
+        plan.latest = previous
+        return plan
+
+    plan = EvaluationPlan(
+        user, target_date, all_text, last_record_id, profile, snapshot, previous,
+        key, evaluation_cache.lookup(key),
+    )
+    if plan.cached is not None:
+        return plan
+
+    # 사진 인식 결과가 있으면 전체 평가 — 이전 평가에 어느 사진까지 반영됐는지는 저장하지 않음
+    delta = _incremental_delta(previous, records, snapshot) if incremental and not photos else None
+    if delta:
+        plan.prompt = build_prompt(profile, [r.content for r in delta], previous=previous)
+        plan.incremental_steps = previous.incremental_steps + 1
+    else:
+        plan.prompt = build_prompt(profile, [r.content for r in records], photos=photos)
+    tokens = plan.prompt.tokens
+    logger.info(
+        'Evaluating user %s on %s (%s, %d records): prompt %d tokens (system %d, profile %d, intake %d, %d lines dropped)',
+        user.pk, target_date, 'incremental' if delta else 'full', len(delta) if delta else len(records),
+        tokens['total'], tokens['system'], tokens['profile'], tokens['intake'], plan.prompt.dropped,
+    )
+    return plan
+
+
+def complete_from_cache(plan):
+    fields = dict(parse_result(plan.cached.result), last_record_id=plan.last_record_id, incremental_steps=0)
+    raw_answer = plan.cached.raw_response or None
+    if plan.previous is not None and _unchanged(plan.previous, plan.all_text, fields, plan.snapshot):
+        return plan.previous, raw_answer
+    return _save_history(plan.user, plan.target_date, plan.all_text, fields, plan.snapshot), raw_answer
+
+
+def complete_evaluation(plan, response):
+    """GPT 응답(LLMResponse) 파싱 → 캐시 저장 → DailyHistory 저장"""
+    raw_answer = response.content
+    try:
+        result = json.loads(raw_answer)
+        fields = parse_result(result)
+    except Exception as e:
+        raise EvaluationError(str(e), raw=raw_answer) from e
+
+    evaluation_cache.store(
+        plan.key, result, raw_answer, latency_ms=response.latency_ms, total_tokens=response.total_tokens,
+    )
+    fields.update(last_record_id=plan.last_record_id, incremental_steps=plan.incremental_steps)
+    return _save_history(plan.user, plan.target_date, plan.all_text, fields, plan.snapshot), raw_answer
+
+
+def evaluate_day(user, target_date, incremental=True):
+    """
+    사용자의 사업일자 섭취 기록을 GPT로 평가하고 DailyHistory로 저장
+    - 반환: (DailyHistory, raw GPT 응답 — 다른 요청의 결과를 공유했으면 None)
+    - 기록이 없으면 NoIntakeRecords, GPT 실패 시 EvaluationError
+    - 같은 (사용자, 사업일자) 평가가 실행 중이면 끝날 때까지 기다림 (accounts.singleflight)
+    """
+    try:
+        with singleflight.flight(user.pk, target_date) as flight:
+            # 같은 평가를 기다렸다면 그 결과가 지금 기록을 모두 포함하는지부터 확인 (GPT 호출 없이 공유)
+            plan = prepare_evaluation(user, target_date, incremental=incremental, reuse_latest=flight.waited)
+            if plan.latest is not None:
+                return plan.latest, None
+            if plan.cached is not None:
+                return complete_from_cache(plan)
+
+            try:
+                response = get_client().chat(plan.messages)
+            except Exception as e:
+                raise EvaluationError(str(e)) from e
+            return complete_evaluation(plan, response)
+    except singleflight.FlightTimeout as e:
+        raise EvaluationError(str(e)) from e
+
+
+async def aevaluate_day(user, target_date, incremental=True):
+    """
+    evaluate_day의 async 버전 (async 뷰용)
+    - GPT 응답과 앞선 평가를 기다리는 동안은 스레드를 잡지 않음 (LLM 클라이언트의 achat)
+    - 기록 조회/저장은 짧은 동기 단계라 sync_to_async로 실행
+    """
+    try:
+        flight = await singleflight.Flight(user.pk, target_date).aacquire()
+    except singleflight.FlightTimeout as e:
+        raise EvaluationError(str(e)) from e
+    try:
+        plan = await sync_to_async(prepare_evaluation)(
+            user, target_date, incremental=incremental, reuse_latest=flight.waited,
+        )
+        if plan.latest is not None:
+            return plan.latest, None
+        if plan.cached is not None:
+            return await sync_to_async(complete_from_cache)(plan)
+
+        try:
+            response = await get_client().achat(plan.messages)
+        except Exception as e:
+            raise EvaluationError(str(e)) from e
+        return await sync_to_async(complete_evaluation)(plan, response)
+    finally:
+        await flight.arelease()
+
+
+def _incremental_delta(previous, records, snapshot):
+    """
+    증분 평가에 보낼 신규 기록 목록, 전체 평가가 필요하면 None
+    - 이전 평가가 없거나 기준점/탄단지 추정치가 없는 경우
+    - 프로필이 바뀐 경우, 이전에 평가한 기록이 수정/삭제된 경우
+    - 연속 증분 평가가 EVAL_INCREMENTAL_MAX_STEPS에 도달한 경우
+    """
+    if not settings.EVAL_INCREMENTAL_ENABLED or previous is None or previous.last_record_id is None:
+        return None
+    if None in (previous.carbs_g, previous.protein_g, previous.fat_g):
+        return None
+    if previous.incremental_steps >= settings.EVAL_INCREMENTAL_MAX_STEPS:
+        return None
+    if not _same_profile(previous, snapshot):
+        return None
+
+    evaluated = [r for r in records if r.id <= previous.last_record_id]
+    if "\n".join([r.content for r in evaluated]) != previous.total_intake_text:
+        return None
+    return [r for r in records if r.id > previous.last_record_id] or None
+
+
+def _same_profile(history, snapshot):
+    return history.profile.digest == ProfileSnapshot.digest_of(snapshot)
+
+
+def _covers(history, all_text, last_record_id, snapshot):
+    # 저장된 평가가 같은 기록(마지막 id와 전체 텍스트)과 같은 프로필로 만들어졌는지
+    if history is None or history.last_record_id != last_record_id or history.total_intake_text != all_text:
+        return False
+    return _same_profile(history, snapshot)
+
+
+def _unchanged(history, all_text, fields, snapshot):
+    if history.total_intake_text != all_text:
+        return False
+    return all(getattr(history, name) == value for name, value in fields.items()) and _same_profile(history, snapshot)
+
+
+def _save_history(user, target_date, all_text, fields, snapshot):
+    # DailyHistory 저장 (사용자/사업일자당 한 행, 있으면 갱신) + 주/월 집계, 기록 버전 반영
+    with transaction.atomic():
+        old = (
+            DailyHistory.objects.select_for_update()
+            .filter(user=user, date=target_date).values(*rollups.SOURCE_FIELDS).first()
+        )
+        history, _ = DailyHistory.objects.update_or_create(
+            user=user,
+            date=target_date,
+            defaults=dict(total_intake_text=all_text, profile=ProfileSnapshot.get_for(snapshot), **fields),
+        )
+        rollups.apply_change(user.pk, old=old, new=rollups.source_values(history))
+        conditional.bump(user.pk, conditional.HISTORY)
+    invalidate_history_total(user.pk)
+    return history
+
+
+def evaluation_payload(history, raw_answer=None):
+    """평가 결과 응답 (reason_macro는 2줄 형식)"""
+    return {
+        'grade': history.total_grade,
+        'score_macro': history.score_macro,
+        'score_disease': history.score_disease,
+        'score_goal': history.score_goal,
+        'score_total': history.score_macro + history.score_disease + history.score_goal,
+        'reason_macro': history.reason_macro,
+        'reason_disease': history.reason_disease,
+        'reason_goal': history.reason_goal,
+        'advice_macro': history.advice_macro,
+        'advice_disease': history.advice_disease,
+        'advice_goal': history.advice_goal,
+        'carbs_g': history.carbs_g,
+        'protein_g': history.protein_g,
+        'fat_g': history.fat_g,
+        'intake_summary': history.total_intake_text,
+        'feedback_saved': True,
+        'raw_gpt_response': raw_answer,
+        'evaluated_date': str(history.date),
+    }
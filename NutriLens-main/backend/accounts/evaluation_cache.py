@@ -0,0 +1,104 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EvaluationCache, EvaluationCacheStats
+
+# 평가 결과와 무관한 계정 정보는 키에서 제외 (같은 입력이면 사용자가 달라도 재사용)
+IDENTITY_FIELDS = ('id', 'username', 'name', 'first_name', 'last_name', 'email', 'date_joined')
+
+
+def cache_key(all_text, profile, prompt_version, photos=()):
+    payload = {
+        'prompt_version': prompt_version,
+        'intake': all_text,
+        'profile': {k: v for k, v in profile.items() if k not in IDENTITY_FIELDS},
+    }
+    if photos:  # 사진 인식 결과도 프롬프트에 들어감 (없으면 기존 키 그대로)
+        payload['photos'] = list(photos)
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _bump(**deltas):
+    updates = {name: F(name) + value for name, value in deltas.items()}
+    if not EvaluationCacheStats.objects.filter(pk=1).update(**updates):
+        EvaluationCacheStats.objects.get_or_create(pk=1)
+        EvaluationCacheStats.objects.filter(pk=1).update(**updates)
+
+
+def _expiry_cutoff():
+    return timezone.now() - timezone.timedelta(seconds=settings.EVAL_CACHE_TTL)
+
+
+def lookup(key):
+    """
+    캐시 조회
+    - 적중: 사용 시각/적중 수 갱신 후 항목 반환, 절감한 지연시간·토큰 누적
+    - TTL이 지난 항목은 지우고 미스로 처리
+    """
+    if not settings.EVAL_CACHE_ENABLED:
+        return None
+
+    entry = EvaluationCache.objects.filter(key=key).first()
+    if entry is not None and entry.created_at < _expiry_cutoff():
+        entry.delete()
+        _bump(evictions=1)
+        entry = None
+
+    if entry is None:
+        _bump(misses=1)
+        return None
+
+    EvaluationCache.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=timezone.now())
+    _bump(hits=1, saved_ms=entry.latency_ms, saved_tokens=entry.total_tokens)
+    return entry
+
+
+def store(key, result, raw_response, latency_ms=0, total_tokens=0):
+    if not settings.EVAL_CACHE_ENABLED:
+        return
+    EvaluationCache.objects.update_or_create(key=key, defaults={
+        'result': result,
+        'raw_response': raw_response or '',
+        'latency_ms': latency_ms,
+        'total_tokens': total_tokens,
+        'last_used_at': timezone.now(),
+    })
+    evict()
+
+
+def evict():
+    """만료 항목 삭제 후, EVAL_CACHE_MAX_ENTRIES를 넘는 만큼 오래 안 쓴 항목부터 삭제 (LRU)"""
+    removed, _ = EvaluationCache.objects.filter(created_at__lt=_expiry_cutoff()).delete()
+
+    excess = EvaluationCache.objects.count() - settings.EVAL_CACHE_MAX_ENTRIES
+    if excess > 0:
+        stale_ids = list(EvaluationCache.objects.order_by('last_used_at').values_list('id', flat=True)[:excess])
+        removed += EvaluationCache.objects.filter(id__in=stale_ids).delete()[0]
+
+    if removed:
+        _bump(evictions=removed)
+    return removed
+
+
+def stats():
+    counters = EvaluationCacheStats.objects.filter(pk=1).first() or EvaluationCacheStats()
+    lookups = counters.hits + counters.misses
+    return {
+        'entries': EvaluationCache.objects.count(),
+        'hits': counters.hits,
+        'misses': counters.misses,
+        'hit_ratio': round(counters.hits / lookups, 4) if lookups else 0.0,
+        'evictions': counters.evictions,
+        'saved_seconds': round(counters.saved_ms / 1000, 1),
+        'saved_tokens': counters.saved_tokens,
+    }
+
+
+def clear():
+    EvaluationCache.objects.all().delete()
+    EvaluationCacheStats.objects.all().delete()
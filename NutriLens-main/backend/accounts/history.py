@@ -0,0 +1,63 @@
+import base64
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import DailyHistory
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(history):
+    raw = f'{history.date.isoformat()}_{history.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        day, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('_')
+        return date.fromisoformat(day), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor('Invalid cursor.') from e
+
+
+def history_page(user, cursor=None, page_size=None):
+    """
+    (date, id) 기준 키셋 페이지네이션 — 최신순
+    - page_size+1개를 읽어 COUNT 없이 has_more 판단
+    - 반환: (histories, next_cursor, has_more)
+    """
+    page_size = min(page_size or settings.HISTORY_PAGE_SIZE, settings.HISTORY_MAX_PAGE_SIZE)
+    histories = DailyHistory.objects.filter(user=user).select_related('profile').order_by('-date', '-id')
+    if cursor:
+        day, pk = decode_cursor(cursor)
+        histories = histories.filter(Q(date__lt=day) | Q(date=day, id__lt=pk))
+
+    rows = list(histories[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = encode_cursor(rows[-1]) if has_more else None
+    return rows, next_cursor, has_more
+
+
+def _total_cache_key(user_id):
+    return f'history:total:{user_id}'
+
+
+def history_total(user):
+    """전체 기록 수 (캐시, DailyHistory 저장 시 무효화)"""
+    key = _total_cache_key(user.pk)
+    total = cache.get(key)
+    if total is None:
+        total = DailyHistory.objects.filter(user=user).count()
+        cache.set(key, total, settings.HISTORY_TOTAL_CACHE_TTL)
+    return total
+
+
+def invalidate_history_total(user_id):
+    cache.delete(_total_cache_key(user_id))
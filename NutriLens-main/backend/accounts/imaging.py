@@ -0,0 +1,186 @@
+import logging
+import math
+import os
+
+from django.conf import settings
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import ImageBlob
+from .recognition import recognize_blob
+from .storage import image_storage
+
+logger = logging.getLogger(__name__)
+
+# 형식별 Pillow 저장 이름/확장자
+FORMATS = {'webp': ('WEBP', 'webp'), 'jpeg': ('JPEG', 'jpg')}
+
+
+def derivative_name(digest, size_name, fmt):
+    return f'derivatives/{digest[:2]}/{digest[2:4]}/{digest}_{size_name}.{FORMATS[fmt][1]}'
+
+
+# pHash용 DCT 계수 (32x32 → 저주파 8x8만 계산)
+_DCT_SIZE = 32
+_DCT = [
+    [math.cos((2 * x + 1) * u * math.pi / (2 * _DCT_SIZE)) for x in range(_DCT_SIZE)]
+    for u in range(8)
+]
+
+
+def _bits_to_hex(bits):
+    value = 0
+    for bit in bits:
+        value = (value << 1) | bit
+    return f'{value:016x}'
+
+
+def dhash(image):
+    """차분 해시: 9x8 흑백으로 줄여 가로로 이웃한 픽셀 밝기 비교 (64비트 hex)"""
+    pixels = list(image.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+    return _bits_to_hex(pixels[row * 9 + col] < pixels[row * 9 + col + 1] for row in range(8) for col in range(8))
+
+
+def phash(image):
+    """지각 해시: 32x32 흑백의 2차원 DCT 저주파 8x8 계수를 중앙값과 비교 (64비트 hex, 재압축/크기 변경에 강함)"""
+    pixels = list(image.convert('L').resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS).getdata())
+    rows = [pixels[y * _DCT_SIZE:(y + 1) * _DCT_SIZE] for y in range(_DCT_SIZE)]
+    # 행 방향 DCT(8계수) 후 열 방향 DCT(8계수)
+    row_dct = [[sum(c * p for c, p in zip(basis, row)) for basis in _DCT] for row in rows]
+    coeffs = [
+        sum(_DCT[u][y] * row_dct[y][v] for y in range(_DCT_SIZE))
+        for u in range(8) for v in range(8)
+    ]
+    median = sorted(coeffs[1:])[len(coeffs[1:]) // 2]  # DC 성분(평균 밝기)은 제외
+    return _bits_to_hex(c > median for c in coeffs)
+
+
+def render_derivatives(source_path, media_root, digest, sizes, formats, quality):
+    """
+    원본을 디코딩해 크기/형식별 파생본 저장 (프로세스 풀에서 실행 — ORM/설정에 접근하지 않음)
+    - EXIF 회전 반영 후 메타데이터 없이 저장, 원본보다 크게 늘리지 않음
+    - 반환: (width, height, {'thumb': {'webp': 경로, ...}, ...}, phash, dhash), 디코딩 실패 시 예외
+    """
+    with Image.open(source_path) as original:
+        original.load()
+        image = ImageOps.exif_transpose(original)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    derivatives = {}
+    for size_name, max_side in sizes.items():
+        resized = image.copy()
+        resized.thumbnail((max_side, max_side), Image.LANCZOS)
+        derivatives[size_name] = {}
+        for fmt in formats:
+            pil_format, _ = FORMATS[fmt]
+            # JPEG은 투명도가 없으므로 흰 배경에 합성
+            output = resized
+            if pil_format == 'JPEG' and resized.mode == 'RGBA':
+                output = Image.new('RGB', resized.size, (255, 255, 255))
+                output.paste(resized, mask=resized.getchannel('A'))
+            name = derivative_name(digest, size_name, fmt)
+            path = os.path.join(media_root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.tmp'
+            output.save(tmp_path, pil_format, quality=quality, optimize=pil_format == 'JPEG')
+            os.replace(tmp_path, path)
+            derivatives[size_name][fmt] = name
+    return image.width, image.height, derivatives, phash(image), dhash(image)
+
+
+def requeue_stale_blobs():
+    """워커가 죽어서 processing으로 남은 이미지를 다시 대기 상태로"""
+    cutoff = timezone.now() - timezone.timedelta(seconds=settings.IMAGE_WORKER_TIMEOUT)
+    return ImageBlob.objects.filter(status=ImageBlob.STATUS_PROCESSING, claimed_at__lt=cutoff).update(
+        status=ImageBlob.STATUS_PENDING,
+    )
+
+
+def claim_pending_blobs(limit):
+    """대기 중인 blob을 processing으로 선점 (조건부 UPDATE — 워커 여러 개가 같은 blob을 처리하지 않음)"""
+    claimed = []
+    candidates = ImageBlob.objects.filter(status=ImageBlob.STATUS_PENDING).order_by('id')
+    for blob in candidates[:limit]:
+        if ImageBlob.objects.filter(pk=blob.pk, status=ImageBlob.STATUS_PENDING).update(
+            status=ImageBlob.STATUS_PROCESSING, claimed_at=timezone.now(),
+        ):
+            claimed.append(blob)
+    return claimed
+
+
+def _capture(fn, *args):
+    try:
+        return fn(*args), None
+    except Exception as e:
+        return None, e
+
+
+def process_blobs(blobs, executor=None):
+    """
+    선점한 blob들의 파생본 생성 후 결과 저장
+    - executor(ProcessPoolExecutor 등)가 있으면 병렬, 없으면 현재 프로세스에서 순서대로
+    """
+    args = [
+        (blob.file.path, str(settings.MEDIA_ROOT), blob.sha256, settings.IMAGE_DERIVATIVE_SIZES,
+         settings.IMAGE_DERIVATIVE_FORMATS, settings.IMAGE_DERIVATIVE_QUALITY)
+        for blob in blobs
+    ]
+    if executor is None:
+        outcomes = [_capture(render_derivatives, *a) for a in args]
+    else:
+        futures = [executor.submit(render_derivatives, *a) for a in args]
+        outcomes = [_capture(future.result) for future in futures]
+
+    for blob, (result, error) in zip(blobs, outcomes):
+        if error is None:
+            blob.width, blob.height, blob.derivatives, blob.phash, blob.dhash = result
+            blob.status = ImageBlob.STATUS_READY
+            blob.error = ''
+        else:
+            logger.warning('Derivative generation failed for blob %s: %s', blob.pk, error)
+            blob.status = ImageBlob.STATUS_FAILED
+            blob.error = str(error)
+        blob.processed_at = timezone.now()
+        # 처리 중 참조가 모두 해제되어 삭제됐을 수 있으므로 행이 남아 있을 때만 갱신
+        ImageBlob.objects.filter(pk=blob.pk).update(
+            status=blob.status, width=blob.width, height=blob.height, derivatives=blob.derivatives,
+            phash=blob.phash, dhash=blob.dhash, error=blob.error, processed_at=blob.processed_at,
+        )
+
+    if settings.IMAGE_RECOGNITION_ENABLED:
+        for blob in blobs:
+            if blob.status == ImageBlob.STATUS_READY:
+                recognize_blob(blob)
+    return blobs
+
+
+def derivative_urls(blob):
+    """응답용 파생본 URL ({'thumb': {'webp': url, 'jpeg': url}, ...}), 아직 없으면 None"""
+    if blob is None or blob.status != ImageBlob.STATUS_READY:
+        return None
+    return {
+        size_name: {fmt: image_storage.url(name) for fmt, name in formats.items()}
+        for size_name, formats in blob.derivatives.items()
+    }
+
+
+def recognition_result(blob):
+    """응답용 음식 인식 결과 ({'foods': [...], 'description': ...}), 없으면 None"""
+    if blob is None or not blob.recognition_id:
+        return None
+    return blob.recognition.result
+
+
+def image_payload(image):
+    """image_analyze/hybrid_analyze 응답의 이미지 항목"""
+    return {
+        'id': image.id,
+        'image': image.image.url if hasattr(image.image, 'url') else str(image.image),
+        'status': image.blob.status if image.blob_id else None,
+        'derivatives': derivative_urls(image.blob) if image.blob_id else None,
+        'recognition': recognition_result(image.blob) if image.blob_id else None,
+        'note': image.note,
+        'date': image.date.isoformat(),
+        'created_at': image.created_at.isoformat(),
+    }
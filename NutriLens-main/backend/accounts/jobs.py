@@ -0,0 +1,83 @@
+import logging
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .evaluation import evaluate_day, NoIntakeRecords, EvaluationError
+from .models import EvaluationJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_evaluation(user, target_date):
+    """
+    평가 작업 등록 — 같은 (사용자, 사업일자)의 대기 중인 작업이 있으면 그 작업을 반환 (연타/재시도 합치기)
+    - 이미 실행 중인 작업은 이후 추가된 기록을 못 볼 수 있으므로 새 작업을 만듦 (실행은 singleflight로 순서대로)
+    """
+    queued = EvaluationJob.objects.filter(
+        user=user, date=target_date, status=EvaluationJob.STATUS_QUEUED,
+    ).order_by('created_at').first()
+    return queued or EvaluationJob.objects.create(user=user, date=target_date)
+
+
+def requeue_stale_jobs():
+    """
+    워커가 죽어서 running 상태로 남은 작업 복구
+    - EVAL_JOB_TIMEOUT(초) 이상 지난 작업은 다시 대기열로, 재시도 한도를 넘으면 실패 처리
+    """
+    cutoff = timezone.now() - timezone.timedelta(seconds=settings.EVAL_JOB_TIMEOUT)
+    stale = EvaluationJob.objects.filter(status=EvaluationJob.STATUS_RUNNING, started_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=settings.EVAL_JOB_MAX_ATTEMPTS).update(
+        status=EvaluationJob.STATUS_FAILED,
+        error='Worker timed out.',
+        finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=EvaluationJob.STATUS_QUEUED)
+    return requeued, failed
+
+
+def claim_next_job():
+    """
+    가장 오래된 대기 작업을 running으로 선점
+    - 조건부 UPDATE로 선점하므로 워커 여러 개가 동시에 돌아도 한 작업은 한 번만 실행됨
+    """
+    while True:
+        job = EvaluationJob.objects.filter(status=EvaluationJob.STATUS_QUEUED).order_by('created_at').first()
+        if job is None:
+            return None
+        claimed = EvaluationJob.objects.filter(pk=job.pk, status=EvaluationJob.STATUS_QUEUED).update(
+            status=EvaluationJob.STATUS_RUNNING,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def run_job(job):
+    try:
+        history, raw_answer = evaluate_day(job.user, job.date)
+    except (NoIntakeRecords, EvaluationError) as e:
+        job.status = EvaluationJob.STATUS_FAILED
+        job.error = str(e)
+        job.raw_response = getattr(e, 'raw', None) or ''
+    except Exception as e:
+        logger.exception('Evaluation job %s crashed', job.pk)
+        job.status = EvaluationJob.STATUS_FAILED
+        job.error = str(e)
+    else:
+        job.status = EvaluationJob.STATUS_DONE
+        job.history = history
+        job.raw_response = raw_answer or ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'raw_response', 'history', 'finished_at'])
+    return job
+
+
+def process_next_job():
+    job = claim_next_job()
+    if job is None:
+        return None
+    return run_job(job)
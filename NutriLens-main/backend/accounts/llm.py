@@ -0,0 +1,433 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+
+from . import metrics
+
+try:
+    import httpx
+except ImportError:  # 선택 의존성 — 없으면 OpenAIClient.achat도 스레드에서 requests로 호출
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """모델 호출 실패 (재시도 후에도 실패했거나 재시도할 수 없는 오류)"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMResponse:
+    def __init__(self, content, usage=None, latency_ms=0, model=''):
+        self.content = content
+        self.usage = usage or {}
+        self.latency_ms = latency_ms
+        self.model = model
+
+    @property
+    def total_tokens(self):
+        return self.usage.get('total_tokens', 0)
+
+
+class LLMStream:
+    """
+    스트리밍 응답: 반복하면 텍스트 조각(delta)을 도착 순서대로 반환
+    - 반복이 끝나면 response에 전체 내용/토큰 사용량(LLMResponse)이 채워짐
+    """
+
+    def __init__(self, chunks, model):
+        self._chunks = chunks  # (delta, usage 또는 None) 반복자
+        self.model = model
+        self.response = None
+
+    def __iter__(self):
+        started = time.monotonic()
+        parts = []
+        usage = None
+        try:
+            for delta, chunk_usage in self._chunks:
+                if chunk_usage:
+                    usage = chunk_usage
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            metrics.record_llm_call(self.model, 'stream', error=e)
+            raise
+        self.response = LLMResponse(
+            content=''.join(parts),
+            usage=usage,
+            latency_ms=int((time.monotonic() - started) * 1000),
+            model=self.model,
+        )
+        metrics.record_llm_call(self.model, 'stream', response=self.response)
+
+
+def observed(kind):
+    """
+    chat/stream_chat 호출을 accounts.metrics에 기록 (async 메서드도 가능)
+    - stream: 연결 단계 실패만 여기서, 완료/중단은 LLMStream 반복이 끝날 때 기록
+    """
+    def decorator(method):
+        def record(self, model, result=None, error=None):
+            if error is not None:
+                metrics.record_llm_call(model or self.model, kind, error=error)
+            elif kind == 'chat':
+                metrics.record_llm_call(result.model, kind, response=result)
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, messages, model=None, timeout=None):
+                try:
+                    result = await method(self, messages, model=model, timeout=timeout)
+                except Exception as e:
+                    record(self, model, error=e)
+                    raise
+                record(self, model, result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, messages, model=None, timeout=None):
+            try:
+                result = method(self, messages, model=model, timeout=timeout)
+            except Exception as e:
+                record(self, model, error=e)
+                raise
+            record(self, model, result)
+            return result
+        return wrapper
+    return decorator
+
+
+class BaseLLMClient:
+    def chat(self, messages, model=None, timeout=None):
+        """messages(OpenAI chat 형식)를 보내고 LLMResponse 반환"""
+        raise NotImplementedError
+
+    def stream_chat(self, messages, model=None, timeout=None):
+        """messages를 보내고 토큰 단위로 받는 LLMStream 반환"""
+        raise NotImplementedError
+
+    async def achat(self, messages, model=None, timeout=None):
+        """chat의 async 버전 — 기본 구현은 별도 스레드에서 chat 실행 (async 구현이 없는 백엔드용)"""
+        return await sync_to_async(self.chat, thread_sensitive=False)(messages, model=model, timeout=timeout)
+
+
+class OpenAIClient(BaseLLMClient):
+    """
+    OpenAI Chat Completions HTTP 클라이언트
+    - 프로세스 단위로 재사용하는 커넥션 풀(requests.Session)
+    - 호출별 connect/read 타임아웃
+    - 429/5xx/네트워크 오류는 지수 백오프 + full jitter로 재시도 (Retry-After 우선)
+    - achat: httpx가 설치되어 있으면 httpx.AsyncClient (연결 async_pool_size개), 없으면 스레드에서 chat
+    """
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, api_key, model, base_url='https://api.openai.com/v1', timeout=30.0, connect_timeout=5.0,
+                 max_retries=3, backoff_base=0.5, backoff_max=8.0, pool_size=10, async_pool_size=100):
+        self.api_key = api_key
+        self.model = model
+        self.url = f"{base_url.rstrip('/')}/chat/completions"
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Authorization': f'Bearer {api_key}'})
+
+        self.async_pool_size = async_pool_size
+        self._async_client = None
+        self._async_loop = None
+        self._async_closer = None
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _response_error(self, status_code, text):
+        """200이 아닌 응답 → LLMError (재시도할 상태가 아니면 바로 raise)"""
+        error = LLMError(f'OpenAI returned {status_code}: {text[:200]}', status_code=status_code)
+        if status_code not in self.RETRY_STATUS:
+            raise error
+        return error
+
+    def _retry_delay(self, attempt, error, retry_after=None):
+        """다음 시도까지 기다릴 시간(초) — 재시도 횟수를 다 썼으면 error를 raise"""
+        if attempt >= self.max_retries:
+            raise error
+        delay = self._backoff(attempt, retry_after)
+        logger.warning('LLM call failed (%s), retrying in %.2fs', error, delay)
+        return delay
+
+    def _post(self, payload, timeout=None, stream=False):
+        """응답 헤더를 받을 때까지 재시도 (스트리밍은 첫 바이트 이후로는 재시도하지 않음)"""
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                res = self.session.post(
+                    self.url, json=payload, stream=stream, timeout=(self.connect_timeout, timeout or self.timeout),
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = LLMError(f'OpenAI request failed: {e}')
+            else:
+                if res.status_code == 200:
+                    return res
+                error = self._response_error(res.status_code, res.text)
+                retry_after = res.headers.get('Retry-After')
+
+            time.sleep(self._retry_delay(attempt, error, retry_after))
+            attempt += 1
+
+    def _async_session(self):
+        # httpx.AsyncClient는 만든 이벤트 루프에서만 쓸 수 있음 — 루프가 바뀌면(async_to_sync 호출 등) 새로 생성
+        # 이전 클라이언트는 그 루프의 닫기 task를 취소해 그 루프에서 aclose (이미 닫힌 루프면 종료 때 닫혔음)
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            if self._async_closer is not None:
+                try:
+                    self._async_loop.call_soon_threadsafe(self._async_closer.cancel)
+                except RuntimeError:
+                    pass
+            client = httpx.AsyncClient(
+                headers={'Authorization': f'Bearer {self.api_key}'},
+                limits=httpx.Limits(
+                    max_connections=self.async_pool_size, max_keepalive_connections=self.async_pool_size,
+                ),
+            )
+            self._async_closer = loop.create_task(self._close_when_cancelled(client))
+            self._async_client, self._async_loop = client, loop
+        return self._async_client
+
+    @staticmethod
+    async def _close_when_cancelled(client):
+        # 루프가 끝날 때(asyncio.run은 남은 task를 취소) 또는 다른 루프용 클라이언트로 바뀔 때 연결 정리
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            await client.aclose()
+
+    async def _apost(self, payload, timeout=None):
+        """_post의 async 버전 (httpx) — 재시도 대기도 asyncio.sleep"""
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                res = await self._async_session().post(
+                    self.url, json=payload, timeout=httpx.Timeout(timeout or self.timeout, connect=self.connect_timeout),
+                )
+            except httpx.TransportError as e:
+                error = LLMError(f'OpenAI request failed: {e}')
+            else:
+                if res.status_code == 200:
+                    return res
+                error = self._response_error(res.status_code, res.text)
+                retry_after = res.headers.get('Retry-After')
+
+            await asyncio.sleep(self._retry_delay(attempt, error, retry_after))
+            attempt += 1
+
+    def _chat_response(self, data, payload, started):
+        return LLMResponse(
+            content=data['choices'][0]['message']['content'],
+            usage=data.get('usage'),
+            latency_ms=int((time.monotonic() - started) * 1000),
+            model=data.get('model', payload['model']),
+        )
+
+    @observed('chat')
+    def chat(self, messages, model=None, timeout=None):
+        payload = {'model': model or self.model, 'messages': messages}
+        started = time.monotonic()
+        return self._chat_response(self._post(payload, timeout).json(), payload, started)
+
+    async def achat(self, messages, model=None, timeout=None):
+        if httpx is None:
+            return await super().achat(messages, model=model, timeout=timeout)
+        return await self._achat(messages, model=model, timeout=timeout)
+
+    @observed('chat')
+    async def _achat(self, messages, model=None, timeout=None):
+        payload = {'model': model or self.model, 'messages': messages}
+        started = time.monotonic()
+        res = await self._apost(payload, timeout)
+        return self._chat_response(res.json(), payload, started)
+
+    @observed('stream')
+    def stream_chat(self, messages, model=None, timeout=None):
+        payload = {
+            'model': model or self.model,
+            'messages': messages,
+            'stream': True,
+            'stream_options': {'include_usage': True},
+        }
+        res = self._post(payload, timeout, stream=True)
+        return LLMStream(self._stream_chunks(res), payload['model'])
+
+    def _stream_chunks(self, res):
+        # SSE: "data: {chunk}" 줄 단위, 마지막은 "data: [DONE]"
+        res.encoding = 'utf-8'
+        try:
+            with res:
+                for line in res.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data: '):
+                        continue
+                    data = line[len('data: '):]
+                    if data == '[DONE]':
+                        break
+                    chunk = json.loads(data)
+                    choices = chunk.get('choices') or []
+                    delta = (choices[0].get('delta') or {}).get('content') if choices else None
+                    yield delta or '', chunk.get('usage')
+        except requests.RequestException as e:
+            raise LLMError(f'OpenAI stream interrupted: {e}') from e
+
+
+# 가짜 백엔드 기본 응답 (evaluate 프롬프트의 JSON 형식)
+FAKE_EVALUATION = {
+    'macro': {
+        'score': 7, 'reason': 'Reasonable balance of carbohydrates, protein and fat.',
+        'advice': 'Add a serving of vegetables to lunch.', 'carbs_g': 230, 'protein_g': 75, 'fat_g': 60,
+    },
+    'disease': {
+        'score': 8, 'reason': 'No foods that conflict with the listed conditions.',
+        'advice': 'Keep sodium intake moderate.',
+    },
+    'goal': {
+        'score': 6, 'reason': 'Total intake is slightly above the goal.',
+        'advice': 'Replace one snack with fruit.',
+    },
+}
+
+
+class FakeLLMClient(BaseLLMClient):
+    """
+    네트워크 없이 동작하는 결정적 가짜 백엔드 (부하 테스트/개발용)
+    - 항상 같은 응답(response 또는 FAKE_EVALUATION)을 반환, latency(초)만큼 지연
+    - 받은 메시지는 최근 max_requests개만 requests에 남김 (테스트에서 확인용, 부하 테스트 중 메모리가 늘지 않도록)
+    """
+
+    def __init__(self, model='fake', response=None, latency=0.0, max_requests=100):
+        self.model = model
+        self.response = response if response is not None else json.dumps(FAKE_EVALUATION)
+        self.latency = latency
+        self.requests = deque(maxlen=max_requests)
+
+    def _usage(self, messages):
+        # content가 [{'type': 'text', ...}, {'type': 'image_url', ...}] 형식이면 텍스트만 계산
+        prompt_chars = sum(
+            len(m['content']) if isinstance(m['content'], str)
+            else sum(len(part.get('text', '')) for part in m['content'])
+            for m in messages
+        )
+        return {
+            'prompt_tokens': prompt_chars // 4,
+            'completion_tokens': len(self.response) // 4,
+            'total_tokens': prompt_chars // 4 + len(self.response) // 4,
+        }
+
+    def _response(self, messages, model):
+        return LLMResponse(
+            content=self.response,
+            usage=self._usage(messages),
+            latency_ms=int(self.latency * 1000),
+            model=model or self.model,
+        )
+
+    @observed('chat')
+    def chat(self, messages, model=None, timeout=None):
+        self.requests.append(messages)
+        if self.latency:
+            time.sleep(self.latency)
+        return self._response(messages, model)
+
+    @observed('chat')
+    async def achat(self, messages, model=None, timeout=None):
+        self.requests.append(messages)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._response(messages, model)
+
+    @observed('stream')
+    def stream_chat(self, messages, model=None, timeout=None):
+        self.requests.append(messages)
+        return LLMStream(self._stream_chunks(messages), model or self.model)
+
+    def _stream_chunks(self, messages, chunk_size=16):
+        # latency를 조각 수만큼 나눠 토큰이 흘러오는 것처럼 지연
+        pieces = [self.response[i:i + chunk_size] for i in range(0, len(self.response), chunk_size)] or ['']
+        for piece in pieces:
+            if self.latency:
+                time.sleep(self.latency / len(pieces))
+            yield piece, None
+        yield '', self._usage(messages)
+
+
+BACKENDS = {
+    'openai': 'accounts.llm.OpenAIClient',
+    'fake': 'accounts.llm.FakeLLMClient',
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _build_client():
+    backend = settings.LLM_BACKEND
+    client_class = import_string(BACKENDS.get(backend, backend))
+    if client_class is FakeLLMClient:
+        return FakeLLMClient(response=settings.LLM_FAKE_RESPONSE, latency=settings.LLM_FAKE_LATENCY)
+    return client_class(
+        api_key=settings.OPENAI_API_KEY,
+        model=settings.LLM_MODEL,
+        timeout=settings.LLM_TIMEOUT,
+        connect_timeout=settings.LLM_CONNECT_TIMEOUT,
+        max_retries=settings.LLM_MAX_RETRIES,
+        pool_size=settings.LLM_POOL_SIZE,
+        async_pool_size=settings.LLM_ASYNC_POOL_SIZE,
+    )
+
+
+def get_client():
+    """설정(LLM_BACKEND)에 따른 프로세스 공용 클라이언트"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+@receiver(setting_changed)
+def _reset_client(setting, **kwargs):
+    # override_settings 등으로 LLM/OpenAI 설정이 바뀌면 다음 호출 때 다시 생성
+    global _client
+    if setting.startswith('LLM_') or setting == 'OPENAI_API_KEY':
+        _client = None
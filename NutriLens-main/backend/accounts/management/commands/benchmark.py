@@ -0,0 +1,27 @@
+import pkgutil
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+
+import accounts.benchmarks
+
+
+def _available():
+    return sorted(m.name for m in pkgutil.iter_modules(accounts.benchmarks.__path__))
+
+
+class Command(BaseCommand):
+    help = 'accounts.benchmarks 의 벤치마크 실행 (임시 DB 사용)'
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='name', required=True)
+        for name in _available():
+            module = import_module(f'accounts.benchmarks.{name}')
+            subparser = subparsers.add_parser(name, help=(module.__doc__ or '').strip().splitlines()[0])
+            module.add_arguments(subparser)
+
+    def handle(self, *args, **options):
+        name = options['name']
+        if name not in _available():
+            raise CommandError(f'Unknown benchmark {name!r}. Available: {", ".join(_available())}')
+        import_module(f'accounts.benchmarks.{name}').run(self.stdout, options)
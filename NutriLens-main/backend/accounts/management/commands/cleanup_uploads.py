@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from accounts.uploads import expire_sessions
+
+
+class Command(BaseCommand):
+    help = 'UPLOAD_SESSION_TTL 동안 갱신되지 않은 이어받기 업로드 세션과 임시 파일 삭제'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Removed {expire_sessions()} expired upload session(s).')
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import IntakeImage, ImageBlob
+from accounts.storage import image_storage
+
+
+class Command(BaseCommand):
+    help = '기존 업로드(intake_images/...)를 내용 해시 blob으로 옮기고 중복 파일 삭제'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='옮기지 않고 대상 개수만 출력')
+
+    def handle(self, *args, **options):
+        legacy = IntakeImage.objects.filter(blob__isnull=True).exclude(image='').order_by('id')
+        if options['dry_run']:
+            self.stdout.write(f'{legacy.count()} legacy image(s) to migrate.')
+            return
+
+        migrated, missing, freed = 0, 0, 0
+        for image in legacy.iterator():
+            old_name = image.image.name
+            if not image_storage.exists(old_name):
+                missing += 1
+                self.stderr.write(f'Image {image.id}: file {old_name} not found, skipped.')
+                continue
+
+            size = image_storage.size(old_name)
+            with image_storage.open(old_name) as fp:
+                new_name = image_storage.save(old_name, fp)
+            with transaction.atomic():
+                blob = ImageBlob.acquire(new_name, size)
+                IntakeImage.objects.filter(pk=image.pk).update(image=new_name, blob=blob)
+            migrated += 1
+
+            # 같은 경로를 가리키는 다른 행이 없으면 원본 파일 삭제
+            if not IntakeImage.objects.filter(image=old_name).exists():
+                image_storage.delete(old_name)
+                freed += size
+
+        blobs = ImageBlob.objects.count()
+        self.stdout.write(
+            f'Migrated {migrated} image(s) into {blobs} blob(s), {missing} missing, '
+            f'{freed / 1024:.1f} KiB of legacy files removed.'
+        )
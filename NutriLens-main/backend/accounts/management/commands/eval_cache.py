@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from accounts import evaluation_cache
+
+
+class Command(BaseCommand):
+    help = '평가 결과 캐시 적중률/절감량 확인 및 정리'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--evict', action='store_true', help='만료 항목과 최대 개수 초과 항목 삭제')
+        parser.add_argument('--clear', action='store_true', help='캐시와 카운터 전체 초기화')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            evaluation_cache.clear()
+            self.stdout.write('Evaluation cache cleared.')
+        elif options['evict']:
+            removed = evaluation_cache.evict()
+            self.stdout.write(f'Evicted {removed} entries.')
+
+        for name, value in evaluation_cache.stats().items():
+            self.stdout.write(f'{name:>14}: {value}')
@@ -0,0 +1,209 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date as date_cls, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.db.models.functions import Length
+
+from accounts.evaluation import evaluate_day, NoIntakeRecords, EvaluationError
+from accounts.models import IntakeRecord, business_date
+from accounts.prompting import count_tokens, SYSTEM_PROMPT
+from accounts.ratelimit import TokenBucket
+
+CustomUser = get_user_model()
+
+# 요청당 토큰 추정: 고정 지시문 + 프로필(약 150토큰) + 섭취 텍스트(4자/토큰, 프롬프트 예산까지), 응답은 고정값
+PROMPT_OVERHEAD_TOKENS = count_tokens(SYSTEM_PROMPT) + 150
+COMPLETION_TOKENS = 350
+
+
+def estimate_tokens(intake_chars):
+    return min(PROMPT_OVERHEAD_TOKENS + intake_chars // 4, settings.EVAL_PROMPT_MAX_TOKENS) + COMPLETION_TOKENS
+
+
+class Checkpoint:
+    """
+    처리 진행 상황 파일
+    - last_user_id: 이 id 이하 사용자는 모두 처리 완료 (동시 처리 중 순서가 섞여도 연속 구간만 인정)
+    - failed: 실패한 사용자 — --resume 시 먼저 다시 시도하고, 성공할 때까지 목록에 남김
+    """
+
+    def __init__(self, path, target_date):
+        self.path = path
+        self.target_date = str(target_date)
+        self.last_user_id = 0
+        self.failed = []
+        self._pending = deque()
+        self._finished = set()
+
+    def load(self):
+        with open(self.path, encoding='utf-8') as fp:
+            data = json.load(fp)
+        if data.get('date') != self.target_date:
+            raise CommandError(f"Checkpoint {self.path} is for {data.get('date')}, not {self.target_date}.")
+        self.last_user_id = data.get('last_user_id', 0)
+        self.failed = data.get('failed', [])
+
+    def submitted(self, user_id):
+        self._pending.append(user_id)
+
+    def finished(self, user_id, ok):
+        self._finished.add(user_id)
+        if ok and user_id in self.failed:
+            self.failed.remove(user_id)
+        elif not ok and user_id not in self.failed:
+            self.failed.append(user_id)
+        while self._pending and self._pending[0] in self._finished:
+            done = self._pending.popleft()
+            self._finished.discard(done)
+            # 재시도한 실패 사용자는 last_user_id보다 앞이므로 뒤로 돌리지 않음
+            self.last_user_id = max(self.last_user_id, done)
+
+    def save(self):
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fp:
+            json.dump({'date': self.target_date, 'last_user_id': self.last_user_id, 'failed': self.failed}, fp)
+        os.replace(tmp_path, self.path)
+
+
+class Command(BaseCommand):
+    help = '섭취 기록은 있지만 DailyHistory가 없는 사용자를 일괄 평가 (기본: 전 사업일자)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date_cls.fromisoformat, help='평가할 사업일자 (YYYY-MM-DD)')
+        parser.add_argument('--concurrency', type=int, default=settings.EVAL_BULK_CONCURRENCY)
+        parser.add_argument('--rpm', type=int, default=settings.EVAL_BULK_REQUESTS_PER_MINUTE, help='분당 요청 수 한도')
+        parser.add_argument('--tpm', type=int, default=settings.EVAL_BULK_TOKENS_PER_MINUTE, help='분당 토큰 수 한도')
+        parser.add_argument('--checkpoint', help='진행 상황 파일 경로 (기본: evaluate_all-<date>.checkpoint.json)')
+        parser.add_argument('--resume', action='store_true', help='체크포인트의 실패 사용자, 이후 사용자 순으로 이어서 처리')
+        parser.add_argument('--checkpoint-every', type=int, default=50, help='체크포인트 저장 주기(완료 사용자 수)')
+        parser.add_argument('--limit', type=int, default=0, help='처리할 최대 사용자 수 (0 = 무제한)')
+
+    def handle(self, *args, **options):
+        if options['rpm'] <= 0 or options['tpm'] <= 0:
+            raise CommandError('--rpm and --tpm must be greater than 0.')
+        target_date = options['date'] or business_date() - timedelta(days=1)
+        checkpoint = Checkpoint(
+            options['checkpoint'] or str(settings.BASE_DIR / f'evaluate_all-{target_date}.checkpoint.json'),
+            target_date,
+        )
+        if options['resume'] and os.path.exists(checkpoint.path):
+            checkpoint.load()
+            self.stdout.write(
+                f'Resuming after user {checkpoint.last_user_id}, retrying {len(checkpoint.failed)} failed user(s).'
+            )
+
+        self.request_bucket = TokenBucket(options['rpm'])
+        self.token_bucket = TokenBucket(options['tpm'])
+        self.target_date = target_date
+
+        counts = {'succeeded': 0, 'failed': 0, 'skipped': 0}
+        latencies = []
+        started = time.monotonic()
+        max_in_flight = options['concurrency'] * 2
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            in_flight = {}
+            pending = self._pending_users(checkpoint.last_user_id, options['limit'], retry=list(checkpoint.failed))
+            for user_id, intake_chars in pending:
+                # 제출 대기열을 제한해 수만 명이어도 메모리 사용량이 일정하도록
+                while len(in_flight) >= max_in_flight:
+                    self._collect(wait(in_flight, return_when=FIRST_COMPLETED).done, in_flight, checkpoint,
+                                  counts, latencies, options['checkpoint_every'])
+                checkpoint.submitted(user_id)
+                in_flight[executor.submit(self._evaluate_user, user_id, intake_chars)] = user_id
+
+            while in_flight:
+                self._collect(wait(in_flight, return_when=FIRST_COMPLETED).done, in_flight, checkpoint,
+                              counts, latencies, options['checkpoint_every'])
+
+        checkpoint.save()
+        self._summary(target_date, counts, latencies, time.monotonic() - started)
+
+    def _pending_users(self, after_user_id, limit, retry=()):
+        """(user_id, 섭취 텍스트 길이) — retry(이전 실행의 실패 사용자) 먼저, 이후 id 순으로 배치 조회"""
+        users = (
+            CustomUser.objects
+            .filter(intakerecord__date=self.target_date)
+            .exclude(dailyhistory__date=self.target_date)
+            .values_list('id', flat=True)
+            .distinct()
+            .order_by('id')
+        )
+        batch_size = 1000
+
+        def batches():
+            # 그 사이 평가된 실패 사용자는 위 조건에서 빠짐
+            for i in range(0, len(retry), batch_size):
+                yield list(users.filter(id__in=retry[i:i + batch_size]))
+            after = after_user_id
+            while True:
+                batch = list(users.filter(id__gt=after)[:batch_size])
+                if not batch:
+                    return
+                yield batch
+                after = batch[-1]
+
+        yielded = 0
+        for batch in batches():
+            sizes = dict(
+                IntakeRecord.objects
+                .filter(user_id__in=batch, date=self.target_date)
+                .values_list('user_id')
+                .annotate(chars=Sum(Length('content')))
+            )
+            for user_id in batch:
+                yield user_id, sizes.get(user_id) or 0
+                yielded += 1
+                if limit and yielded >= limit:
+                    return
+
+    def _evaluate_user(self, user_id, intake_chars):
+        self.request_bucket.acquire(1)
+        self.token_bucket.acquire(estimate_tokens(intake_chars))
+        started = time.monotonic()
+        try:
+            user = CustomUser.objects.get(pk=user_id)
+            evaluate_day(user, self.target_date)
+            return 'succeeded', time.monotonic() - started, None
+        except NoIntakeRecords:
+            return 'skipped', time.monotonic() - started, None
+        except (EvaluationError, CustomUser.DoesNotExist) as e:
+            return 'failed', time.monotonic() - started, str(e)
+        finally:
+            # 스레드별 DB 연결 정리
+            connection.close()
+
+    def _collect(self, done, in_flight, checkpoint, counts, latencies, checkpoint_every):
+        for future in done:
+            user_id = in_flight.pop(future)
+            try:
+                outcome, elapsed, error = future.result()
+            except Exception as e:
+                outcome, elapsed, error = 'failed', 0.0, str(e)
+            counts[outcome] += 1
+            latencies.append(elapsed)
+            if error:
+                self.stderr.write(f'User {user_id}: {error}')
+            checkpoint.finished(user_id, outcome != 'failed')
+            if sum(counts.values()) % checkpoint_every == 0:
+                checkpoint.save()
+
+    def _summary(self, target_date, counts, latencies, elapsed):
+        total = sum(counts.values())
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] if latencies else 0.0
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+        self.stdout.write(
+            f'Evaluated {total} user(s) for {target_date} in {elapsed:.1f}s '
+            f'({total / elapsed if elapsed else 0:.2f} users/s): '
+            f"{counts['succeeded']} succeeded, {counts['failed']} failed, {counts['skipped']} skipped. "
+            f'Latency p50 {p50:.2f}s, p95 {p95:.2f}s.'
+        )
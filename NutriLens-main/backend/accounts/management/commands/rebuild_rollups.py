@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = 'DailyHistory에서 주/월 집계(HistoryRollup)를 다시 계산 (집계 도입 전 기록 반영, 어긋난 집계 복구)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help='이 사용자 id만 (여러 번 지정 가능)')
+
+    def handle(self, *args, **options):
+        count = rebuild(options['users'])
+        self.stdout.write(f'Rebuilt {count} rollup row(s).')
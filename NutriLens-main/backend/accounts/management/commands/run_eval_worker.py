@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.jobs import process_next_job, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = 'evaluate/ 요청으로 쌓인 평가 작업을 처리하는 로컬 워커'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='대기열을 비우면 종료')
+        parser.add_argument('--max-jobs', type=int, default=0, help='처리할 최대 작업 수 (0 = 무제한)')
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.EVAL_WORKER_POLL_INTERVAL,
+            help='대기열이 비었을 때 재조회 간격(초)',
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        last_recovery = 0.0
+        self.stdout.write('Evaluation worker started.')
+        try:
+            while not options['max_jobs'] or processed < options['max_jobs']:
+                close_old_connections()
+
+                if time.monotonic() - last_recovery > settings.EVAL_JOB_TIMEOUT:
+                    requeued, failed = requeue_stale_jobs()
+                    if requeued or failed:
+                        self.stdout.write(f'Recovered stale jobs: {requeued} requeued, {failed} failed.')
+                    last_recovery = time.monotonic()
+
+                job = process_next_job()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                processed += 1
+                self.stdout.write(f'Job {job.pk} ({job.user_id}, {job.date}): {job.status}')
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Evaluation worker stopped after {processed} job(s).')
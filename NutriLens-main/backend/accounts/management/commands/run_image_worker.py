@@ -0,0 +1,56 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.imaging import claim_pending_blobs, process_blobs, requeue_stale_blobs
+
+
+class Command(BaseCommand):
+    help = '업로드 이미지의 썸네일/중간 크기 파생본을 만드는 로컬 워커 (디코딩은 프로세스 풀에서)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='대기 중인 이미지를 모두 처리하면 종료')
+        parser.add_argument('--processes', type=int, default=settings.IMAGE_WORKER_PROCESSES,
+                            help='프로세스 수 (0 = 현재 프로세스에서 처리)')
+        parser.add_argument('--batch-size', type=int, default=settings.IMAGE_WORKER_BATCH_SIZE)
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.IMAGE_WORKER_POLL_INTERVAL,
+            help='대기 중인 이미지가 없을 때 재조회 간격(초)',
+        )
+
+    def handle(self, *args, **options):
+        executor = ProcessPoolExecutor(max_workers=options['processes']) if options['processes'] else None
+        processed = failed = 0
+        last_recovery = 0.0
+        self.stdout.write('Image worker started.')
+        try:
+            while True:
+                close_old_connections()
+
+                if time.monotonic() - last_recovery > settings.IMAGE_WORKER_TIMEOUT:
+                    requeued = requeue_stale_blobs()
+                    if requeued:
+                        self.stdout.write(f'Requeued {requeued} stale image(s).')
+                    last_recovery = time.monotonic()
+
+                blobs = claim_pending_blobs(options['batch_size'])
+                if not blobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                for blob in process_blobs(blobs, executor):
+                    processed += 1
+                    if blob.error:
+                        failed += 1
+                        self.stderr.write(f'Blob {blob.pk}: {blob.error}')
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self.stdout.write(f'Image worker stopped after {processed} image(s), {failed} failed.')
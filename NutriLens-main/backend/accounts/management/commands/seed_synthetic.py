@@ -0,0 +1,61 @@
+import os
+import time
+from datetime import date as date_cls
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser
+from accounts.synthetic import clear, populate
+
+
+class Command(BaseCommand):
+    help = '성능 측정용 합성 사용자/섭취 기록/평가 이력/사진 생성 (같은 --seed면 같은 데이터)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--days', type=int, default=180, help='사용자별 기록 기간(일)')
+        parser.add_argument('--end-date', type=date_cls.fromisoformat, help='마지막 사업일자 (기본: 어제)')
+        parser.add_argument('--seed', type=int, default=22)
+        parser.add_argument('--start', type=int, default=0, help='첫 사용자 index (이어서 더 만들 때)')
+        parser.add_argument('--prefix', default='synth', help='사용자 이름 접두어 (<prefix>-<index>)')
+        parser.add_argument('--password', help='모든 합성 계정 비밀번호 (기본: 로그인 불가)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='데이터 생성 프로세스 수')
+        parser.add_argument('--chunk-users', type=int, default=100, help='한 트랜잭션에 저장할 사용자 수')
+        parser.add_argument('--batch-size', type=int, default=2000, help='bulk_create 배치 크기')
+        parser.add_argument('--image-variants', type=int, default=8, help='자리표시 사진 종류 수 (0 = 사진 없음)')
+        parser.add_argument('--clear', action='store_true', help='같은 접두어의 기존 합성 사용자부터 삭제')
+        parser.add_argument('--force', action='store_true', help='DEBUG=False 환경에서도 실행')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Refusing to seed synthetic data with DEBUG=False (use --force).')
+
+        if options['clear']:
+            self.stdout.write(f"Deleted {clear(options['prefix'])} existing synthetic user(s).")
+        elif CustomUser.objects.filter(username__startswith=f"{options['prefix']}-").exists():
+            raise CommandError(f"Users named {options['prefix']}-* already exist (use --clear, --start or --prefix).")
+
+        started = time.monotonic()
+
+        def progress(totals, done):
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{done}/{options['users']} users, {totals['intake_records']} intake records "
+                f"({totals['intake_records'] / elapsed:.0f}/s), {totals['histories']} histories, "
+                f"{totals['images']} images"
+            )
+
+        totals, _ = populate(
+            options['users'], days=options['days'], seed=options['seed'], start=options['start'],
+            prefix=options['prefix'], end_date=options['end_date'], workers=options['workers'],
+            password=make_password(options['password']) if options['password'] else None,
+            users_per_chunk=options['chunk_users'], batch_size=options['batch_size'],
+            image_variants=options['image_variants'], progress=progress,
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"Seeded {totals['users']} users, {totals['intake_records']} intake records, "
+            f"{totals['histories']} histories and {totals['images']} images in {elapsed:.1f}s."
+        )
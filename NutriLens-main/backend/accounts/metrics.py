@@ -0,0 +1,173 @@
+"""
+요청/SQL/LLM/업로드 지표 — Prometheus 텍스트 형식으로 /metrics 에 노출
+- 프로세스 메모리에만 쌓임 (gunicorn 워커가 여러 개면 워커별 값, 재시작하면 0부터)
+- 요청 지표는 accounts.middleware.MetricsMiddleware, LLM 지표는 accounts.llm, 업로드 바이트는 업로드 뷰에서 기록
+"""
+import bisect
+import threading
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f'{self.name} expects labels {self.labels}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+            lines += [line for key, value in items for line in self._sample_lines(key, value)]
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _sample_lines(self, key, value):
+        return [f'{self.name}{_format_labels(self.labels, key)} {_format_number(value)}']
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [버킷별 개수(누적 아님)..., +Inf], 합계
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+
+    def _sample_lines(self, key, state):
+        counts, total = state
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            labels = _format_labels(self.labels, key, [('le', _format_number(bound))])
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labels, key)
+        lines.append(f'{self.name}_sum{labels} {_format_number(float(total))}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def clear(self):
+        for metric in self._metrics:
+            metric.clear()
+
+    def expose(self):
+        return '\n'.join(line for metric in self._metrics for line in metric.expose()) + '\n'
+
+
+registry = Registry()
+
+# --- HTTP 요청 (route: URL 패턴 — 경로 값 대신 패턴으로 묶어 라벨 수 제한) ---
+HTTP_REQUESTS = registry.register(Counter(
+    'nutrilens_http_requests_total', 'HTTP requests by route, method and status.', ('route', 'method', 'status'),
+))
+HTTP_LATENCY = registry.register(Histogram(
+    'nutrilens_http_request_duration_seconds', 'Time until the view returned a response.', ('route', 'method'),
+))
+DB_QUERIES = registry.register(Histogram(
+    'nutrilens_http_request_db_queries', 'SQL queries executed per request.', ('route',), buckets=QUERY_COUNT_BUCKETS,
+))
+DB_TIME = registry.register(Histogram(
+    'nutrilens_http_request_db_seconds', 'Time spent in SQL per request.', ('route',),
+))
+
+# --- LLM 호출 (kind: chat/stream) ---
+LLM_REQUESTS = registry.register(Counter(
+    'nutrilens_llm_requests_total', 'LLM calls by outcome.', ('model', 'kind', 'outcome'),
+))
+LLM_LATENCY = registry.register(Histogram(
+    'nutrilens_llm_request_duration_seconds', 'LLM call latency (successful calls).', ('model', 'kind'),
+))
+LLM_TOKENS = registry.register(Counter(
+    'nutrilens_llm_tokens_total', 'Tokens reported by the LLM provider.', ('model', 'type'),
+))
+
+# --- 업로드 (kind: multipart/chunked) ---
+UPLOAD_BYTES = registry.register(Counter(
+    'nutrilens_upload_bytes_total', 'Image bytes received.', ('kind',),
+))
+UPLOAD_FILES = registry.register(Counter(
+    'nutrilens_upload_files_total', 'Image files received.', ('kind',),
+))
+
+
+def record_llm_call(model, kind, response=None, error=None):
+    """LLM 호출 한 번 기록 — 성공이면 response(LLMResponse), 실패면 error"""
+    model = model or 'unknown'
+    if error is not None:
+        LLM_REQUESTS.inc(model=model, kind=kind, outcome='error')
+        return
+    LLM_REQUESTS.inc(model=model, kind=kind, outcome='ok')
+    LLM_LATENCY.observe(response.latency_ms / 1000, model=model, kind=kind)
+    for name in ('prompt', 'completion'):
+        tokens = response.usage.get(f'{name}_tokens')
+        if tokens:
+            LLM_TOKENS.inc(tokens, model=model, type=name)
+
+
+def record_upload(kind, sizes):
+    sizes = list(sizes)
+    UPLOAD_FILES.inc(len(sizes), kind=kind)
+    UPLOAD_BYTES.inc(sum(sizes), kind=kind)
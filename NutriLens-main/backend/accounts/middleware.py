@@ -0,0 +1,108 @@
+import contextvars
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger('accounts.metrics')
+
+
+class QueryStats:
+    """요청 중 실행된 SQL 수/시간 (느린 요청 로그용으로 문장별 시간도 보관)"""
+
+    MAX_STATEMENTS = 500
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            if len(self.statements) < self.MAX_STATEMENTS:
+                self.statements.append((elapsed, sql))
+
+
+# 지금 요청의 QueryStats — ASGI에서는 async 뷰의 SQL이 sync_to_async 스레드(다른 요청과 공유)의 연결에서
+# 실행되므로 연결별 execute_wrapper 대신 contextvar로 요청을 구분 (sync_to_async는 context를 넘겨줌)
+_current_queries = contextvars.ContextVar('current_queries', default=None)
+
+
+def observe_queries(execute, sql, params, many, context):
+    """모든 DB 연결에 항상 걸려 있는 execute_wrapper (accounts.signals에서 연결 생성 시 등록)"""
+    queries = _current_queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    return queries(execute, sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """
+    URL 패턴별 응답 시간, 요청당 SQL 수/시간 기록 (WSGI/ASGI 모두)
+    - 스트리밍 응답(evaluate/stream/ 등)은 첫 응답을 돌려준 시점까지만 측정
+    - METRICS_SLOW_REQUEST_MS를 넘긴 요청은 느린 SQL 순으로 로그
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries = QueryStats()
+        token = _current_queries.set(queries)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_queries.reset(token)
+        self._record(request, response, time.perf_counter() - started, queries)
+        return response
+
+    async def __acall__(self, request):
+        queries = QueryStats()
+        token = _current_queries.set(queries)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_queries.reset(token)
+        self._record(request, response, time.perf_counter() - started, queries)
+        return response
+
+    def _record(self, request, response, elapsed, queries):
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match is not None else '<unmatched>'
+        metrics.HTTP_REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        metrics.HTTP_LATENCY.observe(elapsed, route=route, method=request.method)
+        metrics.DB_QUERIES.observe(queries.count, route=route)
+        metrics.DB_TIME.observe(queries.seconds, route=route)
+
+        slow_ms = settings.METRICS_SLOW_REQUEST_MS
+        if slow_ms is not None and elapsed * 1000 >= slow_ms:
+            self._log_slow(request, route, response, elapsed, queries)
+
+    def _log_slow(self, request, route, response, elapsed, queries):
+        slowest = sorted(queries.statements, key=lambda item: item[0], reverse=True)
+        breakdown = ''.join(
+            f'\n  {seconds * 1000:.1f}ms {sql[:300]}'
+            for seconds, sql in slowest[:settings.METRICS_SLOW_REQUEST_TOP_QUERIES]
+        )
+        logger.warning(
+            'Slow request %s %s (%s) %d: %.0fms, %d queries in %.0fms%s',
+            request.method, request.path, route, response.status_code, elapsed * 1000,
+            queries.count, queries.seconds * 1000, breakdown,
+        )
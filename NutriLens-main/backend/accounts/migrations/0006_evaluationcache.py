@@ -0,0 +1,60 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:56
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_evaluationjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EvaluationCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64, unique=True)),
+                ("result", models.JSONField()),
+                ("raw_response", models.TextField(blank=True)),
+                ("latency_ms", models.PositiveIntegerField(default=0)),
+                ("total_tokens", models.PositiveIntegerField(default=0)),
+                ("hits", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "last_used_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="EvaluationCacheStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hits", models.PositiveBigIntegerField(default=0)),
+                ("misses", models.PositiveBigIntegerField(default=0)),
+                ("evictions", models.PositiveBigIntegerField(default=0)),
+                ("saved_ms", models.PositiveBigIntegerField(default=0)),
+                ("saved_tokens", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
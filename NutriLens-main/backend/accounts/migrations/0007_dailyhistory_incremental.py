@@ -0,0 +1,38 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_evaluationcache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailyhistory",
+            name="carbs_g",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="dailyhistory",
+            name="fat_g",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="dailyhistory",
+            name="incremental_steps",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="dailyhistory",
+            name="last_record_id",
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="dailyhistory",
+            name="protein_g",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0007_dailyhistory_incremental"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="dailyhistory",
+            index=models.Index(
+                fields=["user", "-date"], name="dailyhistory_user_date_idx"
+            ),
+        ),
+    ]
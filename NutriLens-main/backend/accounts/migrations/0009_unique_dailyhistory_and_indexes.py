@@ -0,0 +1,48 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:03
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def dedupe_daily_history(apps, schema_editor):
+    # 같은 (user, date) 중복 행은 가장 최근(id가 큰) 평가만 남김
+    DailyHistory = apps.get_model("accounts", "DailyHistory")
+    duplicates = (
+        DailyHistory.objects.values("user_id", "date")
+        .annotate(rows=Count("id"), keep_id=Max("id"))
+        .filter(rows__gt=1)
+    )
+    for dup in duplicates:
+        DailyHistory.objects.filter(user_id=dup["user_id"], date=dup["date"]).exclude(
+            id=dup["keep_id"]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0008_dailyhistory_user_date_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_daily_history, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="intakeimage",
+            index=models.Index(
+                fields=["user", "date"], name="intakeimage_user_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="intakerecord",
+            index=models.Index(
+                fields=["user", "date", "timestamp"],
+                name="intakerecord_user_date_ts_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyhistory",
+            constraint=models.UniqueConstraint(
+                fields=("user", "date"), name="dailyhistory_user_date_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0009_unique_dailyhistory_and_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="intakerecord",
+            name="timestamp",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
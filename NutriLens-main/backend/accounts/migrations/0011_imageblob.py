@@ -0,0 +1,62 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:08
+
+import accounts.models
+import accounts.storage
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0010_intakerecord_timestamp_default"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sha256", models.CharField(max_length=64, unique=True)),
+                (
+                    "file",
+                    models.FileField(
+                        max_length=255,
+                        storage=accounts.storage.ContentAddressedStorage(),
+                        upload_to="",
+                    ),
+                ),
+                ("size", models.PositiveBigIntegerField(default=0)),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="intakeimage",
+            name="image",
+            field=models.ImageField(
+                max_length=255,
+                storage=accounts.storage.ContentAddressedStorage(),
+                upload_to=accounts.models.intake_image_upload_path,
+            ),
+        ),
+        migrations.AddField(
+            model_name="intakeimage",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="images",
+                to="accounts.imageblob",
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0011_imageblob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="imageblob",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="imageblob",
+            name="derivatives",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="imageblob",
+            name="error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="imageblob",
+            name="height",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="imageblob",
+            name="processed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="imageblob",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "대기"),
+                    ("processing", "처리 중"),
+                    ("ready", "완료"),
+                    ("failed", "실패"),
+                ],
+                default="pending",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="imageblob",
+            name="width",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="imageblob",
+            index=models.Index(fields=["status", "id"], name="imageblob_status_idx"),
+        ),
+    ]
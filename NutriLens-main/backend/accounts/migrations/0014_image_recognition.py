@@ -0,0 +1,60 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0013_uploadsession"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageRecognition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("phash", models.CharField(max_length=16, unique=True)),
+                ("band0", models.PositiveIntegerField(db_index=True)),
+                ("band1", models.PositiveIntegerField(db_index=True)),
+                ("band2", models.PositiveIntegerField(db_index=True)),
+                ("band3", models.PositiveIntegerField(db_index=True)),
+                ("result", models.JSONField()),
+                ("model", models.CharField(blank=True, max_length=50)),
+                ("latency_ms", models.PositiveIntegerField(default=0)),
+                ("total_tokens", models.PositiveIntegerField(default=0)),
+                ("hits", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="imageblob",
+            name="dhash",
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AddField(
+            model_name="imageblob",
+            name="phash",
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AddField(
+            model_name="imageblob",
+            name="recognition",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="blobs",
+                to="accounts.imagerecognition",
+            ),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+
+def backfill_rollups(apps, schema_editor):
+    # 기존 DailyHistory로 주/월 집계 생성 (accounts.rollups.rebuild와 같은 계산)
+    DailyHistory = apps.get_model("accounts", "DailyHistory")
+    HistoryRollup = apps.get_model("accounts", "HistoryRollup")
+    has_macros = Q(carbs_g__isnull=False, protein_g__isnull=False, fat_g__isnull=False)
+    aggregates = dict(
+        days=Count("id"),
+        score_macro_sum=Sum("score_macro"),
+        score_disease_sum=Sum("score_disease"),
+        score_goal_sum=Sum("score_goal"),
+        macro_days=Count("id", filter=has_macros),
+        carbs_g_sum=Sum("carbs_g", filter=has_macros, default=0),
+        protein_g_sum=Sum("protein_g", filter=has_macros, default=0),
+        fat_g_sum=Sum("fat_g", filter=has_macros, default=0),
+        **{
+            f"grade_{grade.lower()}": Count("id", filter=Q(total_grade=grade))
+            for grade in "ABCD"
+        },
+    )
+    for period, trunc in (("week", TruncWeek("date")), ("month", TruncMonth("date"))):
+        grouped = (
+            DailyHistory.objects.annotate(start=trunc)
+            .values("user_id", "start")
+            .annotate(**aggregates)
+            .order_by()
+        )
+        HistoryRollup.objects.bulk_create(
+            [HistoryRollup(period=period, **values) for values in grouped],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0014_image_recognition"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HistoryRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("week", "ISO 주"), ("month", "월")], max_length=5
+                    ),
+                ),
+                ("start", models.DateField()),
+                ("days", models.IntegerField(default=0)),
+                ("score_macro_sum", models.IntegerField(default=0)),
+                ("score_disease_sum", models.IntegerField(default=0)),
+                ("score_goal_sum", models.IntegerField(default=0)),
+                ("grade_a", models.IntegerField(default=0)),
+                ("grade_b", models.IntegerField(default=0)),
+                ("grade_c", models.IntegerField(default=0)),
+                ("grade_d", models.IntegerField(default=0)),
+                ("macro_days", models.IntegerField(default=0)),
+                ("carbs_g_sum", models.BigIntegerField(default=0)),
+                ("protein_g_sum", models.BigIntegerField(default=0)),
+                ("fat_g_sum", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="history_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="historyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("user", "period", "start"),
+                name="historyrollup_user_period_start_uniq",
+            ),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0015_history_rollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="history_changed_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="customuser",
+            name="history_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="customuser",
+            name="profile_changed_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="customuser",
+            name="profile_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
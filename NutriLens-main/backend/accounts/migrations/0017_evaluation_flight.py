@@ -0,0 +1,48 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0016_conditional_get_versions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EvaluationFlight",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("owner", models.CharField(max_length=32)),
+                ("started_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("expires_at", models.DateTimeField()),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="evaluationflight",
+            constraint=models.UniqueConstraint(
+                fields=("user", "date"), name="evalflight_user_date_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:05
+
+import hashlib
+import json
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+SNAPSHOT_FIELDS = (
+    "gender",
+    "age",
+    "height",
+    "weight",
+    "diet_goal",
+    "has_diabetes",
+    "has_hypertension",
+    "has_hyperlipidemia",
+    "has_anemia",
+    "has_obesity",
+    "has_metabolic_syndrome",
+    "has_gout",
+    "has_hyperhomocysteinemia",
+    "has_ibs",
+    "has_gastritis_or_ulcer",
+    "has_constipation",
+    "has_fatty_liver",
+)
+BATCH_SIZE = 500
+
+
+def collapse_snapshots(apps, schema_editor):
+    # DailyHistory마다 복사돼 있던 프로필 값을 내용별로 ProfileSnapshot 한 행에 모으고 FK로 연결
+    # (digest는 accounts.models.ProfileSnapshot.digest_of와 같은 방식)
+    DailyHistory = apps.get_model("accounts", "DailyHistory")
+    ProfileSnapshot = apps.get_model("accounts", "ProfileSnapshot")
+    fields = [ProfileSnapshot._meta.get_field(name) for name in SNAPSHOT_FIELDS]
+    groups = {}
+    rows = DailyHistory.objects.order_by("id").values_list("id", *SNAPSHOT_FIELDS)
+    for pk, *row in rows.iterator(chunk_size=2000):
+        values = [field.to_python(value) for field, value in zip(fields, row)]
+        payload = json.dumps(values, separators=(",", ":"))
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        groups.setdefault(digest, (values, []))[1].append(pk)
+
+    for digest, (values, pks) in groups.items():
+        snapshot = ProfileSnapshot.objects.create(
+            digest=digest, **dict(zip(SNAPSHOT_FIELDS, values))
+        )
+        for i in range(0, len(pks), BATCH_SIZE):
+            DailyHistory.objects.filter(pk__in=pks[i : i + BATCH_SIZE]).update(
+                profile=snapshot
+            )
+
+
+def expand_snapshots(apps, schema_editor):
+    DailyHistory = apps.get_model("accounts", "DailyHistory")
+    ProfileSnapshot = apps.get_model("accounts", "ProfileSnapshot")
+    for snapshot in ProfileSnapshot.objects.all():
+        DailyHistory.objects.filter(profile=snapshot).update(
+            **{name: getattr(snapshot, name) for name in SNAPSHOT_FIELDS}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0017_evaluation_flight"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProfileSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("digest", models.CharField(max_length=64, unique=True)),
+                ("gender", models.CharField(default="M", max_length=1)),
+                ("age", models.PositiveIntegerField(default=0)),
+                ("height", models.FloatField(default=0)),
+                ("weight", models.FloatField(default=0)),
+                ("diet_goal", models.CharField(default="maintain", max_length=20)),
+                ("has_diabetes", models.BooleanField(default=False)),
+                ("has_hypertension", models.BooleanField(default=False)),
+                ("has_hyperlipidemia", models.BooleanField(default=False)),
+                ("has_anemia", models.BooleanField(default=False)),
+                ("has_obesity", models.BooleanField(default=False)),
+                ("has_metabolic_syndrome", models.BooleanField(default=False)),
+                ("has_gout", models.BooleanField(default=False)),
+                ("has_hyperhomocysteinemia", models.BooleanField(default=False)),
+                ("has_ibs", models.BooleanField(default=False)),
+                ("has_gastritis_or_ulcer", models.BooleanField(default=False)),
+                ("has_constipation", models.BooleanField(default=False)),
+                ("has_fatty_liver", models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="dailyhistory",
+            name="profile",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="histories",
+                to="accounts.profilesnapshot",
+            ),
+        ),
+        migrations.RunPython(collapse_snapshots, expand_snapshots),
+        *[
+            migrations.RemoveField(model_name="dailyhistory", name=name)
+            for name in SNAPSHOT_FIELDS
+        ],
+        migrations.AlterField(
+            model_name="dailyhistory",
+            name="profile",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="histories",
+                to="accounts.profilesnapshot",
+            ),
+        ),
+    ]
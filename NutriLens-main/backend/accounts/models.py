@@ -1,3 +1,9 @@
+import hashlib
+import json
+import uuid
+from collections import Counter
+from functools import partial
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
@@ -74,51 +80,61 @@ class CustomUser(AbstractUser):
     is_vegetarian = models.BooleanField(default=False)
     diet_goal = models.CharField(max_length=10, choices=DIET_GOAL_CHOICES)
 
+    # 조건부 GET(ETag/Last-Modified) 검증값 — 쓰기 때마다 F()로 증가 (accounts.conditional)
+    history_version = models.PositiveIntegerField(default=0, editable=False)
+    history_changed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    profile_version = models.PositiveIntegerField(default=0, editable=False)
+    profile_changed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     objects = CustomUserManager()
 
     def __str__(self):
         return self.username
 
+def business_date(moment=None):
+    """
+    새벽 3시 이전은 전날로 간주하는 '사업일자' 계산 (moment 없으면 현재 시각)
+    """
+    local = timezone.localtime(moment)
+    if local.hour < 3:
+        return (local - timezone.timedelta(days=1)).date()
+    return local.date()
+
 # 식단 및 영양제 섭취 기록
 class IntakeRecord(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
     content = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # 기본값은 저장 시각, 일괄 업로드(chat/batch/)는 클라이언트가 보낸 시각
+    timestamp = models.DateTimeField(default=timezone.now)
 
     # 날짜 필드: 새벽 3시 이전은 전날로 간주
     date = models.DateField(editable=False)
 
+    class Meta:
+        indexes = [
+            # 평가 시 사용자/사업일자별 기록을 시간순으로 조회
+            models.Index(fields=['user', 'date', 'timestamp'], name='intakerecord_user_date_ts_idx'),
+        ]
+
     def save(self, *args, **kwargs):
-        seoul_now = timezone.localtime()
-        if seoul_now.hour < 3:
-            self.date = (seoul_now - timezone.timedelta(days=1)).date()
-        else:
-            self.date = seoul_now.date()
+        self.date = business_date()
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.username} - {self.date} - {self.content[:20]}"
 
-# GPT 피드백 및 요약 저장
-class DailyHistory(models.Model):
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
-    date = models.DateField()
-    total_intake_text = models.TextField()
-
-    # 점수 및 등급
-    score_macro = models.IntegerField()
-    score_disease = models.IntegerField()
-    score_goal = models.IntegerField()
-    total_grade = models.CharField(max_length=1)
-
-    # GPT 사유 + 조언
-    reason_macro = models.TextField(blank=True)
-    reason_disease = models.TextField(blank=True)
-    reason_goal = models.TextField(blank=True)
+# 평가 시점의 사용자 프로필 (DailyHistory.profile) — 내용 해시(digest)로 한 번만 저장
+# - 프로필은 거의 바뀌지 않으므로 사용자당 보통 몇 행, 여러 사용자가 같은 행을 공유하기도 함
+# - 행은 수정하지 않음 (프로필이 바뀌면 새 digest의 행)
+class ProfileSnapshot(models.Model):
+    FIELDS = (
+        'gender', 'age', 'height', 'weight', 'diet_goal',
+        'has_diabetes', 'has_hypertension', 'has_hyperlipidemia', 'has_anemia', 'has_obesity',
+        'has_metabolic_syndrome', 'has_gout', 'has_hyperhomocysteinemia', 'has_ibs', 'has_gastritis_or_ulcer',
+        'has_constipation', 'has_fatty_liver',
+    )
 
-    advice_macro = models.TextField(blank=True)
-    advice_disease = models.TextField(blank=True)
-    advice_goal = models.TextField(blank=True)
+    digest = models.CharField(max_length=64, unique=True)  # FIELDS 값의 sha256
 
     # 사용자 스냅샷
     gender = models.CharField(max_length=1, default='M')
@@ -141,22 +157,416 @@ class DailyHistory(models.Model):
     has_constipation = models.BooleanField(default=False)
     has_fatty_liver = models.BooleanField(default=False)
 
+    @classmethod
+    def normalize(cls, values):
+        """FIELDS 값을 필드 타입으로 (키가 없으면 기본값) — 170과 170.0이 같은 digest가 되도록"""
+        normalized = {}
+        for name in cls.FIELDS:
+            field = cls._meta.get_field(name)
+            normalized[name] = field.to_python(values[name]) if name in values else field.get_default()
+        return normalized
+
+    @classmethod
+    def digest_of(cls, values):
+        normalized = cls.normalize(values)
+        payload = json.dumps([normalized[name] for name in cls.FIELDS], separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @classmethod
+    def get_for(cls, values):
+        """values와 같은 내용의 스냅샷 (없으면 생성)"""
+        snapshot, _ = cls.objects.get_or_create(digest=cls.digest_of(values), defaults=cls.normalize(values))
+        return snapshot
+
+    @classmethod
+    def ids_for(cls, values_list):
+        """[values, ...]의 스냅샷 id를 쿼리 2번으로 (없는 것은 생성) — 반환: 입력 순서의 id"""
+        digests = [cls.digest_of(values) for values in values_list]
+        cls.objects.bulk_create(
+            [cls(digest=digest, **cls.normalize(values)) for digest, values in dict(zip(digests, values_list)).items()],
+            ignore_conflicts=True,
+        )
+        ids = dict(cls.objects.filter(digest__in=set(digests)).values_list('digest', 'id'))
+        return [ids[digest] for digest in digests]
+
+    def field_values(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __str__(self):
+        return f"{self.gender}/{self.age}/{self.height}/{self.weight}/{self.diet_goal} ({self.digest[:8]})"
+
+
+# GPT 피드백 및 요약 저장
+class DailyHistory(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    date = models.DateField()
+    total_intake_text = models.TextField()
+
+    # 점수 및 등급
+    score_macro = models.IntegerField()
+    score_disease = models.IntegerField()
+    score_goal = models.IntegerField()
+    total_grade = models.CharField(max_length=1)
+
+    # GPT 사유 + 조언
+    reason_macro = models.TextField(blank=True)
+    reason_disease = models.TextField(blank=True)
+    reason_goal = models.TextField(blank=True)
+
+    advice_macro = models.TextField(blank=True)
+    advice_disease = models.TextField(blank=True)
+    advice_goal = models.TextField(blank=True)
+
+    # 탄/단/지 추정치(g) — 증분 평가 시 이전 결과 요약으로 사용
+    carbs_g = models.PositiveIntegerField(null=True, blank=True)
+    protein_g = models.PositiveIntegerField(null=True, blank=True)
+    fat_g = models.PositiveIntegerField(null=True, blank=True)
+
+    # 증분 평가 기준점: 마지막으로 평가에 포함된 IntakeRecord id, 연속 증분 평가 횟수
+    last_record_id = models.PositiveBigIntegerField(null=True, blank=True)
+    incremental_steps = models.PositiveIntegerField(default=0)
+
+    # 평가 시점의 사용자 프로필 (같은 내용이면 여러 평가가 한 행을 공유)
+    profile = models.ForeignKey(ProfileSnapshot, on_delete=models.PROTECT, related_name='histories')
+
+    class Meta:
+        constraints = [
+            # 사용자별 사업일자당 한 행 (재평가는 update_or_create로 갱신)
+            models.UniqueConstraint(fields=['user', 'date'], name='dailyhistory_user_date_uniq'),
+        ]
+        indexes = [
+            # history/ 커서 페이지네이션 (user별 최신순)
+            models.Index(fields=['user', '-date'], name='dailyhistory_user_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.date}"
 
-from django.db import models
+
+# DailyHistory 주/월 집계 (accounts.rollups) — DailyHistory 저장/삭제와 같은 트랜잭션에서 증감
+# - dashboard/summary/는 이 표만 읽으므로 기록이 몇 년 치여도 조회 비용이 일정
+class HistoryRollup(models.Model):
+    PERIOD_WEEK = 'week'
+    PERIOD_MONTH = 'month'
+    PERIOD_CHOICES = [
+        (PERIOD_WEEK, 'ISO 주'),
+        (PERIOD_MONTH, '월'),
+    ]
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='history_rollups')
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    start = models.DateField()  # 주: 월요일, 월: 1일
+
+    days = models.IntegerField(default=0)  # 평가된 사업일자 수
+    score_macro_sum = models.IntegerField(default=0)
+    score_disease_sum = models.IntegerField(default=0)
+    score_goal_sum = models.IntegerField(default=0)
+
+    # 등급 분포
+    grade_a = models.IntegerField(default=0)
+    grade_b = models.IntegerField(default=0)
+    grade_c = models.IntegerField(default=0)
+    grade_d = models.IntegerField(default=0)
+
+    # 탄/단지 합계(g) — 추정치가 있는 날만 (macro_days)
+    macro_days = models.IntegerField(default=0)
+    carbs_g_sum = models.BigIntegerField(default=0)
+    protein_g_sum = models.BigIntegerField(default=0)
+    fat_g_sum = models.BigIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'period', 'start'], name='historyrollup_user_period_start_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.period} {self.start}"
+
+from django.db import models, transaction
+from django.db.models import F, Case, When, Value
 from django.conf import settings
 
+from .storage import image_storage, digest_from_name, BlobMissing
+
 def intake_image_upload_path(instance, filename):
     # 사용자별/날짜별 폴더로 저장
     return f'intake_images/user_{instance.user_id}/{instance.date}/{filename}'
 
+# 이미지 음식 인식 결과 (지각 해시 기준 — 비슷한 사진은 모델 호출 없이 재사용)
+# - 64비트 pHash를 16비트씩 4개 band로 나눠 색인, 한 band라도 일치하는 후보만 해밍 거리 계산
+class ImageRecognition(models.Model):
+    phash = models.CharField(max_length=16, unique=True)
+    band0 = models.PositiveIntegerField(db_index=True)
+    band1 = models.PositiveIntegerField(db_index=True)
+    band2 = models.PositiveIntegerField(db_index=True)
+    band3 = models.PositiveIntegerField(db_index=True)
+    result = models.JSONField()  # {'foods': [{'name': ..., 'portion': ...}], 'description': ...}
+    model = models.CharField(max_length=50, blank=True)
+
+    # 원본 모델 호출 비용 (재사용 시 절감량 집계용)
+    latency_ms = models.PositiveIntegerField(default=0)
+    total_tokens = models.PositiveIntegerField(default=0)
+
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.phash
+
+# 내용 해시로 중복 제거된 이미지 파일 (여러 IntakeImage가 공유, ref_count로 참조 수 관리)
+class ImageBlob(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '대기'),
+        (STATUS_PROCESSING, '처리 중'),
+        (STATUS_READY, '완료'),
+        (STATUS_FAILED, '실패'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(storage=image_storage, max_length=255)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # 썸네일/중간 크기 파생 이미지 (run_image_worker가 생성)
+    # derivatives: {'thumb': {'webp': 경로, 'jpeg': 경로}, 'medium': {...}}
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    derivatives = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    # 지각 해시(64비트 hex)와 음식 인식 결과 (IMAGE_RECOGNITION_ENABLED일 때)
+    phash = models.CharField(max_length=16, blank=True)
+    dhash = models.CharField(max_length=16, blank=True)
+    recognition = models.ForeignKey(ImageRecognition, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='blobs')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='imageblob_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count})"
+
+    @staticmethod
+    def _check_files(names):
+        # 참조를 올린 트랜잭션 안(쓰기 잠금)에서 확인 — 저장소가 기존 파일을 재사용한 뒤
+        # 마지막 참조 해제로 파일이 지워졌으면 파일 없는 행을 남기지 않도록 롤백
+        missing = [name for name in names if not image_storage.exists(name)]
+        if missing:
+            raise BlobMissing(f'Blob file(s) removed while storing: {", ".join(missing)}.')
+
+    @classmethod
+    def acquire(cls, name, size):
+        """저장소에 쓴 blob 경로의 참조 +1 (처음이면 행 생성), 파일이 없으면 BlobMissing"""
+        with transaction.atomic():
+            blob, created = cls.objects.get_or_create(
+                sha256=digest_from_name(name), defaults={'file': name, 'size': size, 'ref_count': 1},
+            )
+            if not created:
+                cls.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+            cls._check_files([name])
+        return blob
+
+    @classmethod
+    def acquire_many(cls, entries):
+        """
+        [(blob 경로, 크기), ...]의 참조를 쿼리 3번으로 한꺼번에 +1 (같은 blob이 n번 나오면 +n)
+        - 호출 측 트랜잭션 안에서 사용, 반환: entries 순서의 blob id (파일이 없으면 BlobMissing)
+        """
+        counts = Counter(digest_from_name(name) for name, _ in entries)
+        cls.objects.bulk_create(
+            [cls(sha256=digest_from_name(name), file=name, size=size) for name, size in dict(entries).items()],
+            ignore_conflicts=True,
+        )
+        cls.objects.filter(sha256__in=counts).update(ref_count=F('ref_count') + Case(
+            *[When(sha256=digest, then=Value(n)) for digest, n in counts.items()], default=Value(0),
+        ))
+        cls._check_files(dict(entries))
+        ids = dict(cls.objects.filter(sha256__in=counts).values_list('sha256', 'id'))
+        return [ids[digest_from_name(name)] for name, _ in entries]
+
+    @classmethod
+    def release(cls, blob_id):
+        """참조 -1, 0이 되면 커밋 후 행과 파일 삭제"""
+        with transaction.atomic():
+            cls.objects.filter(pk=blob_id, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+            blob = cls.objects.filter(pk=blob_id, ref_count=0).first()
+            if blob is not None:
+                blob.delete()
+                names = [blob.file.name] + [
+                    name for formats in blob.derivatives.values() for name in formats.values()
+                ]
+                transaction.on_commit(lambda: cls.delete_files(blob.sha256, names))
+
+    @classmethod
+    def release_many(cls, counts):
+        """
+        {blob id: 해제할 참조 수}를 한꺼번에 -n, 0 이하가 되면 커밋 후 행과 파일 삭제
+        - 호출 측 트랜잭션 안에서, 해당 blob을 가리키는 IntakeImage 행을 지운 뒤 사용
+        """
+        for blob_id, n in counts.items():
+            cls.objects.filter(pk=blob_id).update(ref_count=F('ref_count') - n)
+        orphans = list(cls.objects.filter(pk__in=counts, ref_count__lte=0))
+        if orphans:
+            cls.objects.filter(pk__in=[blob.pk for blob in orphans]).delete()
+        for blob in orphans:
+            names = [blob.file.name] + [name for formats in blob.derivatives.values() for name in formats.values()]
+            transaction.on_commit(partial(cls.delete_files, blob.sha256, names))
+
+    @classmethod
+    def delete_files(cls, digest, names):
+        """
+        행을 지운 blob의 파일 삭제 (커밋 후)
+        - 그 사이 같은 내용이 다시 올라와 행이 생겼으면 파일을 남김
+        - 쓰기 트랜잭션 안에서 확인해 진행 중인 acquire와 겹치지 않도록
+        """
+        with transaction.atomic():
+            if cls.objects.filter(sha256=digest).exists():
+                return
+            for name in names:
+                image_storage.delete(name)
+
 class IntakeImage(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='intake_images')
-    image = models.ImageField(upload_to=intake_image_upload_path)
+    # 새 업로드는 blobs/ab/cd/<sha256>.<ext> 공유 파일을 가리킴 (기존 업로드는 upload_to 경로 그대로)
+    image = models.ImageField(upload_to=intake_image_upload_path, storage=image_storage, max_length=255)
+    blob = models.ForeignKey(ImageBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='images')
     note = models.TextField(blank=True)
     date = models.DateField()  # 우리 규칙: 새벽 3시 이전은 전날로 귀속
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'date'], name='intakeimage_user_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # 새 파일이면 먼저 저장소에 쓰고(해시 경로) blob 참조를 잡은 뒤 행 저장
+        # - 파일 쓰기는 트랜잭션 밖에서 (쓰기 잠금을 잡은 채 디스크 I/O를 기다리지 않도록)
+        if self.image and not self.image._committed:
+            content = self.image.file
+            self.image.save(self.image.name, content, save=False)
+            with transaction.atomic():
+                previous_blob_id = self.blob_id
+                try:
+                    self.blob = ImageBlob.acquire(self.image.name, self.image.size)
+                except BlobMissing:
+                    # 기존 파일을 재사용한 직후 삭제됨 — 다시 쓰고 한 번 더
+                    image_storage.save(self.image.name, content)
+                    self.blob = ImageBlob.acquire(self.image.name, self.image.size)
+                super().save(*args, **kwargs)
+                if previous_blob_id and previous_blob_id != self.blob_id:
+                    ImageBlob.release(previous_blob_id)
+            return
+        super().save(*args, **kwargs)
+
+# 평가 작업 큐 (DB 기반, 외부 브로커 없이 run_eval_worker가 처리)
+class EvaluationJob(models.Model):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, '대기'),
+        (STATUS_RUNNING, '실행 중'),
+        (STATUS_DONE, '완료'),
+        (STATUS_FAILED, '실패'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='evaluation_jobs')
+    date = models.DateField()  # 평가 대상 사업일자 (요청 시점 기준으로 고정)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    history = models.ForeignKey(DailyHistory, on_delete=models.SET_NULL, null=True, blank=True)
+    raw_response = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='evaljob_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date} - {self.status}"
+
+# 진행 중인 평가 (accounts.singleflight) — (사용자, 사업일자)당 한 행만 존재, 평가가 끝나면 삭제
+class EvaluationFlight(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    date = models.DateField()
+    owner = models.CharField(max_length=32)  # 실행 중인 요청의 토큰 (해제는 본인만)
+    started_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()  # 이 시각이 지나도 남아 있으면 장애로 보고 다른 요청이 이어받음
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='evalflight_user_date_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date} ({self.owner})"
+
+# GPT 평가 결과 캐시 (섭취 텍스트 + 프로필 + 프롬프트 버전 해시 기준)
+class EvaluationCache(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    result = models.JSONField()
+    raw_response = models.TextField(blank=True)
+
+    # 원본 GPT 호출 비용 (적중 시 절감량 집계용)
+    latency_ms = models.PositiveIntegerField(default=0)
+    total_tokens = models.PositiveIntegerField(default=0)
+
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return self.key
+
+# 평가 캐시 적중/미스 누적 카운터 (pk=1 한 행만 사용)
+class EvaluationCacheStats(models.Model):
+    hits = models.PositiveBigIntegerField(default=0)
+    misses = models.PositiveBigIntegerField(default=0)
+    evictions = models.PositiveBigIntegerField(default=0)
+    saved_ms = models.PositiveBigIntegerField(default=0)
+    saved_tokens = models.PositiveBigIntegerField(default=0)
+
+# 이어받기(청크) 업로드 세션 — 임시 파일은 UPLOAD_TEMP_DIR/<id>.part
+class UploadSession(models.Model):
+    STATUS_UPLOADING = 'uploading'
+    STATUS_COMPLETE = 'complete'
+    STATUS_FINALIZED = 'finalized'
+    STATUS_CHOICES = [
+        (STATUS_UPLOADING, '업로드 중'),
+        (STATUS_COMPLETE, '수신 완료'),
+        (STATUS_FINALIZED, '기록 완료'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()  # 클라이언트가 알린 전체 크기
+    received = models.PositiveBigIntegerField(default=0)  # 다음 청크가 시작해야 할 offset
+    sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_UPLOADING)
+    image = models.ForeignKey(IntakeImage, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.filename} ({self.received}/{self.size})"
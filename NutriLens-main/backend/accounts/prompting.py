@@ -0,0 +1,211 @@
+"""
+평가 프롬프트 구성
+- 고정 지시문(system) → 사용자 프로필 → 그날 기록 순서 (앞부분이 같으면 제공자 측 prefix 캐시가 적중)
+- 기록은 업로드 안내 문구 같은 잡음 줄을 빼고 EVAL_PROMPT_MAX_TOKENS 안에 맞춤
+"""
+import re
+
+from django.conf import settings
+
+try:
+    import tiktoken
+except ImportError:  # 선택 의존성 — 없으면 글자 수 기반 추정
+    tiktoken = None
+
+_encoding = None
+
+
+def count_tokens(text):
+    """tiktoken(cl100k_base)이 있으면 정확히, 없으면 추정 (ASCII 4자당 1토큰, 한글 등은 글자당 1토큰)"""
+    global _encoding
+    if tiktoken is not None and _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding('cl100k_base')
+        except Exception:  # 인코딩 파일을 받을 수 없는 환경
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+SYSTEM_PROMPT = """You are a professional health consultant. You will receive a user's profile and their food/supplement intake for one day.
+
+Please evaluate the user's daily diet in the following three categories.
+
+Ignore any lines that are not related to food or supplement intake.
+
+For each category, return:
+- A score between 0 and 10 (integer)
+- A brief reason for the score (1–2 sentences, English only)
+- One suggestion for improvement (1 sentence, English only)
+
+Additionally for the "macro" category ONLY, estimate the user's daily intake of macronutrients in grams:
+- carbs_g, protein_g, fat_g
+These should be non-negative integers (grams) rounded to the nearest whole number. If you are unsure, provide your best estimate.
+
+When an earlier evaluation of the same day is given, update it so it covers the WHOLE day (earlier intake plus the new intake). Macronutrient grams must be totals for the whole day.
+
+Respond strictly in this JSON format:
+
+{
+  "macro": {
+    "score": <integer 0–10>,
+    "reason": "<why this macro score>",
+    "advice": "<tip to improve macro score>",
+    "carbs_g": <integer>,
+    "protein_g": <integer>,
+    "fat_g": <integer>
+  },
+  "disease": {
+    "score": <integer 0–10>,
+    "reason": "<why this disease score>",
+    "advice": "<tip to improve disease score>"
+  },
+  "goal": {
+    "score": <integer 0–10>,
+    "reason": "<why this goal score>",
+    "advice": "<tip to improve goal score>"
+  }
+}"""
+
+OMITTED_NOTE_TOKENS = 16  # 생략 안내 줄 자리
+NO_INTAKE = '(No food or supplement entries, only uploads without a description.)'
+
+# 음식 정보가 없는 업로드 안내 문구 (image_analyze / hybrid_analyze가 남기는 기록)
+_IMAGE_LINE = re.compile(r'^\[Image\] \d+ image\(s\) uploaded\.(?: Note: (?P<note>.*))?$')
+_HYBRID_LINE = re.compile(r'^\[Hybrid\] (?P<body>.*)$')
+
+
+def clean_line(line):
+    """기록 한 줄에서 음식 정보만 남김 (없으면 None)"""
+    line = ' '.join(line.split())
+    match = _IMAGE_LINE.match(line)
+    if match:
+        return match.group('note') or None
+    match = _HYBRID_LINE.match(line)
+    if match:
+        texts = [part[len('Text: '):] for part in match.group('body').split(' | ') if part.startswith('Text: ')]
+        return ' | '.join(texts) or None
+    return line or None
+
+
+def intake_lines(contents):
+    """IntakeRecord.content 목록 → 잡음을 뺀 줄 목록 (여러 줄 기록은 줄 단위로)"""
+    lines = []
+    for content in contents:
+        for line in content.splitlines():
+            cleaned = clean_line(line)
+            if cleaned:
+                lines.append(cleaned)
+    return lines
+
+
+def fit_lines(lines, budget):
+    """
+    budget 토큰 안에 들어가도록 줄 정리 → (줄 목록, 뺀 줄 수)
+    - 너무 긴 줄은 EVAL_PROMPT_MAX_LINE_TOKENS 정도로 자름
+    - 그래도 넘치면 오래된 줄부터 빼고 맨 앞에 생략 안내
+    """
+    max_line_tokens = settings.EVAL_PROMPT_MAX_LINE_TOKENS
+    fitted, costs = [], []
+    for line in lines:
+        tokens = count_tokens(line)
+        if tokens > max_line_tokens:
+            # 토큰 수에 비례해 글자 수를 줄임 (대략적이어도 전체 예산은 아래에서 다시 확인)
+            line = line[:len(line) * max_line_tokens // tokens] + '…'
+            tokens = count_tokens(line)
+        fitted.append(line)
+        costs.append(tokens + 1)  # +1: 줄바꿈
+
+    total = sum(costs)
+    dropped = 0
+    if total > budget:
+        budget -= OMITTED_NOTE_TOKENS
+        while dropped < len(fitted) and total > budget:
+            total -= costs[dropped]
+            dropped += 1
+    kept = fitted[dropped:]
+    if dropped:
+        kept.insert(0, f'({dropped} earlier entries omitted to fit the length limit)')
+    return kept, dropped
+
+
+def profile_block(profile):
+    """사용자 프로필 블록 — 렌더링이 캐시 조회보다 싸서 매번 생성"""
+    # 질병 요약
+    disease_fields = [
+        k.replace('has_', '').replace('_', ' ').title()
+        for k, v in profile.items() if k.startswith('has_') and v
+    ]
+    disease_summary = ', '.join(disease_fields) if disease_fields else 'None'
+
+    return f"""[User Profile]
+Gender: {profile['gender']}
+Age: {profile['age']}
+Height: {profile['height']} cm
+Weight: {profile['weight']} kg
+Health Conditions: {disease_summary}
+Vegetarian: {"Yes" if profile.get('is_vegetarian') else "No"}
+Diet Goal: {profile['diet_goal']}"""
+
+
+def _earlier_evaluation(previous):
+    return f"""[Earlier Evaluation Today]
+Macro: {previous.score_macro}/10 (Carbs {previous.carbs_g}g, Protein {previous.protein_g}g, Fat {previous.fat_g}g)
+Disease: {previous.score_disease}/10 - {previous.reason_disease}
+Goal: {previous.score_goal}/10 - {previous.reason_goal}"""
+
+
+class Prompt:
+    """완성된 평가 프롬프트 (system은 모든 사용자 공통, user는 프로필 + 기록)"""
+
+    def __init__(self, user_content, tokens, dropped):
+        self.user_content = user_content
+        self.tokens = tokens  # {'system': n, 'profile': n, 'intake': n, 'total': n}
+        self.dropped = dropped
+
+    @property
+    def messages(self):
+        return [
+            {'role': 'system', 'content': SYSTEM_PROMPT},
+            {'role': 'user', 'content': self.user_content},
+        ]
+
+
+def _photo_foods(photos):
+    return '[Foods Recognized In Photos]\n' + '\n'.join(f'- {line}' for line in photos)
+
+
+def build_prompt(profile, contents, previous=None, photos=()):
+    """
+    평가 프롬프트 구성
+    - contents: 평가할 IntakeRecord.content 목록 (증분 평가면 이전 평가 이후 기록만)
+    - previous: 증분 평가의 이전 DailyHistory (있으면 그 요약을 기록 앞에 포함)
+    - photos: 그날 사진에서 인식한 음식 줄 목록 (accounts.recognition, 기록 앞에 포함)
+    """
+    profile_part = profile_block(profile)
+    header = [profile_part]
+    if photos:
+        header.append(_photo_foods(photos))
+    if previous is not None:
+        header.append(_earlier_evaluation(previous))
+        title = '[New Intake Since Earlier Evaluation]'
+    else:
+        title = '[Intake Today]'
+    header.append(title)
+
+    system_tokens = count_tokens(SYSTEM_PROMPT)
+    header_tokens = count_tokens('\n\n'.join(header))
+    budget = max(settings.EVAL_PROMPT_MAX_TOKENS - system_tokens - header_tokens, 0)
+    lines, dropped = fit_lines(intake_lines(contents), budget)
+    intake = '\n'.join(lines) or NO_INTAKE
+
+    user_content = '\n\n'.join(header) + '\n' + intake
+    tokens = {
+        'system': system_tokens,
+        'profile': count_tokens(profile_part),
+        'intake': count_tokens(intake),
+    }
+    tokens['total'] = system_tokens + count_tokens(user_content)
+    return Prompt(user_content, tokens, dropped)
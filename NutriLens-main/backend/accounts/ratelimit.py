@@ -0,0 +1,38 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    분당 허용량 기반 토큰 버킷 (스레드 안전)
+    - rate_per_minute: 분당 충전량, capacity: 최대 적립량(기본값 = 1분치)
+    - acquire()는 필요한 만큼 찰 때까지 대기 후 소비, 대기한 시간(초) 반환
+    """
+
+    def __init__(self, rate_per_minute, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount=1):
+        # 버킷보다 큰 요청은 가득 찬 버킷 하나로 취급 (영원히 대기하지 않도록)
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
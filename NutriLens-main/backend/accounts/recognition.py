@@ -0,0 +1,138 @@
+import base64
+import json
+import logging
+import mimetypes
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F, Q
+
+from .llm import get_client, LLMError
+from .models import ImageBlob, ImageRecognition
+from .storage import image_storage
+
+logger = logging.getLogger(__name__)
+
+BANDS = 4
+BAND_BITS = 16
+MAX_INDEXED_DISTANCE = 2 * BANDS - 1  # 1비트 이웃 band까지 조회할 때 놓치지 않는 최대 거리
+
+RECOGNITION_PROMPT = (
+    "You are a food recognition assistant. Identify the foods and drinks in the photo.\n"
+    "Respond ONLY with JSON in this exact format (no markdown):\n"
+    '{"foods": [{"name": "<food name>", "portion": "<estimated portion, e.g. 1 can (355ml)>"}], '
+    '"description": "<one sentence summary>"}\n'
+    'If there is no food in the photo, respond with {"foods": [], "description": "No food found."}'
+)
+
+
+def bands(phash):
+    """64비트 hex → 상위 비트부터 16비트씩 4개 정수"""
+    value = int(phash, 16)
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (BAND_BITS * (BANDS - 1 - i))) & mask for i in range(BANDS)]
+
+
+def hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+def _probes(band, flips):
+    # band 값 자체 + (flips=1이면) 1비트만 다른 값들
+    if not flips:
+        return [band]
+    return [band] + [band ^ (1 << bit) for bit in range(BAND_BITS)]
+
+
+def find_similar(phash, max_distance=None):
+    """
+    해밍 거리 max_distance 이내의 가장 가까운 인식 결과 → (ImageRecognition, 거리) 또는 (None, None)
+    - 거리 d면 4개 band 중 적어도 하나는 d // 4 비트 이하로 다름 (비둘기집 원리)
+    - 그래서 band 일치(거리 3 이하 보장) 또는 1비트 이웃까지(거리 7 이하 보장)만 색인으로 조회
+    """
+    if max_distance is None:
+        max_distance = settings.IMAGE_RECOGNITION_MAX_DISTANCE
+    if max_distance > MAX_INDEXED_DISTANCE:
+        raise ImproperlyConfigured(
+            f'IMAGE_RECOGNITION_MAX_DISTANCE must be at most {MAX_INDEXED_DISTANCE} '
+            f'(band index cannot find matches further apart), got {max_distance}.'
+        )
+    flips = 1 if max_distance >= BANDS else 0
+    query = Q()
+    for i, band in enumerate(bands(phash)):
+        query |= Q(**{f'band{i}__in': _probes(band, flips)})
+
+    best, best_distance = None, None
+    for candidate in ImageRecognition.objects.filter(query):
+        distance = hamming(phash, candidate.phash)
+        if distance <= max_distance and (best_distance is None or distance < best_distance):
+            best, best_distance = candidate, distance
+    return best, best_distance
+
+
+def _image_url(blob):
+    # 중간 크기 JPEG 파생본이 있으면 그것을, 없으면 원본을 data URL로 전송
+    name = (blob.derivatives.get('medium') or {}).get('jpeg') or blob.file.name
+    with image_storage.open(name, 'rb') as fp:
+        encoded = base64.b64encode(fp.read()).decode('ascii')
+    mime = mimetypes.guess_type(name)[0] or 'image/jpeg'
+    return f'data:{mime};base64,{encoded}'
+
+
+def parse_recognition(content):
+    text = content.strip()
+    if text.startswith('```'):
+        text = text.strip('`')
+        text = text[text.index('\n') + 1:] if '\n' in text else text
+    data = json.loads(text)
+    foods = [
+        {'name': str(food.get('name', '')).strip(), 'portion': str(food.get('portion', '')).strip()}
+        for food in data.get('foods') or [] if isinstance(food, dict) and food.get('name')
+    ]
+    return {'foods': foods, 'description': str(data.get('description', '')).strip()}
+
+
+def recognize_blob(blob):
+    """
+    blob 사진의 음식 인식 결과 연결
+    - 비슷한 사진(pHash 거리 IMAGE_RECOGNITION_MAX_DISTANCE 이내)의 결과가 있으면 모델 호출 없이 재사용
+    - 실패하면 None (blob은 인식 결과 없이 그대로 사용)
+    - 파일을 읽지 못하면 blob을 failed로 표시하고 None (워커는 다음 blob을 계속 처리)
+    """
+    if not blob.phash:
+        return None
+
+    recognition, distance = find_similar(blob.phash)
+    if recognition is not None:
+        ImageRecognition.objects.filter(pk=recognition.pk).update(hits=F('hits') + 1)
+        logger.info('Recognition reused for blob %s (distance %s)', blob.pk, distance)
+    else:
+        try:
+            image_url = _image_url(blob)
+        except OSError as e:
+            logger.warning('Recognition skipped for blob %s: %s', blob.pk, e)
+            blob.status, blob.error = ImageBlob.STATUS_FAILED, str(e)
+            ImageBlob.objects.filter(pk=blob.pk).update(status=blob.status, error=blob.error)
+            return None
+        try:
+            response = get_client().chat([
+                {'role': 'system', 'content': 'You are a helpful nutrition assistant.'},
+                {'role': 'user', 'content': [
+                    {'type': 'text', 'text': RECOGNITION_PROMPT},
+                    {'type': 'image_url', 'image_url': {'url': image_url, 'detail': 'low'}},
+                ]},
+            ], model=settings.IMAGE_RECOGNITION_MODEL)
+            result = parse_recognition(response.content)
+        except (LLMError, ValueError, AttributeError) as e:
+            logger.warning('Recognition failed for blob %s: %s', blob.pk, e)
+            return None
+
+        band_values = {f'band{i}': value for i, value in enumerate(bands(blob.phash))}
+        recognition, _ = ImageRecognition.objects.get_or_create(phash=blob.phash, defaults=dict(
+            band_values, result=result, model=response.model,
+            latency_ms=response.latency_ms, total_tokens=response.total_tokens,
+        ))
+
+    ImageBlob.objects.filter(pk=blob.pk).update(recognition=recognition)
+    blob.recognition = recognition
+    return recognition
@@ -0,0 +1,152 @@
+"""
+DailyHistory 주(ISO 주)/월 집계 유지
+- 평가 저장(evaluation._save_history)과 DailyHistory 삭제(signals) 때 같은 트랜잭션에서 차이만 더하고 뺌
+- 집계가 어긋났으면 rebuild_rollups 명령으로 DailyHistory에서 다시 계산
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import DailyHistory, HistoryRollup
+
+# 집계에 쓰는 DailyHistory 필드 (이전 값 조회용)
+SOURCE_FIELDS = ('date', 'score_macro', 'score_disease', 'score_goal', 'total_grade', 'carbs_g', 'protein_g', 'fat_g')
+GRADES = ('A', 'B', 'C', 'D')
+
+
+def period_start(period, day):
+    if period == HistoryRollup.PERIOD_WEEK:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def period_end(period, start):
+    """기간 마지막 날"""
+    if period == HistoryRollup.PERIOD_WEEK:
+        return start + timedelta(days=6)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def source_values(history):
+    return {name: getattr(history, name) for name in SOURCE_FIELDS}
+
+
+def contribution(values):
+    """DailyHistory 한 행(SOURCE_FIELDS dict)이 집계에 더하는 값"""
+    delta = {
+        'days': 1,
+        'score_macro_sum': values['score_macro'],
+        'score_disease_sum': values['score_disease'],
+        'score_goal_sum': values['score_goal'],
+    }
+    if values['total_grade'] in GRADES:
+        delta[f"grade_{values['total_grade'].lower()}"] = 1
+    if None not in (values['carbs_g'], values['protein_g'], values['fat_g']):
+        delta.update(
+            macro_days=1, carbs_g_sum=values['carbs_g'], protein_g_sum=values['protein_g'], fat_g_sum=values['fat_g'],
+        )
+    return delta
+
+
+def _deltas(old=None, new=None):
+    # {(period, start): {필드: 증감}} — 같은 기간이면 이전 값과 새 값의 차이만 남음
+    deltas = defaultdict(lambda: defaultdict(int))
+    for values, sign in ((old, -1), (new, 1)):
+        if values is None:
+            continue
+        for period, _ in HistoryRollup.PERIOD_CHOICES:
+            bucket = deltas[(period, period_start(period, values['date']))]
+            for name, value in contribution(values).items():
+                bucket[name] += sign * value
+    return {key: {k: v for k, v in fields.items() if v} for key, fields in deltas.items()}
+
+
+def apply_change(user_id, old=None, new=None):
+    """
+    DailyHistory 변경을 집계에 반영 (호출 측 트랜잭션 안에서)
+    - old/new: 변경 전/후 SOURCE_FIELDS dict (생성이면 old=None, 삭제면 new=None)
+    - 삭제는 행을 새로 만들지 않음 (사용자 삭제로 집계 행이 먼저 지워진 경우 등)
+    """
+    deltas = {key: fields for key, fields in _deltas(old, new).items() if fields}
+    if not deltas:
+        return
+    if new is not None:
+        HistoryRollup.objects.bulk_create(
+            [HistoryRollup(user_id=user_id, period=period, start=start) for period, start in deltas],
+            ignore_conflicts=True,
+        )
+    now = timezone.now()
+    for (period, start), fields in deltas.items():
+        HistoryRollup.objects.filter(user_id=user_id, period=period, start=start).update(
+            updated_at=now, **{name: F(name) + value for name, value in fields.items()},
+        )
+
+
+def rebuild(user_ids=None):
+    """DailyHistory에서 집계를 다시 계산 (user_ids가 없으면 전체) — 반환: 만든 집계 행 수"""
+    histories = DailyHistory.objects.all()
+    rollups = HistoryRollup.objects.all()
+    if user_ids is not None:
+        histories = histories.filter(user_id__in=user_ids)
+        rollups = rollups.filter(user_id__in=user_ids)
+
+    has_macros = Q(carbs_g__isnull=False, protein_g__isnull=False, fat_g__isnull=False)
+    aggregates = dict(
+        days=Count('id'),
+        score_macro_sum=Sum('score_macro'),
+        score_disease_sum=Sum('score_disease'),
+        score_goal_sum=Sum('score_goal'),
+        macro_days=Count('id', filter=has_macros),
+        carbs_g_sum=Sum('carbs_g', filter=has_macros, default=0),
+        protein_g_sum=Sum('protein_g', filter=has_macros, default=0),
+        fat_g_sum=Sum('fat_g', filter=has_macros, default=0),
+        **{f'grade_{grade.lower()}': Count('id', filter=Q(total_grade=grade)) for grade in GRADES},
+    )
+    truncs = {HistoryRollup.PERIOD_WEEK: TruncWeek('date'), HistoryRollup.PERIOD_MONTH: TruncMonth('date')}
+
+    rows = []
+    for period, trunc in truncs.items():
+        grouped = histories.annotate(start=trunc).values('user_id', 'start').annotate(**aggregates).order_by()
+        rows.extend(HistoryRollup(period=period, **values) for values in grouped)
+
+    with transaction.atomic():
+        rollups.delete()
+        HistoryRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def summary(user, period, limit=None):
+    """최근 limit개 기간의 집계 (최신순) — 집계 표만 조회"""
+    limit = min(limit or settings.DASHBOARD_SUMMARY_PERIODS, settings.DASHBOARD_SUMMARY_MAX_PERIODS)
+    rollups = HistoryRollup.objects.filter(user=user, period=period, days__gt=0).order_by('-start')[:limit]
+    return [_summary_row(rollup) for rollup in rollups]
+
+
+def _average(total, count):
+    return round(total / count, 1) if count else None
+
+
+def _summary_row(rollup):
+    days = rollup.days
+    return {
+        'start': rollup.start,
+        'end': period_end(rollup.period, rollup.start),
+        'days': days,
+        'avg_score_macro': _average(rollup.score_macro_sum, days),
+        'avg_score_disease': _average(rollup.score_disease_sum, days),
+        'avg_score_goal': _average(rollup.score_goal_sum, days),
+        'avg_score_total': _average(rollup.score_macro_sum + rollup.score_disease_sum + rollup.score_goal_sum, days),
+        'grades': {grade: getattr(rollup, f'grade_{grade.lower()}') for grade in GRADES},
+        'macro_days': rollup.macro_days,
+        'carbs_g_total': rollup.carbs_g_sum,
+        'protein_g_total': rollup.protein_g_sum,
+        'fat_g_total': rollup.fat_g_sum,
+        'avg_carbs_g': _average(rollup.carbs_g_sum, rollup.macro_days),
+        'avg_protein_g': _average(rollup.protein_g_sum, rollup.macro_days),
+        'avg_fat_g': _average(rollup.fat_g_sum, rollup.macro_days),
+    }
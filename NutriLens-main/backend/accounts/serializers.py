@@ -36,7 +36,17 @@ class RegisterSerializer(serializers.ModelSerializer):
 class UserInfoSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
-        exclude = ['password', 'last_login', 'is_superuser', 'is_staff', 'is_active', 'groups', 'user_permissions']
+        exclude = [
+            'password', 'last_login', 'is_superuser', 'is_staff', 'is_active', 'groups', 'user_permissions',
+            'history_version', 'history_changed_at', 'profile_version', 'profile_changed_at',
+        ]
+
+    def update(self, instance, validated_data):
+        # 보낸 필드만 저장 (동시에 F()로 올린 버전 카운터 등을 읽어 둔 옛 값으로 덮어쓰지 않도록)
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
 
 # 로그인 성공 시 응답용
 class LoginSuccessSerializer(serializers.ModelSerializer):
@@ -50,19 +60,43 @@ class IntakeRecordSerializer(serializers.ModelSerializer):
         model = IntakeRecord
         fields = '__all__'
 
+# 일괄 업로드(chat/batch/) 항목 — 오프라인에서 쌓인 기록 재전송
+class IntakeBatchEntrySerializer(serializers.Serializer):
+    content = serializers.CharField()
+    timestamp = serializers.DateTimeField(required=False)  # 없으면 서버 수신 시각
+
 # 일별 GPT 평가 기록
 class DailyHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = DailyHistory
-        fields = '__all__'
+        exclude = ['profile']
+
+    def to_representation(self, instance):
+        # 프로필 스냅샷(ProfileSnapshot)은 예전 응답처럼 평가 필드 뒤에 펼쳐서 (user는 마지막)
+        data = super().to_representation(instance)
+        user = data.pop('user')
+        data.update(instance.profile.field_values())
+        data['user'] = user
+        return data
 
 from rest_framework import serializers
 from .models import IntakeRecord, IntakeImage
+from .imaging import derivative_urls, recognition_result
 
 class IntakeImageSerializer(serializers.ModelSerializer):
     # user를 사람이 읽기 좋은 형태로 노출 (원하면 제거 가능)
     user = serializers.CharField(source='user.username', read_only=True)
+    # 파생본 처리 상태와 URL (기존 업로드처럼 blob이 없으면 None)
+    status = serializers.CharField(source='blob.status', read_only=True, default=None)
+    derivatives = serializers.SerializerMethodField()
+    recognition = serializers.SerializerMethodField()  # 음식 인식 결과 (IMAGE_RECOGNITION_ENABLED)
 
     class Meta:
         model = IntakeImage
-        fields = ['user', 'image', 'note', 'date', 'created_at']  # id 제외
\ No newline at end of file
+        fields = ['user', 'image', 'status', 'derivatives', 'recognition', 'note', 'date', 'created_at']  # id 제외
+
+    def get_derivatives(self, obj):
+        return derivative_urls(obj.blob)
+
+    def get_recognition(self, obj):
+        return recognition_result(obj.blob)
\ No newline at end of file
@@ -0,0 +1,54 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_user
+from .history import invalidate_history_total
+from .middleware import observe_queries
+from .models import CustomUser, IntakeImage, ImageBlob, DailyHistory
+from . import conditional, rollups
+
+
+@receiver(post_delete, sender=IntakeImage)
+def release_image_blob(sender, instance, **kwargs):
+    # 공유 blob 참조 해제 (마지막 참조면 파일까지 삭제)
+    if instance.blob_id:
+        ImageBlob.release(instance.blob_id)
+
+
+@receiver(post_delete, sender=DailyHistory)
+def remove_from_rollups(sender, instance, **kwargs):
+    # 삭제된 날의 점수/등급/탄단지를 주/월 집계에서 뺌 (삭제와 같은 트랜잭션)
+    rollups.apply_change(instance.user_id, old=rollups.source_values(instance))
+    conditional.bump(instance.user_id, conditional.HISTORY)
+    # 전체 개수 캐시는 커밋 후 삭제 (저장 경로와 같이 — 커밋 전에 지우면 옛 개수를 다시 캐시할 수 있음)
+    transaction.on_commit(partial(invalidate_history_total, instance.user_id))
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_cached_auth_on_save(sender, instance, **kwargs):
+    # 비밀번호/프로필/활성 상태 변경 — 캐시된 사용자 정보로 인증하지 않도록 (공유 캐시라 모든 워커에 반영)
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=CustomUser)
+def bump_profile_version(sender, instance, created, update_fields=None, **kwargs):
+    # my_info PUT, admin, ORM 어디서 저장하든 my-info/ ETag가 바뀌도록 (로그인 시각/비밀번호만 바꾼 저장은 제외)
+    if not created and not (update_fields and update_fields <= {'last_login', 'password'}):
+        conditional.bump(instance.pk, conditional.PROFILE)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_cached_auth_on_logout(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(connection_created)
+def install_query_observer(sender, connection, **kwargs):
+    # MetricsMiddleware가 요청별 SQL 수/시간을 셀 수 있도록 (요청 밖에서는 그대로 실행)
+    if observe_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(observe_queries)
@@ -0,0 +1,101 @@
+"""
+(사용자, 사업일자)별 평가 단일 실행 — 연타/재시도로 같은 평가가 동시에 여러 번 들어와도 GPT 호출은 한 번
+- EvaluationFlight 행(unique user+date)을 INSERT 하는 쪽이 실행, 실패한 쪽은 행이 사라질 때까지 대기
+- DB 행으로 잠그므로 워커/웹 프로세스가 여러 개여도 동작
+- 실행 중 프로세스가 죽으면 EVAL_FLIGHT_LEASE(초) 뒤 다른 요청이 이어받음
+"""
+import asyncio
+import time
+import uuid
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import EvaluationFlight
+
+
+class FlightTimeout(Exception):
+    """먼저 시작한 평가가 EVAL_FLIGHT_WAIT_TIMEOUT 안에 끝나지 않음"""
+
+
+def _lease_expiry():
+    return timezone.now() + timezone.timedelta(seconds=settings.EVAL_FLIGHT_LEASE)
+
+
+def try_acquire(user_id, target_date):
+    """실행권 획득 → owner 토큰, 다른 요청이 실행 중이면 None"""
+    owner = uuid.uuid4().hex
+    try:
+        with transaction.atomic():
+            EvaluationFlight.objects.create(user_id=user_id, date=target_date, owner=owner, expires_at=_lease_expiry())
+        return owner
+    except IntegrityError:
+        pass
+    # 만료된 실행권(프로세스 장애)은 조건부 UPDATE로 이어받음 — 여러 요청이 동시에 시도해도 하나만 성공
+    taken = EvaluationFlight.objects.filter(
+        user_id=user_id, date=target_date, expires_at__lt=timezone.now(),
+    ).update(owner=owner, started_at=timezone.now(), expires_at=_lease_expiry())
+    return owner if taken else None
+
+
+def release(user_id, target_date, owner):
+    EvaluationFlight.objects.filter(user_id=user_id, date=target_date, owner=owner).delete()
+
+
+class Flight:
+    def __init__(self, user_id, target_date):
+        self.user_id = user_id
+        self.target_date = target_date
+        self.owner = None
+        self.waited = False  # 다른 요청의 평가가 끝나기를 기다렸는지 (그 결과를 재사용할 수 있음)
+
+    def acquire(self):
+        deadline = time.monotonic() + settings.EVAL_FLIGHT_WAIT_TIMEOUT
+        while True:
+            self.owner = try_acquire(self.user_id, self.target_date)
+            if self.owner is not None:
+                return self
+            if time.monotonic() >= deadline:
+                raise FlightTimeout(f'Another evaluation for {self.target_date} is still running.')
+            self.waited = True
+            time.sleep(settings.EVAL_FLIGHT_POLL_INTERVAL)
+
+    def release(self):
+        if self.owner is not None:
+            release(self.user_id, self.target_date, self.owner)
+            self.owner = None
+
+    async def aacquire(self):
+        """acquire의 async 버전 — 기다리는 동안 스레드를 잡지 않음 (async 뷰용)"""
+        deadline = time.monotonic() + settings.EVAL_FLIGHT_WAIT_TIMEOUT
+        while True:
+            self.owner = await sync_to_async(try_acquire)(self.user_id, self.target_date)
+            if self.owner is not None:
+                return self
+            if time.monotonic() >= deadline:
+                raise FlightTimeout(f'Another evaluation for {self.target_date} is still running.')
+            self.waited = True
+            await asyncio.sleep(settings.EVAL_FLIGHT_POLL_INTERVAL)
+
+    async def arelease(self):
+        if self.owner is not None:
+            await EvaluationFlight.objects.filter(
+                user_id=self.user_id, date=self.target_date, owner=self.owner,
+            ).adelete()
+            self.owner = None
+
+
+@contextmanager
+def flight(user_id, target_date):
+    """
+    with flight(user.pk, day) as f: — 블록 안에서는 같은 (사용자, 사업일자) 평가가 이 요청 하나뿐
+    - f.waited가 True면 앞선 평가가 방금 끝난 것이므로 그 결과가 최신 기록을 포함하는지 먼저 확인
+    """
+    current = Flight(user_id, target_date).acquire()
+    try:
+        yield current
+    finally:
+        current.release()
@@ -0,0 +1,90 @@
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+BLOB_DIR = 'blobs'
+
+
+class BlobMissing(Exception):
+    """참조하려는 blob 파일이 없음 — 저장한 직후 같은 내용의 마지막 참조가 해제돼 삭제됨 (다시 저장하면 됨)"""
+
+
+def blob_name(digest, ext=''):
+    """sha256 → blobs/ab/cd/<sha256><ext> (앞 4자리로 2단계 분산해 한 폴더에 파일이 몰리지 않도록)"""
+    return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+
+def digest_from_name(name):
+    """blob 경로에서 sha256 추출 (blob 경로가 아니면 None)"""
+    if not name or not name.startswith(f'{BLOB_DIR}/'):
+        return None
+    digest = os.path.splitext(os.path.basename(name))[0]
+    return digest if len(digest) == 64 else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    내용 해시(sha256) 기반 저장소
+    - 쓰는 동안 해시를 계산하고, 끝나면 blobs/ab/cd/<sha256><확장자>로 이동
+    - 같은 내용이 이미 있으면 임시 파일만 버리고 기존 경로 반환 (upload_to 경로는 확장자만 사용)
+    - 기존 업로드(intake_images/...)도 MEDIA_ROOT 기준으로 그대로 열 수 있음
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # 최종 이름은 _save에서 해시로 정해지므로 중복 확인/접미사 추가를 하지 않음
+        return name
+
+    def _save(self, name, content):
+        ext = os.path.splitext(name)[1].lower()
+        tmp_dir = self.path(f'{BLOB_DIR}/tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        # 같은 파일시스템의 임시 파일에 쓰면서 해시 → 원자적 rename
+        sha = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    sha.update(chunk)
+                    fp.write(chunk)
+
+            name = self.adopt(tmp_path, sha.hexdigest(), ext)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return name
+
+    def adopt(self, path, digest, ext=''):
+        """
+        해시를 이미 아는 파일을 blob 경로로 이동 (이어받기 업로드 등) — 반환: 저장소 기준 이름
+        - 같은 blob이 있으면 path만 삭제
+        """
+        name = blob_name(digest, ext.lower())
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            os.remove(path)
+            return name
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(path, self.file_permissions_mode)
+        try:
+            os.replace(path, full_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # 다른 파일시스템이면 blob 폴더 안 임시 파일로 복사한 뒤 rename (반쯤 쓴 blob이 보이지 않도록)
+            tmp_path = f'{full_path}.{os.getpid()}.tmp'
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, full_path)
+            os.remove(path)
+        return name
+
+
+image_storage = ContentAddressedStorage()
@@ -0,0 +1,184 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from rest_framework.renderers import BaseRenderer
+
+from .evaluation import (
+    complete_evaluation, complete_from_cache, evaluation_payload, EvaluationError, CATEGORIES,
+)
+from .llm import get_client
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Accept: text/event-stream 요청의 오류 응답(400 등)을 error 이벤트로 렌더링"""
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return sse_event('error', data).encode(self.charset)
+
+
+class JSONSectionScanner:
+    """
+    스트리밍 중인 JSON 텍스트에서 최상위 키의 객체 값이 닫히는 즉시 꺼내는 스캐너
+    - feed(delta) → 이번 조각으로 완성된 [(key, dict), ...]
+    - 문자열 안의 괄호/이스케이프는 무시, 첫 '{' 이전(```json 등)은 건너뜀
+    """
+
+    def __init__(self):
+        self.buffer = []
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.key = None
+        self.value_start = None
+        self.pos = 0
+
+    def feed(self, delta):
+        sections = []
+        for ch in delta:
+            self.buffer.append(ch)
+            i = self.pos
+            self.pos += 1
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    # 최상위 객체 안의 문자열(값 밖) = 키
+                    if self.depth == 1:
+                        self.key = json.loads(''.join(self.buffer[self.string_start:i + 1]))
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                self.string_start = i
+            elif ch == '{':
+                self.depth += 1
+                if self.depth == 2:
+                    self.value_start = i
+            elif ch == '}':
+                if self.depth == 2 and self.value_start is not None:
+                    try:
+                        sections.append((self.key, json.loads(''.join(self.buffer[self.value_start:i + 1]))))
+                    except ValueError:
+                        pass
+                    self.value_start = None
+                self.depth = max(self.depth - 1, 0)
+        return sections
+
+
+def _history_sections(history):
+    # 저장된 평가를 GPT 응답과 같은 항목 형식으로
+    sections = {
+        category: {
+            'score': getattr(history, f'score_{category}'),
+            'reason': getattr(history, f'reason_{category}'),
+            'advice': getattr(history, f'advice_{category}'),
+        }
+        for category in CATEGORIES
+    }
+    sections['macro'].update(carbs_g=history.carbs_g, protein_g=history.protein_g, fat_g=history.fat_g)
+    return sections
+
+
+class FlightStream:
+    """SSE 본문 — 스트림이 끝나거나 연결이 끊겨 응답이 닫히면 평가 실행권(singleflight) 해제"""
+
+    def __init__(self, events, flight):
+        self.events = events
+        self.flight = flight
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def close(self):
+        # 시작되지 않은 generator는 close해도 finally가 돌지 않으므로 여기서 직접 해제
+        self.events.close()
+        self.flight.release()
+
+
+class AsyncFlightStream:
+    """
+    ASGI용 FlightStream — Django는 ASGI에서 동기 반복자를 끝까지 모은 뒤 보내므로(이벤트가 한꺼번에 도착)
+    전용 스레드에서 이벤트를 하나씩 꺼내 바로 전송
+    - __iter__가 있으면 StreamingHttpResponse가 동기 반복자로 취급하므로 FlightStream을 상속하지 않음
+    - 한 스트림의 SQL은 모두 같은 스레드(같은 DB 연결)에서 실행되고, 닫을 때 그 연결도 닫음
+    - GPT 조각을 기다리는 동안 다른 요청의 동기 코드(sync_to_async 공용 스레드)를 막지 않음
+    """
+
+    def __init__(self, events, flight):
+        self.events = events
+        self.flight = flight
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sse')
+
+    async def __aiter__(self):
+        step = sync_to_async(next, thread_sensitive=False, executor=self._executor)
+        while True:
+            event = await step(self.events, None)
+            if event is None:
+                return
+            yield event
+
+    def _release(self):
+        try:
+            self.events.close()
+            self.flight.release()
+        finally:
+            connections.close_all()
+
+    def close(self):
+        # 이벤트 루프에서 바로 불려도(테스트 AsyncClient) ORM은 스트림 스레드에서 실행
+        try:
+            self._executor.submit(self._release).result()
+        finally:
+            self._executor.shutdown()
+
+
+def stream_evaluation(plan):
+    """
+    evaluate/stream/ 응답 본문 (SSE)
+    - token: 모델 출력 조각, macro/disease/goal: 해당 항목 JSON이 완성되는 즉시
+    - done: DailyHistory 저장 후 evaluate/ 와 같은 형식의 결과, error: 실패 사유
+    - 같은 평가를 기다렸다가 그 결과를 공유하면(plan.latest) 항목과 done만 바로 전송
+    """
+    if plan.latest is not None:
+        for category, section in _history_sections(plan.latest).items():
+            yield sse_event(category, section)
+        yield sse_event('done', dict(evaluation_payload(plan.latest), cached=True))
+        return
+
+    if plan.cached is not None:
+        history, raw_answer = complete_from_cache(plan)
+        for category in CATEGORIES:
+            yield sse_event(category, plan.cached.result.get(category, {}))
+        yield sse_event('done', dict(evaluation_payload(history, raw_answer), cached=True))
+        return
+
+    scanner = JSONSectionScanner()
+    try:
+        stream = get_client().stream_chat(plan.messages)
+        for delta in stream:
+            yield sse_event('token', delta)
+            for key, section in scanner.feed(delta):
+                if key in CATEGORIES:
+                    yield sse_event(key, section)
+        history, raw_answer = complete_evaluation(plan, stream.response)
+    except EvaluationError as e:
+        yield sse_event('error', {'error': 'Failed to parse GPT response', 'raw': e.raw, 'detail': e.detail})
+        return
+    except Exception as e:
+        yield sse_event('error', {'error': 'Failed to evaluate daily intake', 'detail': str(e)})
+        return
+    yield sse_event('done', dict(evaluation_payload(history, raw_answer), cached=False))
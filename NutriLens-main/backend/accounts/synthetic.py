@@ -0,0 +1,294 @@
+"""
+대량 합성 데이터 (python manage.py seed_synthetic) — 색인/페이지네이션/집계 성능을 운영 규모에서 재현
+- 사용자 index마다 독립된 난수열(seed + index)이라 워커 수/배치 크기와 관계없이 같은 데이터
+- 생성(프로필, 사업일자별 기록/평가/사진)은 워커 프로세스, 저장은 주 프로세스가 묶음 단위 bulk_create
+- 사진은 자리표시 JPEG 몇 장을 blob으로 한 번만 쓰고 IntakeImage가 공유 (파일 수가 행 수만큼 늘지 않음)
+"""
+import io
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import django
+from PIL import Image, ImageDraw
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import Count
+
+from . import rollups
+from .evaluation import parse_result, profile_snapshot
+from .models import CustomUser, IntakeRecord, DailyHistory, IntakeImage, ImageBlob, ProfileSnapshot, business_date
+from .storage import image_storage
+
+# (이름, 탄수화물 g, 단백질 g, 지방 g)
+FOODS = [
+    ('현미밥 한 공기', 70, 6, 2), ('흰쌀밥 한 공기', 65, 5, 1), ('된장찌개', 12, 10, 6), ('김치찌개', 10, 14, 12),
+    ('닭가슴살 샐러드', 12, 30, 8), ('김치볶음밥', 85, 12, 16), ('비빔밥', 80, 18, 14), ('라면 1봉지', 78, 10, 16),
+    ('삼겹살 200g', 0, 34, 70), ('제육볶음', 18, 28, 22), ('불고기', 14, 26, 16), ('고등어구이', 0, 22, 14),
+    ('연어 스테이크', 2, 34, 22), ('떡볶이', 95, 8, 6), ('김밥 한 줄', 60, 10, 8), ('짜장면', 110, 18, 20),
+    ('냉면', 90, 14, 6), ('순두부찌개', 10, 16, 12), ('계란말이', 2, 12, 14), ('두부조림', 8, 14, 10),
+    ('오트밀 우유', 40, 12, 8), ('그릭요거트', 8, 15, 5), ('바나나 1개', 27, 1, 0), ('사과 1개', 25, 0, 0),
+    ('고구마 2개', 60, 3, 0), ('삶은 계란 2개', 1, 12, 10), ('아몬드 한 줌', 6, 6, 14), ('샌드위치', 40, 16, 14),
+    ('치킨 반 마리', 20, 45, 40), ('피자 2조각', 60, 20, 24), ('아메리카노', 0, 0, 0), ('카페라떼', 12, 8, 7),
+]
+SUPPLEMENTS = ['멀티비타민', '오메가3', '비타민D 1000IU', '유산균', '마그네슘', '철분제']
+
+# 끼니: (시, 분, 확률, 음식 수 범위) — 24시 이후는 다음 날 새벽(사업일자는 그대로 전날)
+MEALS = [(7, 40, 0.6, (1, 2)), (12, 20, 0.9, (1, 3)), (15, 30, 0.35, (1, 1)), (19, 0, 0.85, (1, 3)),
+         (22, 30, 0.2, (1, 2)), (25, 10, 0.06, (1, 2))]
+
+# 성인 유병률 (대략) — AGE_RELATED는 나이에 따라, BMI_RELATED는 과체중이면 높아짐
+PREVALENCE = {
+    'has_diabetes': 0.09, 'has_hypertension': 0.18, 'has_hyperlipidemia': 0.14, 'has_gout': 0.02,
+    'has_fatty_liver': 0.12, 'has_thyroid': 0.05, 'has_gastritis': 0.10, 'has_ibs': 0.07,
+    'has_constipation': 0.08, 'has_reflux': 0.08, 'has_pancreatitis': 0.005, 'has_heart_disease': 0.04,
+    'has_stroke': 0.02, 'has_anemia': 0.05, 'has_osteoporosis': 0.05, 'has_food_allergy': 0.04,
+}
+AGE_RELATED = {'has_diabetes', 'has_hypertension', 'has_hyperlipidemia', 'has_gout', 'has_heart_disease',
+               'has_stroke', 'has_osteoporosis'}
+BMI_RELATED = {'has_diabetes', 'has_hypertension', 'has_hyperlipidemia', 'has_fatty_liver', 'has_gout'}
+
+REASONS = ['Balanced meals overall.', 'Carbohydrate-heavy day.', 'Protein intake was low.',
+           'High fat from fried or grilled meat.', 'Sodium-heavy soups and stews.']
+ADVICE = ['Add vegetables to each meal.', 'Swap one rice bowl for whole grains.', 'Include a lean protein source.',
+          'Cut back on late-night snacks.', 'Choose grilled over fried dishes.']
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+def generate_profile(rng):
+    """CustomUser 필드 (username/password 제외)"""
+    gender = rng.choice('MF')
+    age = _clamp(int(rng.gauss(42, 14)), 18, 85)
+    height = round(_clamp(rng.gauss(173 if gender == 'M' else 160, 6), 145, 200), 1)
+    bmi = _clamp(rng.gauss(24, 3.5), 16, 40)
+    profile = {
+        'name': f'합성{rng.randint(1000, 9999)}', 'gender': gender, 'age': age, 'height': height,
+        'weight': round(bmi * (height / 100) ** 2, 1), 'is_vegetarian': rng.random() < 0.03,
+    }
+
+    overweight = bmi >= 25
+    for flag, rate in PREVALENCE.items():
+        if flag in AGE_RELATED:
+            rate *= (age / 45) ** 2
+        if flag in BMI_RELATED and overweight:
+            rate *= 1.8
+        profile[flag] = rng.random() < min(rate, 0.9)
+    profile['has_obesity'] = bmi >= 30 or (overweight and rng.random() < 0.2)
+    profile['has_metabolic_syndrome'] = rng.random() < (
+        0.03 + 0.3 * profile['has_obesity'] + 0.2 * profile['has_diabetes'] + 0.1 * profile['has_hypertension']
+    )
+
+    if bmi >= 25:
+        weights = (75, 20, 5)
+    elif bmi < 20:
+        weights = (5, 40, 55)
+    else:
+        weights = (30, 50, 20)
+    profile['diet_goal'] = rng.choices(['loss', 'maintain', 'gain'], weights)[0]
+    return profile
+
+
+def _result(rng, base_score, foods):
+    # GPT 평가 응답과 같은 형식 → parse_result로 DailyHistory 필드 변환
+    carbs, protein, fat = (sum(food[n] for food in foods) for n in (1, 2, 3))
+    jitter = rng.uniform(0.85, 1.15)
+
+    def section(**extra):
+        return dict(score=_clamp(round(rng.gauss(base_score, 1.5)), 0, 10), reason=rng.choice(REASONS),
+                    advice=rng.choice(ADVICE), **extra)
+
+    return {
+        'macro': section(carbs_g=round(carbs * jitter), protein_g=round(protein * jitter), fat_g=round(fat * jitter)),
+        'disease': section(),
+        'goal': section(),
+    }
+
+
+def generate_user(seed, index, end_date, days, tz_name, image_variants):
+    """
+    사용자 index 한 명의 데이터 (워커 프로세스에서 실행, pickle 가능한 값만 반환)
+    - records: [(사업일자, 내용, 시각)], histories: [(사업일자, 섭취 텍스트, 평가 필드)], images: [(사업일자, 자리표시 번호, 메모)]
+    """
+    rng = random.Random(f'{seed}-{index}')
+    tz = ZoneInfo(tz_name)
+    profile = generate_profile(rng)
+
+    # 가입 시점/기록 빈도/평가 빈도/사진 빈도는 사용자마다 다름
+    first_day = end_date - timedelta(days=days - 1) + timedelta(days=rng.randint(0, days // 3))
+    log_rate = rng.uniform(0.3, 0.95)
+    eval_rate = rng.uniform(0.4, 1.0)
+    photo_rate = rng.uniform(0.0, 0.4) if image_variants else 0.0
+    base_score = rng.gauss(6.5, 1.2)
+    menu = [food for food in FOODS if not profile['is_vegetarian'] or food[2] < 20]
+
+    records, histories, images = [], [], []
+    day = first_day
+    while day <= end_date:
+        if rng.random() < log_rate:
+            eaten = []
+            for hour, minute, chance, (low, high) in MEALS:
+                if rng.random() >= chance:
+                    continue
+                at = datetime.combine(day, time(hour % 24, minute), tzinfo=tz) + timedelta(days=hour // 24)
+                at += timedelta(minutes=rng.randint(-30, 30), seconds=rng.randint(0, 59))
+                for food in rng.sample(menu, rng.randint(low, high)):
+                    eaten.append(food)
+                    records.append((day, food[0], at))
+            if rng.random() < 0.3:
+                records.append((day, rng.choice(SUPPLEMENTS), datetime.combine(day, time(8, 30), tzinfo=tz)))
+            if eaten and rng.random() < eval_rate:
+                text = '\n'.join(food[0] for food in eaten)
+                histories.append((day, text, parse_result(_result(rng, base_score, eaten))))
+            if eaten and rng.random() < photo_rate:
+                images.append((day, rng.randrange(image_variants), rng.choice(eaten)[0]))
+        day += timedelta(days=1)
+    return profile, records, histories, images
+
+
+def generate_chunk(seed, indexes, end_date, days, tz_name, image_variants):
+    return [(index, generate_user(seed, index, end_date, days, tz_name, image_variants)) for index in indexes]
+
+
+def placeholder_images(count, seed):
+    """자리표시 JPEG count장을 저장소에 쓰고 [(blob 경로, 크기)] 반환 (같은 seed면 같은 파일 → 재실행해도 재사용)"""
+    entries = []
+    for n in range(count):
+        rng = random.Random(f'{seed}-image-{n}')
+        image = Image.new('RGB', (320, 240), tuple(rng.randrange(256) for _ in range(3)))
+        draw = ImageDraw.Draw(image)
+        for _ in range(12):
+            x, y = rng.randrange(320), rng.randrange(240)
+            draw.ellipse((x, y, x + rng.randint(20, 90), y + rng.randint(20, 90)),
+                         fill=tuple(rng.randrange(256) for _ in range(3)))
+        out = io.BytesIO()
+        image.save(out, 'JPEG', quality=80)
+        name = image_storage.save('placeholder.jpg', ContentFile(out.getvalue()))
+        entries.append((name, len(out.getvalue())))
+    return entries
+
+
+def _insert_records(rows, batch_size):
+    # IntakeRecord는 행 수가 가장 많아 모델 인스턴스/bulk_create 대신 executemany (필드 변환 비용이 저장 시간 대부분)
+    meta = IntakeRecord._meta
+    columns = [meta.get_field(name).column for name in ('user', 'content', 'timestamp', 'date')]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(meta.db_table),
+        ', '.join(connection.ops.quote_name(column) for column in columns),
+        ', '.join(['%s'] * len(columns)),
+    )
+    with connection.cursor() as cursor:
+        for i in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[i:i + batch_size])
+
+
+def write_chunk(generated, prefix, password, placeholders, batch_size):
+    """
+    생성 결과 한 묶음 저장 (한 트랜잭션) — 반환: {모델: 행 수}, 사용자 id 목록
+    - 사용자 → 프로필 스냅샷 → 기록/평가/사진 → 주/월 집계 순, save()/시그널 없이 묶음 INSERT
+    """
+    adapt_datetime, adapt_date = connection.ops.adapt_datetimefield_value, connection.ops.adapt_datefield_value
+    with transaction.atomic():
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'{prefix}-{index}', password=password, **profile)
+            for index, (profile, *_) in generated
+        ], batch_size=batch_size)
+        if users and users[0].pk is None:
+            # RETURNING을 지원하지 않는 DB
+            ids = dict(CustomUser.objects.filter(username__in=[u.username for u in users]).values_list('username', 'id'))
+            for user in users:
+                user.pk = ids[user.username]
+
+        snapshot_ids = ProfileSnapshot.ids_for([profile_snapshot(profile) for _, (profile, *_) in generated])
+        records, histories, images = [], [], []
+        for user, snapshot_id, (_, (_, user_records, user_histories, user_images)) in zip(
+            users, snapshot_ids, generated,
+        ):
+            records += [(user.pk, content, adapt_datetime(at), adapt_date(day)) for day, content, at in user_records]
+            histories += [
+                DailyHistory(user_id=user.pk, date=day, total_intake_text=text, profile_id=snapshot_id, **fields)
+                for day, text, fields in user_histories
+            ]
+            images += [IntakeImage(user_id=user.pk, date=day, image=placeholders[variant][0], note=note)
+                       for day, variant, note in user_images]
+
+        _insert_records(records, batch_size)
+        DailyHistory.objects.bulk_create(histories, batch_size=batch_size)
+        if images:
+            sizes = dict(placeholders)
+            blob_ids = ImageBlob.acquire_many([(image.image.name, sizes[image.image.name]) for image in images])
+            for image, blob_id in zip(images, blob_ids):
+                image.blob_id = blob_id
+            IntakeImage.objects.bulk_create(images, batch_size=batch_size)
+        user_ids = [user.pk for user in users]
+        rollups.rebuild(user_ids)
+
+    counts = {'users': len(users), 'intake_records': len(records), 'histories': len(histories), 'images': len(images)}
+    return counts, user_ids
+
+
+def clear(prefix):
+    """
+    <prefix>-* 사용자와 데이터 삭제 — 반환: 삭제한 사용자 수
+    - 사진/평가 이력은 행마다 시그널(blob 참조 해제, 집계 차감)이 돌지 않도록 바로 DELETE, blob 참조는 묶어서 해제
+    """
+    users = CustomUser.objects.filter(username__startswith=f'{prefix}-')
+    with transaction.atomic():
+        images = IntakeImage.objects.filter(user__in=users)
+        refs = dict(images.exclude(blob=None).values_list('blob_id').annotate(n=Count('id')).order_by())
+        images._raw_delete(images.db)
+        ImageBlob.release_many(refs)  # 참조가 0이 된 blob은 행과 파일까지 삭제
+        histories = DailyHistory.objects.filter(user__in=users)
+        histories._raw_delete(histories.db)
+        _, deleted = users.delete()
+    return deleted.get(CustomUser._meta.label, 0)
+
+
+def populate(count, days=180, seed=22, start=0, prefix='synth', password=None, end_date=None, workers=1,
+             users_per_chunk=100, batch_size=2000, image_variants=8, progress=None):
+    """
+    사용자 count명(index start..start+count-1)과 end_date(기본 어제)까지 days일치 데이터 생성
+    - password: 해시 문자열 (None이면 로그인 불가 계정)
+    - progress(누적 행 수, 저장한 사용자 수): 묶음을 저장할 때마다 호출
+    - 반환: (누적 행 수 {users, intake_records, histories, images}, 사용자 id 목록)
+    """
+    end_date = end_date or business_date() - timedelta(days=1)
+    password = password or make_password(None)
+    placeholders = placeholder_images(image_variants, seed) if image_variants else []
+    generate = partial(generate_chunk, seed, end_date=end_date, days=days, tz_name=settings.TIME_ZONE,
+                       image_variants=len(placeholders))
+    chunks = [range(i, min(i + users_per_chunk, start + count)) for i in range(start, start + count, users_per_chunk)]
+
+    totals = {'users': 0, 'intake_records': 0, 'histories': 0, 'images': 0}
+    user_ids = []
+
+    def store(generated):
+        counts, ids = write_chunk(generated, prefix, password, placeholders, batch_size)
+        user_ids.extend(ids)
+        for name, n in counts.items():
+            totals[name] += n
+        if progress:
+            progress(totals, len(user_ids))
+
+    if workers <= 1:
+        for indexes in chunks:
+            store(generate(indexes))
+        return totals, user_ids
+
+    # 생성은 워커 프로세스, 저장은 여기서 순서대로 — 대기 중인 묶음을 workers*2개로 제한해 메모리 일정
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+        pending = deque()
+        for indexes in chunks:
+            if len(pending) >= workers * 2:
+                store(pending.popleft().result())
+            pending.append(executor.submit(generate, indexes))
+        while pending:
+            store(pending.popleft().result())
+    return totals, user_ids
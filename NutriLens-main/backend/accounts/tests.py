@@ -1,8 +1,78 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Sum
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import evaluation_cache
+from .authentication import check_auth_cache
+from .evaluation import evaluate_day, prepare_evaluation, complete_evaluation, EvaluationError
+from .jobs import process_next_job
+from .llm import get_client, FakeLLMClient, OpenAIClient, LLMError
+from .serializers import IntakeImageSerializer
+from .models import (
+    business_date, IntakeRecord, IntakeImage, ImageBlob, DailyHistory, EvaluationJob, UploadSession, HistoryRollup,
+    EvaluationFlight, ProfileSnapshot,
+)
+from .ratelimit import TokenBucket
+from .streaming import JSONSectionScanner
+from .imaging import phash
+from .recognition import hamming, find_similar
+from .storage import image_storage, BlobMissing
+from .prompting import SYSTEM_PROMPT, count_tokens
+from . import metrics, rollups, singleflight, synthetic
+from . import uploads
 
 CustomUser = get_user_model()
 
+GPT_ANSWER = json.dumps({
+    'macro': {'score': 7, 'reason': 'Balanced.', 'advice': 'More fiber.', 'carbs_g': 210, 'protein_g': 80, 'fat_g': 55},
+    'disease': {'score': 8, 'reason': 'Low sodium.', 'advice': 'Keep it up.'},
+    'goal': {'score': 6, 'reason': 'Slight surplus.', 'advice': 'Smaller dinner.'},
+})
+
+
+def sent_prompts():
+    # 사용자별 부분(프로필 + 기록) — system 메시지는 모든 요청에 공통
+    return [messages[-1]['content'] for messages in get_client().requests]
+
+
+def make_user(username='evaluser', **extra):
+    fields = dict(name='평가', gender='F', age=28, height=162.0, weight=55.0, diet_goal='loss')
+    fields.update(extra)
+    return CustomUser.objects.create_user(username=username, password='testpass123', **fields)
+
+
+class FakeLLMMixin:
+    """가짜 LLM 백엔드 사용, 테스트마다 기록된 요청과 캐시 초기화"""
+
+    def setUp(self):
+        super().setUp()
+        get_client().requests.clear()
+        cache.clear()
+
+
 class AccountsTests(TestCase):
     def test_create_user(self):
         user = CustomUser.objects.create_user(
@@ -17,3 +87,1329 @@ class AccountsTests(TestCase):
         )
         self.assertEqual(user.username, 'testuser')
         self.assertTrue(user.check_password('testpass123'))
+
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER)
+class EvaluationJobTests(FakeLLMMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_evaluate_without_records_is_rejected(self):
+        res = self.client.post('/api/accounts/evaluate/')
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(EvaluationJob.objects.exists())
+
+    @override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER)
+    def test_evaluate_is_queued_and_processed_by_worker(self):
+        IntakeRecord.objects.create(user=self.user, content='김밥 한 줄, 라면')
+
+        res = self.client.post('/api/accounts/evaluate/')
+        self.assertEqual(res.status_code, 202)
+        job_id = res.data['job_id']
+        self.assertEqual(sent_prompts(), [])
+
+        res = self.client.get(f'/api/accounts/evaluate/{job_id}/')
+        self.assertEqual(res.data['status'], 'queued')
+
+        process_next_job()
+        self.assertEqual(len(sent_prompts()), 1)
+
+        res = self.client.get(f'/api/accounts/evaluate/{job_id}/')
+        self.assertEqual(res.data['status'], 'done')
+        self.assertEqual(res.data['grade'], 'B')
+        self.assertEqual(res.data['reason_macro'], 'Carbs 210g, Protein 80g, Fat 55g\nBalanced.')
+        self.assertEqual(DailyHistory.objects.filter(user=self.user).count(), 1)
+
+    @override_settings(LLM_FAKE_RESPONSE='not json')
+    def test_failed_job_reports_error(self):
+        IntakeRecord.objects.create(user=self.user, content='사과')
+        job_id = self.client.post('/api/accounts/evaluate/').data['job_id']
+
+        process_next_job()
+
+        res = self.client.get(f'/api/accounts/evaluate/{job_id}/')
+        self.assertEqual(res.data['status'], 'failed')
+        self.assertEqual(res.data['raw'], 'not json')
+        self.assertFalse(DailyHistory.objects.exists())
+
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER)
+class EvaluationCacheTests(FakeLLMMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        IntakeRecord.objects.create(user=self.user, content='현미밥, 된장찌개')
+
+    def test_unchanged_day_is_served_from_cache(self):
+        first, _ = evaluate_day(self.user, IntakeRecord.objects.get().date)
+        second, raw = evaluate_day(self.user, first.date)
+
+        self.assertEqual(len(sent_prompts()), 1)
+        self.assertEqual(second.pk, first.pk)  # 같은 결과면 DailyHistory를 다시 만들지 않음
+        self.assertEqual(raw, GPT_ANSWER)
+        stats = evaluation_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertGreater(stats['saved_tokens'], 0)
+
+    def test_new_intake_or_profile_change_misses(self):
+        target_date = IntakeRecord.objects.get().date
+        evaluate_day(self.user, target_date)
+
+        IntakeRecord.objects.create(user=self.user, content='아메리카노')
+        evaluate_day(self.user, target_date)
+
+        self.user.weight = 53.0
+        self.user.save()
+        evaluate_day(self.user, target_date)
+
+        self.assertEqual(len(sent_prompts()), 3)
+        self.assertEqual(DailyHistory.objects.filter(user=self.user).count(), 1)
+
+    def test_reevaluation_updates_the_same_row(self):
+        target_date = IntakeRecord.objects.get().date
+        first, _ = evaluate_day(self.user, target_date)
+        IntakeRecord.objects.create(user=self.user, content='우유')
+        second, _ = evaluate_day(self.user, target_date)
+
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(DailyHistory.objects.get().total_intake_text, '현미밥, 된장찌개\n우유')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DailyHistory.objects.create(
+                user=self.user, date=target_date, score_macro=0, score_disease=0, score_goal=0, total_grade='D',
+                profile=first.profile,
+            )
+
+    def test_lru_eviction_respects_max_entries(self):
+        target_date = IntakeRecord.objects.get().date
+        with self.settings(EVAL_CACHE_MAX_ENTRIES=2):
+            for content in ['바나나', '요거트', '닭가슴살']:
+                IntakeRecord.objects.create(user=self.user, content=content)
+                evaluate_day(self.user, target_date)
+
+        self.assertEqual(evaluation_cache.stats()['entries'], 2)
+        self.assertEqual(evaluation_cache.stats()['evictions'], 1)
+
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER)
+class IncrementalEvaluationTests(FakeLLMMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.first = IntakeRecord.objects.create(user=self.user, content='오트밀과 우유')
+        self.target_date = self.first.date
+
+    def test_only_new_records_are_sent(self):
+        history, _ = evaluate_day(self.user, self.target_date)
+        self.assertEqual((history.last_record_id, history.carbs_g), (self.first.id, 210))
+
+        second = IntakeRecord.objects.create(user=self.user, content='제육볶음 정식')
+        history, _ = evaluate_day(self.user, self.target_date)
+
+        prompt = sent_prompts()[-1]
+        self.assertIn('[Earlier Evaluation Today]', prompt)
+        self.assertIn('Carbs 210g, Protein 80g, Fat 55g', prompt)
+        self.assertIn('제육볶음 정식', prompt)
+        self.assertNotIn('오트밀과 우유', prompt)
+        self.assertEqual((history.last_record_id, history.incremental_steps), (second.id, 1))
+        self.assertEqual(history.total_intake_text, '오트밀과 우유\n제육볶음 정식')
+
+    def test_profile_change_falls_back_to_full(self):
+        evaluate_day(self.user, self.target_date)
+        IntakeRecord.objects.create(user=self.user, content='치킨')
+        self.user.has_diabetes = True
+        self.user.save()
+
+        history, _ = evaluate_day(self.user, self.target_date)
+
+        self.assertIn('[Intake Today]', sent_prompts()[-1])
+        self.assertEqual(history.incremental_steps, 0)
+
+    def test_step_limit_forces_full_reevaluation(self):
+        with self.settings(EVAL_INCREMENTAL_MAX_STEPS=1):
+            evaluate_day(self.user, self.target_date)
+            for content in ['떡볶이', '순대']:
+                IntakeRecord.objects.create(user=self.user, content=content)
+                history, _ = evaluate_day(self.user, self.target_date)
+
+        self.assertIn('[Intake Today]', sent_prompts()[-1])
+        self.assertIn('오트밀과 우유', sent_prompts()[-1])
+        self.assertEqual(history.incremental_steps, 0)
+
+
+class TokenBucketTests(TestCase):
+    def test_acquire_waits_for_refill(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(60, clock=lambda: now[0], sleep=sleep)  # 초당 1개, 최대 60개
+        self.assertEqual(bucket.acquire(60), 0.0)
+        self.assertAlmostEqual(bucket.acquire(3), 3.0)
+        self.assertAlmostEqual(bucket.acquire(120), 60.0)  # 버킷보다 큰 요청은 가득 찰 때까지만 대기
+
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER)
+class EvaluateAllCommandTests(FakeLLMMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.users = [make_user(f'bulk{i}') for i in range(3)]
+        for user in self.users[:2]:
+            IntakeRecord.objects.create(user=user, content='비빔밥')
+        self.target_date = IntakeRecord.objects.first().date
+        fd, self.checkpoint = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.addCleanup(os.remove, self.checkpoint)
+
+    def run_command(self, *args):
+        out = io.StringIO()
+        call_command(
+            'evaluate_all', '--date', str(self.target_date), '--concurrency', '1',
+            '--checkpoint', self.checkpoint, *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def test_evaluates_users_with_records_and_no_history(self):
+        out = self.run_command()
+
+        self.assertIn('2 succeeded, 0 failed', out)
+        self.assertEqual(set(DailyHistory.objects.values_list('user_id', flat=True)), {u.id for u in self.users[:2]})
+        with open(self.checkpoint) as fp:
+            self.assertEqual(json.load(fp)['last_user_id'], self.users[1].id)
+
+    def test_resume_skips_checkpointed_users(self):
+        with open(self.checkpoint, 'w') as fp:
+            json.dump({'date': str(self.target_date), 'last_user_id': self.users[0].id, 'failed': []}, fp)
+
+        out = self.run_command('--resume')
+
+        self.assertIn('Evaluated 1 user(s)', out)
+        self.assertEqual(list(DailyHistory.objects.values_list('user_id', flat=True)), [self.users[1].id])
+
+    def test_resume_retries_failed_users(self):
+        with self.settings(LLM_FAKE_RESPONSE='not json'):
+            self.assertIn('0 succeeded, 2 failed', self.run_command())
+        with open(self.checkpoint) as fp:
+            state = json.load(fp)
+        self.assertEqual(state['last_user_id'], self.users[1].id)
+        self.assertEqual(sorted(state['failed']), [u.id for u in self.users[:2]])
+
+        out = self.run_command('--resume')
+
+        self.assertIn('2 succeeded, 0 failed', out)
+        self.assertEqual(DailyHistory.objects.count(), 2)
+        with open(self.checkpoint) as fp:
+            self.assertEqual(json.load(fp)['failed'], [])
+
+    def test_rate_limits_must_be_positive(self):
+        with self.assertRaises(CommandError):
+            self.run_command('--rpm', '0')
+
+
+class LLMClientTests(TestCase):
+    def make_client(self, **kwargs):
+        client = OpenAIClient(api_key='sk-test', model='gpt-test', backoff_base=0, **kwargs)
+        client.session = mock.Mock()
+        return client
+
+    def http_response(self, status_code, body=None, headers=None):
+        res = mock.Mock(status_code=status_code, headers=headers or {}, text=json.dumps(body or {}))
+        res.json.return_value = body
+        return res
+
+    @mock.patch('accounts.llm.time.sleep')
+    def test_retries_transient_errors_then_succeeds(self, sleep):
+        client = self.make_client()
+        ok = {'choices': [{'message': {'content': 'hi'}}], 'usage': {'total_tokens': 12}}
+        client.session.post.side_effect = [
+            self.http_response(503),
+            self.http_response(429, headers={'Retry-After': '2'}),
+            self.http_response(200, ok),
+        ]
+
+        with self.assertLogs('accounts.llm', 'WARNING'):
+            response = client.chat([{'role': 'user', 'content': 'hello'}])
+
+        self.assertEqual((response.content, response.total_tokens), ('hi', 12))
+        self.assertEqual(client.session.post.call_count, 3)
+        self.assertEqual(sleep.call_args_list[-1], mock.call(2.0))
+        self.assertEqual(client.session.post.call_args.kwargs['timeout'], (5.0, 30.0))
+
+    def test_client_errors_are_not_retried(self):
+        client = self.make_client()
+        client.session.post.return_value = self.http_response(401)
+
+        with self.assertRaises(LLMError) as ctx:
+            client.chat([{'role': 'user', 'content': 'hello'}])
+        self.assertEqual(ctx.exception.status_code, 401)
+        self.assertEqual(client.session.post.call_count, 1)
+
+    @mock.patch('accounts.llm.httpx')
+    def test_async_client_is_closed_with_its_event_loop(self, httpx):
+        httpx.AsyncClient.side_effect = lambda **kwargs: mock.Mock(aclose=mock.AsyncMock())
+        client = self.make_client()
+
+        async def session():
+            return client._async_session()
+
+        first = async_to_sync(session)()
+        first.aclose.assert_awaited_once()  # 루프가 끝날 때 닫힘
+        second = async_to_sync(session)()
+        self.assertIsNot(second, first)  # 새 루프에는 새 클라이언트
+        second.aclose.assert_awaited_once()
+
+    @override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=None)
+    def test_backend_is_selected_from_settings(self):
+        client = get_client()
+        self.assertIsInstance(client, FakeLLMClient)
+        self.assertIs(get_client(), client)
+        self.assertIn('macro', json.loads(client.chat([{'role': 'user', 'content': 'x'}]).content))
+
+    def test_fake_client_keeps_only_recent_requests(self):
+        client = FakeLLMClient(max_requests=3)
+        for n in range(10):
+            client.chat([{'role': 'user', 'content': str(n)}])
+        self.assertEqual([messages[0]['content'] for messages in client.requests], ['7', '8', '9'])
+
+
+class JSONSectionScannerTests(TestCase):
+    def test_sections_are_emitted_as_soon_as_they_close(self):
+        scanner = JSONSectionScanner()
+        text = '```json\n' + json.dumps({
+            'macro': {'score': 7, 'reason': 'Has "quotes" and {braces}\\n'},
+            'disease': {'score': 8},
+        })
+        emitted = []
+        for i in range(len(text)):
+            for key, section in scanner.feed(text[i]):
+                emitted.append((i, key, section))
+
+        self.assertEqual([key for _, key, _ in emitted], ['macro', 'disease'])
+        self.assertEqual(emitted[0][2]['reason'], 'Has "quotes" and {braces}\\n')
+        self.assertLess(emitted[0][0], text.index('"disease"'))
+
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER)
+class EvaluateStreamTests(FakeLLMMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def events(self, response):
+        body = b''.join(response.streaming_content).decode()
+        return [
+            (block.split('\n')[0][len('event: '):], json.loads(block.split('\n')[1][len('data: '):]))
+            for block in body.strip().split('\n\n')
+        ]
+
+    def test_streams_categories_then_saves_history(self):
+        IntakeRecord.objects.create(user=self.user, content='샐러드')
+
+        response = self.client.post('/api/accounts/evaluate/stream/')
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = self.events(response)
+        names = [name for name, _ in events if name != 'token']
+        self.assertEqual(names, ['macro', 'disease', 'goal', 'done'])
+        self.assertEqual(''.join(data for name, data in events if name == 'token'), GPT_ANSWER)
+        self.assertEqual(events[-1][1]['grade'], 'B')
+        self.assertTrue(DailyHistory.objects.filter(user=self.user).exists())
+
+    def test_cached_result_is_streamed_without_model_call(self):
+        IntakeRecord.objects.create(user=self.user, content='샐러드')
+        evaluate_day(self.user, IntakeRecord.objects.get().date)
+
+        events = self.events(self.client.post('/api/accounts/evaluate/stream/'))
+
+        self.assertEqual([name for name, _ in events], ['macro', 'disease', 'goal', 'done'])
+        self.assertTrue(events[-1][1]['cached'])
+        self.assertEqual(len(sent_prompts()), 1)
+
+    def test_no_records_is_rejected(self):
+        response = self.client.post('/api/accounts/evaluate/stream/', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.content.startswith(b'event: error'))
+
+
+class HistoryPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        start = date(2025, 1, 1)
+        profile = ProfileSnapshot.get_for({})
+        for i in range(25):
+            DailyHistory.objects.create(
+                user=self.user, date=start + timedelta(days=i), total_intake_text=f'day {i}',
+                score_macro=5, score_disease=5, score_goal=5, total_grade='B', profile=profile,
+            )
+
+    def test_cursor_walks_all_pages_newest_first(self):
+        dates = []
+        cursor = None
+        while True:
+            params = {'page_size': 10}
+            if cursor:
+                params['cursor'] = cursor
+            res = self.client.get('/api/accounts/history/', params)
+            dates += [row['date'] for row in res.data['results']]
+            cursor = res.data['next_cursor']
+            if not res.data['has_more']:
+                break
+
+        self.assertEqual(len(dates), 25)
+        self.assertEqual(dates, sorted(dates, reverse=True))
+        self.assertIsNone(cursor)
+
+    def test_page_size_is_capped_and_total_is_cached(self):
+        with self.settings(HISTORY_MAX_PAGE_SIZE=20):
+            res = self.client.get('/api/accounts/history/', {'page_size': 1000, 'include_total': 1})
+        self.assertEqual(len(res.data['results']), 20)
+        self.assertEqual(res.data['total_count'], 25)
+
+        with self.assertNumQueries(2):  # ETag 검증값 + 첫 페이지 (전체 개수는 캐시)
+            self.client.get('/api/accounts/history/', {'include_total': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DailyHistory.objects.filter(user=self.user).first().delete()
+        res = self.client.get('/api/accounts/history/', {'include_total': 1})
+        self.assertEqual(res.data['total_count'], 24)
+
+    def test_invalid_cursor_is_rejected(self):
+        res = self.client.get('/api/accounts/history/', {'cursor': '!!!'})
+        self.assertEqual(res.status_code, 400)
+
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER)
+class ProfileSnapshotTests(FakeLLMMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.users = [make_user(f'snap{n}', has_gastritis=True) for n in range(3)]
+        self.day = business_date()
+        for user in self.users:
+            IntakeRecord.objects.create(user=user, content=f'김밥 ({user.username})')
+
+    def test_same_profile_shares_one_row(self):
+        histories = [evaluate_day(user, self.day)[0] for user in self.users]
+        self.assertEqual(ProfileSnapshot.objects.count(), 1)
+        self.assertEqual({h.profile_id for h in histories}, {histories[0].profile_id})
+        self.assertTrue(histories[0].profile.has_gastritis_or_ulcer)
+        self.assertFalse(histories[0].profile.has_hyperhomocysteinemia)
+
+        user = self.users[0]
+        user.weight = 54.0
+        user.save()
+        IntakeRecord.objects.create(user=user, content='사과')
+        history, _ = evaluate_day(user, self.day)
+        self.assertEqual(ProfileSnapshot.objects.count(), 2)
+        self.assertEqual(history.profile.weight, 54.0)
+
+    def test_ids_for_normalizes_and_keeps_order(self):
+        base = {'gender': 'F', 'age': 28, 'height': 162, 'weight': 55, 'diet_goal': 'loss'}
+        ids = ProfileSnapshot.ids_for([base, {**base, 'has_gout': True}, {**base, 'height': 162.0}])
+        self.assertEqual(ids[0], ids[2])  # 162와 162.0은 같은 스냅샷
+        self.assertNotEqual(ids[0], ids[1])
+        self.assertEqual(ProfileSnapshot.ids_for([{**base, 'has_gout': True}]), [ids[1]])
+        self.assertEqual(ProfileSnapshot.objects.count(), 2)
+
+    def test_history_response_keeps_profile_fields(self):
+        evaluate_day(self.users[0], self.day)
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        with self.assertNumQueries(2):  # ETag 검증값 + 첫 페이지 (스냅샷은 JOIN)
+            row = client.get('/api/accounts/history/').data['results'][0]
+
+        self.assertNotIn('profile', row)
+        self.assertEqual(list(row)[-1], 'user')
+        self.assertEqual((row['gender'], row['age'], row['diet_goal']), ('F', 28, 'loss'))
+        self.assertTrue(row['has_gastritis_or_ulcer'])
+        self.assertEqual(set(ProfileSnapshot.FIELDS) - set(row), set())
+
+
+class IntakeBatchTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_business_date_follows_client_timestamp(self):
+        res = self.client.post('/api/accounts/chat/batch/', {'entries': [
+            {'content': 'late ramen', 'timestamp': '2025-03-10T02:30:00+09:00'},
+            {'content': 'breakfast', 'timestamp': '2025-03-10T08:00:00+09:00'},
+        ]}, format='json')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['created_count'], 2)
+        records = IntakeRecord.objects.filter(user=self.user).order_by('timestamp')
+        self.assertEqual([r.date for r in records], [date(2025, 3, 9), date(2025, 3, 10)])
+
+    def test_invalid_entries_are_reported_per_item(self):
+        res = self.client.post('/api/accounts/chat/batch/', {'entries': [
+            {'content': 'salad'},
+            {'timestamp': '2025-03-10T08:00:00+09:00'},
+            {'content': 'from the future', 'timestamp': '2999-01-01T00:00:00+09:00'},
+        ]}, format='json')
+
+        self.assertEqual(res.data['created_count'], 1)
+        self.assertEqual([r['status'] for r in res.data['results']], ['created', 'error', 'error'])
+        self.assertIn('content', res.data['results'][1]['errors'])
+        self.assertEqual(IntakeRecord.objects.filter(user=self.user).count(), 1)
+
+    @override_settings(INTAKE_BATCH_MAX_SIZE=2)
+    def test_batch_size_is_limited(self):
+        res = self.client.post('/api/accounts/chat/batch/', {'entries': [{'content': 'x'}] * 3}, format='json')
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(IntakeRecord.objects.exists())
+
+
+class TempMediaMixin:
+    """MEDIA_ROOT를 테스트마다 임시 폴더로"""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+
+class ImageBlobStorageTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content, name='cola.jpg'):
+        return self.client.post('/api/accounts/image-analyze/', {
+            'images': [SimpleUploadedFile(name, content, content_type='image/jpeg')],
+        }, format='multipart')
+
+    def test_same_content_is_stored_once(self):
+        self.upload(b'same photo')
+        self.upload(b'same photo', name='cola_copy.jpg')
+        self.upload(b'other photo')
+
+        first, second = IntakeImage.objects.order_by('id')[:2]
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r'^blobs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        self.assertEqual(ImageBlob.objects.count(), 2)
+        self.assertEqual(ImageBlob.objects.get(pk=first.blob_id).ref_count, 2)
+
+    def test_multi_image_upload_uses_constant_queries(self):
+        def upload(count, tag):
+            with CaptureQueriesContext(connection) as captured:
+                res = self.client.post('/api/accounts/image-analyze/', {
+                    'images': [SimpleUploadedFile(f'{tag}{i}.jpg', f'{tag}{i}'.encode()) for i in range(count)],
+                }, format='multipart')
+            self.assertEqual(res.data['ingested_count'], count)
+            return len(captured)
+
+        self.assertEqual(upload(2, 'a'), upload(8, 'b'))
+        self.assertEqual(ImageBlob.objects.count(), 10)
+        self.assertEqual(set(ImageBlob.objects.values_list('ref_count', flat=True)), {1})
+
+    def test_blob_is_removed_with_last_reference(self):
+        self.upload(b'same photo')
+        self.upload(b'same photo')
+        blob = ImageBlob.objects.get()
+        path = blob.file.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            IntakeImage.objects.first().delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            IntakeImage.objects.get().delete()
+        self.assertFalse(ImageBlob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_file_is_kept_when_reacquired_before_delete(self):
+        self.upload(b'same photo')
+        blob = ImageBlob.objects.get()
+        name, path = blob.file.name, blob.file.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            IntakeImage.objects.get().delete()
+            # 삭제 커밋과 파일 삭제 사이에 같은 내용이 다시 올라온 경우
+            self.assertIsNone(ImageBlob.objects.filter(pk=blob.pk).first())
+            ImageBlob.acquire(name, blob.size)
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(ImageBlob.objects.get().ref_count, 1)
+
+    def test_missing_file_is_not_referenced(self):
+        name = image_storage.save('cola.jpg', ContentFile(b'gone photo'))
+        image_storage.delete(name)  # 저장 직후 다른 요청의 마지막 참조 해제로 삭제된 경우
+
+        with self.assertRaises(BlobMissing):
+            ImageBlob.acquire(name, 10)
+        with self.assertRaises(uploads.UploadError) as ctx, transaction.atomic():
+            uploads.create_images(self.user, [(name, 10)], '', date(2025, 1, 1))
+        self.assertEqual(ctx.exception.status, 409)
+        self.assertFalse(ImageBlob.objects.exists())
+        self.assertFalse(IntakeImage.objects.exists())
+
+    def test_dedupe_command_moves_legacy_files(self):
+        for name in ('cola.jpg', 'cola_c5u2GMO.jpg'):
+            path = f'intake_images/user_{self.user.id}/2025-09-11/{name}'
+            os.makedirs(os.path.join(self.media_root, os.path.dirname(path)), exist_ok=True)
+            with open(os.path.join(self.media_root, path), 'wb') as fp:
+                fp.write(b'same photo')
+            IntakeImage.objects.bulk_create([IntakeImage(user=self.user, image=path, date=date(2025, 9, 11))])
+
+        call_command('dedupe_intake_images', stdout=io.StringIO())
+
+        blob = ImageBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(set(IntakeImage.objects.values_list('image', flat=True)), {blob.file.name})
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'intake_images', f'user_{self.user.id}', '2025-09-11', 'cola.jpg')))
+
+
+def jpeg_bytes(size=(40, 20), orientation=None):
+    from PIL import Image
+    image = Image.new('RGB', size, (200, 30, 30))
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    exif[0x010F] = 'PhoneMaker'
+    out = io.BytesIO()
+    image.save(out, 'JPEG', exif=exif.tobytes())
+    return out.getvalue()
+
+
+@override_settings(IMAGE_DERIVATIVE_SIZES={'thumb': 8, 'medium': 16})
+class ImageDerivativeTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content):
+        return self.client.post('/api/accounts/image-analyze/', {
+            'images': [SimpleUploadedFile('meal.jpg', content, content_type='image/jpeg')],
+        }, format='multipart')
+
+    def test_worker_builds_rotated_derivatives_without_metadata(self):
+        from PIL import Image
+        res = self.upload(jpeg_bytes(orientation=6))  # 90도 회전해서 봐야 하는 사진
+        self.assertEqual(res.data['images'][0]['status'], 'pending')
+        self.assertIsNone(res.data['images'][0]['derivatives'])
+
+        call_command('run_image_worker', '--once', '--processes', '0', stdout=io.StringIO())
+
+        blob = ImageBlob.objects.get()
+        self.assertEqual((blob.status, blob.width, blob.height), ('ready', 20, 40))
+        with Image.open(os.path.join(self.media_root, blob.derivatives['medium']['jpeg'])) as medium:
+            self.assertEqual(medium.size, (8, 16))
+            self.assertEqual(len(medium.getexif()), 0)
+        with Image.open(os.path.join(self.media_root, blob.derivatives['thumb']['webp'])) as thumb:
+            self.assertEqual(thumb.format, 'WEBP')
+
+        data = IntakeImageSerializer(IntakeImage.objects.get()).data
+        self.assertEqual(data['status'], 'ready')
+        self.assertTrue(data['derivatives']['thumb']['webp'].endswith('_thumb.webp'))
+
+    def test_undecodable_upload_is_marked_failed(self):
+        self.upload(b'not really a jpeg')
+        with self.assertLogs('accounts.imaging', 'WARNING'):
+            call_command('run_image_worker', '--once', '--processes', '0', stdout=io.StringIO(), stderr=io.StringIO())
+
+        blob = ImageBlob.objects.get()
+        self.assertEqual(blob.status, 'failed')
+        self.assertTrue(blob.error)
+        self.assertIsNone(IntakeImageSerializer(IntakeImage.objects.get()).data['derivatives'])
+
+
+class ResumableUploadTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        upload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, upload_dir)
+        temp_dir = override_settings(UPLOAD_TEMP_DIR=upload_dir)
+        temp_dir.enable()
+        self.addCleanup(temp_dir.disable)
+
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def start(self, content):
+        res = self.client.post('/api/accounts/uploads/', {'filename': 'meal.jpg', 'size': len(content)}, format='json')
+        self.assertEqual(res.status_code, 201)
+        return res.data['upload_url'], res.data['upload_id']
+
+    def put(self, url, chunk, offset):
+        return self.client.put(url, chunk, content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_chunks_resume_from_server_offset_and_finalize(self):
+        content = os.urandom(300_000)
+        url, upload_id = self.start(content)
+
+        self.assertEqual(self.put(url, content[:100_000], 0).data['offset'], 100_000)
+        # 응답을 못 받은 클라이언트가 같은 청크를 다시 보내면 거절하고 현재 위치를 알려줌
+        res = self.put(url, content[:100_000], 0)
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(res['Upload-Offset'], '100000')
+
+        uploads._hashers.clear()  # 다른 프로세스가 이어받는 경우
+        self.assertEqual(self.client.get(url).data['offset'], 100_000)
+        res = self.put(url, content[100_000:], 100_000)
+        self.assertEqual(res.data['status'], 'complete')
+
+        res = self.client.post('/api/accounts/uploads/finalize/', {'upload_ids': [upload_id], 'note': 'lunch'}, format='json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['ingested_count'], 1)
+        self.assertEqual(res.data['record']['content'], '[Image] 1 image(s) uploaded. Note: lunch')
+
+        image = IntakeImage.objects.get()
+        self.assertEqual(image.blob.sha256, hashlib.sha256(content).hexdigest())
+        with image.image.open('rb') as fp:
+            self.assertEqual(fp.read(), content)
+        self.assertFalse(os.path.exists(uploads.temp_path(UploadSession.objects.get())))
+
+    def test_finalize_is_idempotent_and_requires_complete_uploads(self):
+        url, upload_id = self.start(b'abc')
+        res = self.client.post('/api/accounts/uploads/finalize/', {'upload_ids': [upload_id]}, format='json')
+        self.assertEqual(res.status_code, 409)
+
+        self.put(url, b'abc', 0)
+        for _ in range(2):
+            res = self.client.post('/api/accounts/uploads/finalize/', {'upload_ids': [upload_id]}, format='json')
+            self.assertEqual(res.status_code, 200)
+        self.assertEqual(IntakeImage.objects.count(), 1)
+        self.assertEqual(IntakeRecord.objects.count(), 1)
+        self.assertIsNone(res.data['record'])
+
+    def test_concurrent_chunks_at_same_offset_do_not_mix(self):
+        first, second = os.urandom(200_000), os.urandom(200_000)
+        _, upload_id = self.start(first)
+        raced = []
+        outside = list(transaction.get_connection().savepoint_ids)  # 테스트 자체의 트랜잭션
+
+        class Interleaved(io.BytesIO):
+            # 첫 요청이 본문을 쓰는 동안 같은 offset의 다른 요청이 들어온 경우
+            def read(inner, size=-1):
+                if not raced:
+                    with self.assertRaises(uploads.UploadError) as ctx:
+                        uploads.write_chunk(UploadSession.objects.get(pk=upload_id), 0,
+                                            io.BytesIO(second), len(second))
+                    raced.append(ctx.exception.status)
+                    # 파일을 쓰는 동안에는 DB 쓰기 잠금을 잡지 않음
+                    self.assertEqual(transaction.get_connection().savepoint_ids, outside)
+                return super().read(size)
+
+        with self.settings(UPLOAD_BUFFER_SIZE=64 * 1024):
+            uploads.write_chunk(UploadSession.objects.get(pk=upload_id), 0, Interleaved(first), len(first))
+        self.assertEqual(raced, [409])
+
+        session = UploadSession.objects.get(pk=upload_id)
+        self.assertEqual(session.sha256, hashlib.sha256(first).hexdigest())
+        with open(uploads.temp_path(session), 'rb') as fp:
+            self.assertEqual(fp.read(), first)
+
+    def test_concurrent_finalize_records_once(self):
+        url, upload_id = self.start(b'abc')
+        self.put(url, b'abc', 0)
+        adopt = uploads._adopt
+        raced = []
+
+        def adopt_then_race(session):
+            # 트랜잭션 전 파일 이동 뒤에 같은 업로드의 다른 finalize가 먼저 끝난 경우
+            name = adopt(session)
+            if not raced:
+                raced.append(None)
+                raced.append(uploads.finalize_uploads(self.user, [upload_id]))
+            return name
+
+        with mock.patch('accounts.uploads._adopt', adopt_then_race):
+            images, record = uploads.finalize_uploads(self.user, [upload_id])
+
+        self.assertEqual(IntakeImage.objects.count(), 1)
+        self.assertEqual(IntakeRecord.objects.count(), 1)
+        self.assertEqual(images, raced[1][0])
+        self.assertIsNone(record)
+
+    def test_chunk_past_declared_size_is_rejected(self):
+        url, _ = self.start(b'abc')
+        self.assertEqual(self.put(url, b'abcd', 0).status_code, 400)
+
+
+def photo_bytes(seed, size=(400, 300), quality=90):
+    """사진처럼 부드러운 색 변화가 있는 JPEG"""
+    import random
+    from PIL import Image
+    rng = random.Random(seed)
+    image = Image.new('RGB', (20, 15))
+    image.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(20 * 15)])
+    out = io.BytesIO()
+    image.resize(size, Image.BICUBIC).save(out, 'JPEG', quality=quality)
+    return out.getvalue()
+
+
+RECOGNITION_ANSWER = json.dumps({'foods': [{'name': 'Cola', 'portion': '1 can (355ml)'}], 'description': 'A can of cola.'})
+
+
+@override_settings(IMAGE_RECOGNITION_ENABLED=True, IMAGE_DERIVATIVE_SIZES={'thumb': 64, 'medium': 128},
+                   LLM_BACKEND='fake', LLM_FAKE_RESPONSE=RECOGNITION_ANSWER)
+class ImageRecognitionTests(FakeLLMMixin, TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, *contents):
+        self.client.post('/api/accounts/image-analyze/', {
+            'images': [SimpleUploadedFile(f'meal{i}.jpg', c) for i, c in enumerate(contents)],
+        }, format='multipart')
+        call_command('run_image_worker', '--once', '--processes', '0', stdout=io.StringIO())
+
+    def test_phash_tolerates_resize_and_recompression(self):
+        from PIL import Image
+        original = Image.open(io.BytesIO(photo_bytes(1)))
+        resized = Image.open(io.BytesIO(photo_bytes(1, size=(300, 225), quality=40)))
+        other = Image.open(io.BytesIO(photo_bytes(2)))
+        self.assertLessEqual(hamming(phash(original), phash(resized)), 6)
+        self.assertGreater(hamming(phash(original), phash(other)), 16)
+
+    def test_similar_photo_reuses_recognition_without_model_call(self):
+        self.upload(photo_bytes(1))
+        self.upload(photo_bytes(1, size=(300, 225), quality=60), photo_bytes(2))
+
+        self.assertEqual(len(sent_prompts()), 2)  # 사진 1(첫 업로드)과 사진 2만 호출
+        first, resized, other = ImageBlob.objects.order_by('id')
+        self.assertEqual(first.recognition_id, resized.recognition_id)
+        self.assertNotEqual(first.recognition_id, other.recognition_id)
+        self.assertEqual(first.recognition.hits, 1)
+
+        data = IntakeImageSerializer(IntakeImage.objects.get(blob=resized)).data
+        self.assertEqual(data['recognition']['foods'][0]['name'], 'Cola')
+
+    def test_lookup_respects_distance_threshold(self):
+        self.upload(photo_bytes(1))
+        recognition = ImageBlob.objects.get().recognition
+        # band마다 1비트씩 다름 (거리 4) — 어떤 band도 정확히 일치하지 않으므로 1비트 이웃 조회로만 찾을 수 있음
+        flipped = f'{int(recognition.phash, 16) ^ (1 | 1 << 16 | 1 << 32 | 1 << 48):016x}'
+        self.assertEqual(find_similar(flipped, max_distance=4), (recognition, 4))
+        self.assertEqual(find_similar(flipped, max_distance=3), (None, None))
+        with self.assertRaises(ImproperlyConfigured):
+            find_similar(flipped, max_distance=8)
+
+    def test_recognized_foods_reach_the_evaluation_prompt(self):
+        self.upload(photo_bytes(1))
+        with self.settings(LLM_FAKE_RESPONSE=GPT_ANSWER, EVAL_CACHE_ENABLED=False):
+            evaluate_day(self.user, business_date())
+            prompt = sent_prompts()[-1]
+        self.assertIn('[Foods Recognized In Photos]\n- Cola (1 can (355ml))', prompt)
+        self.assertIn('[Intake Today]', prompt)
+
+    def test_unreadable_file_fails_only_that_blob(self):
+        gone = FileNotFoundError('blob file is gone')
+        with mock.patch('accounts.recognition._image_url', side_effect=[gone, 'data:image/jpeg;base64,']):
+            self.upload(photo_bytes(1), photo_bytes(2))
+
+        first, second = ImageBlob.objects.order_by('id')
+        self.assertEqual((first.status, first.error, first.recognition_id), (ImageBlob.STATUS_FAILED, str(gone), None))
+        self.assertEqual(second.status, ImageBlob.STATUS_READY)
+        self.assertIsNotNone(second.recognition_id)
+
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER, EVAL_CACHE_ENABLED=False)
+class PromptBuilderTests(FakeLLMMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.day = business_date()
+
+    def record(self, content):
+        IntakeRecord.objects.create(user=self.user, content=content)
+
+    def test_upload_boilerplate_is_dropped(self):
+        for content in ['[Image] 1 image(s) uploaded.', '[Image] 2 image(s) uploaded. Note: 김밥 한 줄',
+                        '[Hybrid] Text: 라면 | Images: 1 uploaded', '[Hybrid] Images: 2 uploaded', '아메리카노']:
+            self.record(content)
+        evaluate_day(self.user, self.day)
+
+        system, user = get_client().requests[-1]
+        self.assertEqual(system['content'], SYSTEM_PROMPT)
+        intake = user['content'].split('[Intake Today]\n', 1)[1]
+        self.assertEqual(intake.splitlines(), ['김밥 한 줄', '라면', '아메리카노'])
+
+    def test_oldest_entries_are_dropped_to_fit_budget(self):
+        for i in range(40):
+            self.record(f'meal number {i} with rice, kimchi and a bowl of soup')
+        prompt_budget = count_tokens(SYSTEM_PROMPT) + 250
+        with self.settings(EVAL_PROMPT_MAX_TOKENS=prompt_budget):
+            evaluate_day(self.user, self.day)
+
+        prompt = sent_prompts()[-1]
+        self.assertIn('earlier entries omitted', prompt)
+        self.assertIn('meal number 39', prompt)
+        self.assertNotIn('meal number 0 ', prompt)
+        self.assertLessEqual(count_tokens(SYSTEM_PROMPT) + count_tokens(prompt), prompt_budget)
+
+    def test_profile_block_follows_any_profile_change(self):
+        self.record('현미밥')
+        evaluate_day(self.user, self.day, incremental=False)
+        self.assertIn('Weight: 55.0 kg', sent_prompts()[-1])
+
+        # my_info를 거치지 않은 변경(admin, 다른 프로세스의 ORM 갱신)도 다음 평가에 반영
+        CustomUser.objects.filter(pk=self.user.pk).update(weight=60, has_thyroid=True)
+        self.user.refresh_from_db()
+        history, _ = evaluate_day(self.user, self.day, incremental=False)
+        self.assertIn('Weight: 60.0 kg', sent_prompts()[-1])
+        self.assertIn('Thyroid', sent_prompts()[-1])
+        self.assertEqual(history.profile.weight, 60.0)
+
+
+def rollup_values(user):
+    fields = [f.name for f in HistoryRollup._meta.fields if f.name not in ('id', 'user', 'updated_at')]
+    return sorted(HistoryRollup.objects.filter(user=user, days__gt=0).values_list(*fields))
+
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER, EVAL_CACHE_ENABLED=False)
+class HistoryRollupTests(FakeLLMMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def history(self, day, score, grade='B', **extra):
+        history = DailyHistory.objects.create(
+            user=self.user, date=day, total_intake_text='meal', total_grade=grade,
+            score_macro=score, score_disease=score, score_goal=score, profile=ProfileSnapshot.get_for({}), **extra,
+        )
+        rollups.apply_change(self.user.pk, new=rollups.source_values(history))
+        return history
+
+    def test_reevaluation_replaces_previous_contribution(self):
+        day = business_date()
+        IntakeRecord.objects.create(user=self.user, content='비빔밥')
+        evaluate_day(self.user, day)
+        IntakeRecord.objects.create(user=self.user, content='라떼')
+        answer = json.loads(GPT_ANSWER)
+        answer['macro'].update(score=2, carbs_g=300)
+        with self.settings(LLM_FAKE_RESPONSE=json.dumps(answer)):
+            evaluate_day(self.user, day)
+
+        week = HistoryRollup.objects.get(user=self.user, period='week')
+        self.assertEqual((week.days, week.score_macro_sum, week.carbs_g_sum, week.grade_b), (1, 2, 300, 1))
+        incremental = rollup_values(self.user)
+        rollups.rebuild([self.user.pk])
+        self.assertEqual(rollup_values(self.user), incremental)
+
+    def test_deleting_history_removes_it_from_rollups(self):
+        self.history(date(2025, 3, 3), 9, grade='A', carbs_g=200, protein_g=90, fat_g=50)
+        gone = self.history(date(2025, 3, 4), 3, grade='C')
+        gone.delete()
+
+        week = HistoryRollup.objects.get(user=self.user, period='week', start=date(2025, 3, 3))
+        self.assertEqual((week.days, week.score_macro_sum, week.grade_a, week.grade_c), (1, 9, 1, 0))
+
+        DailyHistory.objects.filter(user=self.user).delete()
+        self.assertEqual(rollup_values(self.user), [])
+
+    def test_summary_reads_only_rollups(self):
+        for i in range(50):
+            self.history(date(2024, 1, 1) + timedelta(days=i * 7), 5 + i % 2)
+        self.history(date(2025, 2, 28), 8, grade='A', carbs_g=100, protein_g=60, fat_g=40)
+        self.history(date(2025, 2, 3), 4, grade='C', carbs_g=200, protein_g=80, fat_g=60)
+
+        with self.assertNumQueries(2):  # ETag 검증값 + 집계 표
+            res = self.client.get('/api/accounts/dashboard/summary/', {'period': 'month', 'limit': 3})
+        latest = res.data['results'][0]
+        self.assertEqual(len(res.data['results']), 3)
+        self.assertEqual((str(latest['start']), str(latest['end'])), ('2025-02-01', '2025-02-28'))
+        self.assertEqual(latest['days'], 2)
+        self.assertEqual(latest['avg_score_total'], 18.0)
+        self.assertEqual(latest['grades'], {'A': 1, 'B': 0, 'C': 1, 'D': 0})
+        self.assertEqual(latest['avg_carbs_g'], 150.0)
+
+        self.assertEqual(self.client.get('/api/accounts/dashboard/summary/', {'period': 'year'}).status_code, 400)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.history = DailyHistory.objects.create(
+            user=self.user, date=date(2025, 1, 1), total_intake_text='day', score_macro=5, score_disease=5,
+            score_goal=5, total_grade='B', profile=ProfileSnapshot.get_for({}),
+        )
+
+    def test_history_answers_304_until_a_history_changes(self):
+        res = self.client.get('/api/accounts/history/')
+        etag = res['ETag']
+        self.assertIn('private', res['Cache-Control'])
+
+        with self.assertNumQueries(1):
+            res = self.client.get('/api/accounts/history/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res['ETag'], etag)
+        # 쿼리 문자열이 다르면 다른 응답
+        self.assertEqual(self.client.get('/api/accounts/history/?page_size=5', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.history.delete()
+        res = self.client.get('/api/accounts/history/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['results'], [])
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertIn('Last-Modified', res)
+
+    def test_my_info_changes_etag_only_on_profile_update(self):
+        etag = self.client.get('/api/accounts/my-info/')['ETag']
+        self.assertNotIn('history_version', self.client.get('/api/accounts/my-info/').data)
+        self.assertEqual(self.client.get('/api/accounts/my-info/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.put('/api/accounts/my-info/', {'weight': 53}, format='json')
+        res = self.client.get('/api/accounts/my-info/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['weight'], 53.0)
+
+    def test_my_info_etag_changes_when_user_is_saved_elsewhere(self):
+        etag = self.client.get('/api/accounts/my-info/')['ETag']
+        user = CustomUser.objects.get(pk=self.user.pk)  # admin/ORM 수정
+        user.weight = 61
+        user.save()
+        res = self.client.get('/api/accounts/my-info/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_profile_update_keeps_history_version(self):
+        # my_info PUT이 요청 시작 때 읽은 사용자 행으로 기록 버전을 되돌리지 않아야 함
+        stale_user = CustomUser.objects.get(pk=self.user.pk)
+        DailyHistory.objects.filter(pk=self.history.pk).delete()
+        client = APIClient()
+        client.force_authenticate(stale_user)
+        client.put('/api/accounts/my-info/', {'age': 29}, format='json')
+
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.history_version, self.user.profile_version, self.user.age), (1, 1, 29))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        caches = {'default': settings.CACHES['default'],
+                  'auth': {**settings.CACHES['auth'], 'LOCATION': self.cache_dir}}
+        override = self.settings(CACHES=caches)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = make_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_is_cached_until_user_changes(self):
+        self.client.get('/api/accounts/my-info/')
+        with self.assertNumQueries(1):  # ETag 검증값만 (토큰/사용자 조회 없음)
+            self.assertEqual(self.client.get('/api/accounts/my-info/').status_code, 200)
+
+        self.user.set_password('changed-pass-456')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/accounts/my-info/').status_code, 401)
+
+    def test_logout_revokes_token(self):
+        self.client.get('/api/accounts/my-info/')
+        self.assertEqual(self.client.post('/api/accounts/logout/').status_code, 200)
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+        self.assertEqual(self.client.get('/api/accounts/my-info/').status_code, 401)
+
+    def test_logout_in_another_process_is_seen_here(self):
+        self.client.get('/api/accounts/my-info/')
+        # 같은 위치를 쓰는 다른 프로세스의 캐시 객체로 무효화
+        other_process = FileBasedCache(self.cache_dir, {})
+        with mock.patch('accounts.authentication.auth_cache', other_process):
+            Token.objects.filter(pk=self.token.pk).delete()
+        self.assertEqual(self.client.get('/api/accounts/my-info/').status_code, 401)
+
+    def test_process_local_auth_cache_fails_system_check(self):
+        with self.settings(CACHES={'default': settings.CACHES['default'],
+                                   'auth': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertEqual([e.id for e in check_auth_cache(None)], ['accounts.E001'])
+        self.assertEqual(check_auth_cache(None), [])
+
+    def test_expired_token_is_rejected_and_replaced_on_login(self):
+        Token.objects.filter(pk=self.token.pk).update(created=timezone.now() - timedelta(hours=2))
+        with self.settings(AUTH_TOKEN_TTL=3600):
+            self.assertEqual(self.client.get('/api/accounts/my-info/').status_code, 401)
+            res = APIClient().post('/api/accounts/login/', {'username': 'evaluser', 'password': 'testpass123'})
+        self.assertNotEqual(res.data['token'], self.token.key)
+        self.assertEqual(Token.objects.get(user=self.user).key, res.data['token'])
+
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER, EVAL_CACHE_ENABLED=False)
+class SingleFlightTests(FakeLLMMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.day = business_date()
+        IntakeRecord.objects.create(user=self.user, content='제육볶음')
+
+    def wait_for_leader(self, leader_work):
+        # 앞선 요청이 실행권을 잡고 있는 상태에서 시작, 첫 대기(sleep) 동안 그 요청이 평가를 마침
+        owner = singleflight.try_acquire(self.user.pk, self.day)
+
+        def leader_finishes(seconds):
+            leader_work()
+            singleflight.release(self.user.pk, self.day, owner)
+
+        return mock.patch('accounts.singleflight.time.sleep', side_effect=leader_finishes)
+
+    def test_waiting_caller_shares_the_running_evaluation(self):
+        leader = {}
+
+        def leader_work():
+            # 실행권을 가진 쪽의 평가 (singleflight를 거치지 않고 직접 실행)
+            plan = prepare_evaluation(self.user, self.day)
+            leader['history'], _ = complete_evaluation(plan, get_client().chat(plan.messages))
+
+        with self.wait_for_leader(leader_work):
+            history, raw_answer = evaluate_day(self.user, self.day)
+
+        self.assertEqual(history.pk, leader['history'].pk)
+        self.assertIsNone(raw_answer)
+        self.assertEqual(len(get_client().requests), 1)
+        self.assertFalse(EvaluationFlight.objects.exists())
+
+    def test_records_added_while_waiting_are_evaluated(self):
+        def leader_work():
+            plan = prepare_evaluation(self.user, self.day)
+            complete_evaluation(plan, get_client().chat(plan.messages))
+            IntakeRecord.objects.create(user=self.user, content='식혜')
+
+        with self.wait_for_leader(leader_work):
+            history, _ = evaluate_day(self.user, self.day)
+
+        self.assertIn('식혜', history.total_intake_text)
+        self.assertEqual(len(get_client().requests), 2)
+
+    def test_expired_lease_is_taken_over_and_live_one_times_out(self):
+        EvaluationFlight.objects.create(user=self.user, date=self.day, owner='crashed',
+                                        expires_at=timezone.now() - timedelta(seconds=1))
+        evaluate_day(self.user, self.day)
+        self.assertFalse(EvaluationFlight.objects.exists())
+
+        singleflight.try_acquire(self.user.pk, self.day)
+        with self.settings(EVAL_FLIGHT_WAIT_TIMEOUT=0), self.assertRaises(EvaluationError):
+            evaluate_day(self.user, self.day)
+
+    def test_repeated_requests_share_queued_job_and_stream_releases_flight(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        first = client.post('/api/accounts/evaluate/').data['job_id']
+        self.assertEqual(client.post('/api/accounts/evaluate/').data['job_id'], first)
+
+        response = client.post('/api/accounts/evaluate/stream/')
+        b''.join(response.streaming_content)
+        response.close()
+        self.assertFalse(EvaluationFlight.objects.exists())
+
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER, EVAL_CACHE_ENABLED=False)
+class MetricsTests(TempMediaMixin, FakeLLMMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.registry.clear()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_requests_are_recorded_and_exposed_to_staff_only(self):
+        self.client.get('/api/accounts/history/')
+        route = 'api/accounts/history/'
+        self.assertEqual(metrics.HTTP_REQUESTS.value(route=route, method='GET', status=200), 1)
+        self.assertEqual(metrics.DB_QUERIES.count(route=route), 1)
+
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        staff = APIClient()
+        staff.force_authenticate(make_user('ops', is_staff=True))
+        res = staff.get('/metrics')
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = res.content.decode()
+        self.assertIn('nutrilens_http_requests_total{route="api/accounts/history/",method="GET",status="200"} 1', body)
+        self.assertIn('nutrilens_http_request_db_queries_bucket{route="api/accounts/history/",le="+Inf"} 1', body)
+
+    def test_llm_calls_tokens_and_failures(self):
+        IntakeRecord.objects.create(user=self.user, content='떡볶이')
+        evaluate_day(self.user, business_date())
+        self.assertEqual(metrics.LLM_REQUESTS.value(model='fake', kind='chat', outcome='ok'), 1)
+        self.assertGreater(metrics.LLM_TOKENS.value(model='fake', type='prompt'), 0)
+
+        client = OpenAIClient(api_key='sk-test', model='gpt-test', backoff_base=0)
+        client.session = mock.Mock()
+        client.session.post.return_value = mock.Mock(status_code=401, headers={}, text='{}')
+        with self.assertRaises(LLMError):
+            client.stream_chat([{'role': 'user', 'content': 'hi'}])
+        self.assertEqual(metrics.LLM_REQUESTS.value(model='gpt-test', kind='stream', outcome='error'), 1)
+
+    def test_upload_bytes_and_slow_request_log(self):
+        files = [SimpleUploadedFile(f'{i}.jpg', jpeg_bytes(size=(40 + i, 20)), content_type='image/jpeg')
+                 for i in range(2)]
+        with self.settings(METRICS_SLOW_REQUEST_MS=0), self.assertLogs('accounts.metrics', 'WARNING') as logs:
+            self.client.post('/api/accounts/image-analyze/', {'images': files}, format='multipart')
+
+        self.assertEqual(metrics.UPLOAD_FILES.value(kind='multipart'), 2)
+        self.assertEqual(metrics.UPLOAD_BYTES.value(kind='multipart'), sum(f.size for f in files))
+        self.assertIn('api/accounts/image-analyze/', logs.output[0])
+        self.assertIn('INSERT INTO "accounts_intakeimage"', logs.output[0])
+
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER, EVAL_CACHE_ENABLED=False)
+class AsyncViewTests(TempMediaMixin, FakeLLMMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.registry.clear()
+        self.user = make_user()
+        self.token = Token.objects.create(user=self.user)
+        self.async_client = AsyncClient()
+        self.headers = {'Authorization': f'Token {self.token.key}'}
+
+    def test_evaluate_now_returns_result(self):
+        res = APIClient().post('/api/accounts/evaluate/now/')
+        self.assertEqual(res.status_code, 401)
+        self.assertEqual(res['WWW-Authenticate'], 'Token')
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.post('/api/accounts/evaluate/now/').status_code, 400)
+
+        IntakeRecord.objects.create(user=self.user, content='비빔밥')
+        res = client.post('/api/accounts/evaluate/now/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['grade'], 'B')
+        self.assertEqual(res.data['raw_gpt_response'], GPT_ANSWER)
+        self.assertTrue(DailyHistory.objects.filter(user=self.user).exists())
+        self.assertEqual(metrics.LLM_REQUESTS.value(model='fake', kind='chat', outcome='ok'), 1)
+        self.assertFalse(EvaluationFlight.objects.exists())
+
+    async def test_upload_under_asgi_records_queries(self):
+        photo = SimpleUploadedFile('meal.jpg', jpeg_bytes(), content_type='image/jpeg')
+        res = await self.async_client.post('/api/accounts/image-analyze/', {'images': [photo], 'note': '점심'},
+                                           headers=self.headers)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['ingested_count'], 1)
+        self.assertEqual(await IntakeImage.objects.filter(user=self.user, note='점심').acount(), 1)
+        # async 뷰의 SQL도 요청별로 집계 (sync_to_async 스레드에서 실행)
+        self.assertEqual(metrics.DB_QUERIES.count(route='api/accounts/image-analyze/'), 1)
+
+
+@override_settings(LLM_BACKEND='fake', LLM_FAKE_RESPONSE=GPT_ANSWER, EVAL_CACHE_ENABLED=False)
+class AsyncStreamTests(FakeLLMMixin, TransactionTestCase):
+    # ASGI에서는 스트림 전용 스레드(다른 DB 연결)가 저장하므로 테스트 트랜잭션 밖에서 실행
+    async def test_stream_is_sent_incrementally_under_asgi(self):
+        user = await sync_to_async(make_user)()
+        token = await Token.objects.acreate(user=user)
+        await IntakeRecord.objects.acreate(user=user, content='샐러드')
+
+        res = await AsyncClient().post(
+            '/api/accounts/evaluate/stream/', headers={'Authorization': f'Token {token.key}'},
+        )
+
+        self.assertTrue(res.is_async)  # 동기 반복자면 ASGI에서 전체를 모아서 보냄
+        body = ''.join([chunk.decode() async for chunk in res.streaming_content])
+        names = [block.split('\n')[0][len('event: '):] for block in body.strip().split('\n\n')]
+        self.assertEqual([name for name in names if name != 'token'], ['macro', 'disease', 'goal', 'done'])
+        self.assertFalse(await EvaluationFlight.objects.aexists())
+
+
+class SyntheticDataTests(TempMediaMixin, TestCase):
+    END = date(2025, 3, 31)
+
+    def rows(self):
+        return (
+            list(IntakeRecord.objects.order_by('user__username', 'timestamp', 'content')
+                 .values_list('user__username', 'content', 'timestamp', 'date')),
+            list(DailyHistory.objects.order_by('user__username', 'date')
+                 .values_list('user__username', 'date', 'score_macro', 'total_grade', 'carbs_g')),
+        )
+
+    def test_same_seed_gives_same_rows_regardless_of_chunking(self):
+        totals, user_ids = synthetic.populate(6, days=30, end_date=self.END, users_per_chunk=4, image_variants=2)
+        self.assertEqual(totals['users'], 6)
+        self.assertEqual(IntakeRecord.objects.count(), totals['intake_records'])
+        self.assertEqual(IntakeImage.objects.count(), totals['images'])
+        self.assertEqual(ImageBlob.objects.count(), 2)
+        self.assertEqual(sum(ImageBlob.objects.values_list('ref_count', flat=True)), totals['images'])
+        # 새벽 기록도 전날 사업일자, 기간 밖 날짜 없음
+        for at, day in IntakeRecord.objects.values_list('timestamp', 'date'):
+            self.assertEqual(business_date(at), day)
+            self.assertLessEqual(day, self.END)
+        self.assertEqual(HistoryRollup.objects.filter(period='month').aggregate(n=Sum('days'))['n'], totals['histories'])
+        first = self.rows()
+
+        files = list(ImageBlob.objects.values_list('file', flat=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(synthetic.clear('synth'), 6)
+        self.assertFalse(DailyHistory.objects.exists())
+        # 참조가 0이 된 blob은 행과 파일까지 삭제
+        self.assertFalse(ImageBlob.objects.exists())
+        self.assertFalse(any(image_storage.exists(name) for name in files))
+        synthetic.populate(6, days=30, end_date=self.END, users_per_chunk=6, image_variants=2)
+        self.assertEqual(self.rows(), first)
+
+    def test_profiles_and_snapshots(self):
+        profiles = [synthetic.generate_profile(random.Random(n)) for n in range(300)]
+        goals = {profile['diet_goal'] for profile in profiles}
+        self.assertEqual(goals, {'loss', 'maintain', 'gain'})
+        self.assertTrue(any(p['has_diabetes'] for p in profiles))
+        self.assertFalse(all(p['has_hypertension'] for p in profiles))
+
+        synthetic.populate(2, days=10, end_date=self.END, image_variants=0)
+        user = CustomUser.objects.get(username='synth-0')
+        self.assertFalse(user.has_usable_password())
+        for history in DailyHistory.objects.filter(user=user):
+            self.assertEqual((history.profile.age, history.profile.has_diabetes), (user.age, user.has_diabetes))
+
+
+class SQLiteBackendTests(TransactionTestCase):
+    def wrapper(self, **options):
+        from backend.sqlite.base import DatabaseWrapper
+        fd, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        settings_dict = dict(connection.settings_dict, NAME=path, OPTIONS=options)
+        wrapper = DatabaseWrapper(settings_dict, alias='sqlite_test')
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        wrapper = self.wrapper(pragmas={'busy_timeout': 1234})
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 1234)
+        self.assertEqual(self.pragma(wrapper, 'foreign_keys'), 1)
+
+    def test_atomic_begins_immediate(self):
+        with CaptureQueriesContext(connection) as captured:
+            with transaction.atomic():
+                IntakeRecord.objects.filter(content='x').count()
+        self.assertEqual(captured[0]['sql'], 'BEGIN IMMEDIATE')
+
+        wrapper = self.wrapper(transaction_mode='sometimes')
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.ensure_connection()
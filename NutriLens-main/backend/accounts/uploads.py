@@ -0,0 +1,268 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import UploadSession, IntakeImage, IntakeRecord, ImageBlob, business_date
+from .storage import image_storage, blob_name, BlobMissing
+
+try:
+    import fcntl
+except ImportError:  # Windows — 프로세스 안에서만 잠금 (개발 서버용)
+    fcntl = None
+
+ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.heic'}
+HASHER_CACHE_SIZE = 256
+
+
+class UploadError(Exception):
+    """이어받기 업로드 요청 오류 — status: HTTP 상태 코드, offset: 클라이언트가 이어서 보낼 위치"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def temp_path(session):
+    return os.path.join(settings.UPLOAD_TEMP_DIR, f'{session.pk}.part')
+
+
+def start_upload(user, filename, size):
+    ext = os.path.splitext(filename or '')[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise UploadError(f'Unsupported file type: {ext or filename!r}.')
+    if size <= 0 or size > settings.UPLOAD_MAX_SIZE:
+        raise UploadError(f'size must be between 1 and {settings.UPLOAD_MAX_SIZE} bytes.')
+
+    session = UploadSession.objects.create(user=user, filename=os.path.basename(filename), size=size)
+    os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+    open(temp_path(session), 'wb').close()
+    return session
+
+
+# 진행 중인 업로드의 해시 상태 (프로세스 내 LRU)
+# - 다른 프로세스가 이어받거나 재시작 후에는 받은 부분을 한 번 다시 읽어 복원
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+
+
+def _hasher_at(session, offset):
+    with _hashers_lock:
+        cached = _hashers.pop(session.pk, None)
+    if cached is not None and cached[0] == offset:
+        return cached[1]
+
+    sha = hashlib.sha256()
+    remaining = offset
+    with open(temp_path(session), 'rb') as fp:
+        while remaining:
+            buf = fp.read(min(settings.UPLOAD_BUFFER_SIZE, remaining))
+            if not buf:
+                break
+            sha.update(buf)
+            remaining -= len(buf)
+    return sha
+
+
+def _remember_hasher(session, offset, sha):
+    with _hashers_lock:
+        _hashers[session.pk] = (offset, sha)
+        while len(_hashers) > HASHER_CACHE_SIZE:
+            _hashers.popitem(last=False)
+
+
+_local_locks = {}
+_local_locks_lock = threading.Lock()
+
+
+def _try_lock(session, fp):
+    """세션의 임시 파일 잠금 (다른 요청이 쓰는 중이면 False) — 같은 서버의 모든 프로세스 사이에서"""
+    if fcntl is None:
+        with _local_locks_lock:
+            lock = _local_locks.setdefault(session.pk, threading.Lock())
+        return lock.acquire(blocking=False)
+    try:
+        fcntl.flock(fp.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _unlock(session, fp):
+    if fcntl is None:
+        _local_locks[session.pk].release()
+    # flock은 파일을 닫을 때 풀림
+
+
+def write_chunk(session, offset, stream, length):
+    """
+    offset부터 length 바이트를 stream에서 읽어 임시 파일의 그 위치에 기록 (버퍼 크기만큼씩 — 메모리 사용량 일정)
+    - offset은 서버가 받은 위치(received)와 같아야 함, 연결이 끊겨 덜 받은 만큼은 다음 요청에서 이어서
+    - 세션별 파일 잠금을 잡은 요청만 기록, 같은 세션에 동시에 들어온 다른 요청은 409
+    - 디스크 쓰기는 트랜잭션 밖에서, received를 올리는 조건부 UPDATE만 짧게 트랜잭션 안에서
+    """
+    if session.status != UploadSession.STATUS_UPLOADING:
+        raise UploadError('Upload is already complete.', status=409, offset=session.received)
+    if offset != session.received:
+        raise UploadError('Upload-Offset does not match the received size.', status=409, offset=session.received)
+    if offset + length > session.size:
+        raise UploadError('Chunk goes past the declared size.', offset=session.received)
+
+    try:
+        fp = open(temp_path(session), 'r+b')
+    except FileNotFoundError:  # cleanup_uploads가 만료 세션을 지운 경우
+        raise UploadError('Upload session is no longer active.', status=410) from None
+    with fp:
+        if not _try_lock(session, fp):
+            raise UploadError('Another request is writing to this upload.', status=409, offset=session.received)
+        try:
+            # 잠금을 기다리기 전에 읽은 행일 수 있음 — 그 사이 다른 요청이 반영했으면 현재 위치를 알려줌
+            session.refresh_from_db(fields=['received', 'status'])
+            if session.status != UploadSession.STATUS_UPLOADING or session.received != offset:
+                raise UploadError('Upload-Offset does not match the received size.', status=409,
+                                  offset=session.received)
+
+            sha = _hasher_at(session, offset)
+            written = 0
+            fp.seek(offset)
+            fp.truncate()  # 이전에 실패한 요청이 남긴 꼬리 제거
+            while written < length:
+                buf = stream.read(min(settings.UPLOAD_BUFFER_SIZE, length - written))
+                if not buf:
+                    break
+                fp.write(buf)
+                sha.update(buf)
+                written += len(buf)
+            fp.flush()
+
+            received = offset + written
+            fields = {'received': received, 'updated_at': timezone.now()}
+            if received == session.size:
+                fields.update(status=UploadSession.STATUS_COMPLETE, sha256=sha.hexdigest())
+            with transaction.atomic():
+                updated = UploadSession.objects.filter(
+                    pk=session.pk, received=offset, status=UploadSession.STATUS_UPLOADING,
+                ).update(**fields)
+        finally:
+            _unlock(session, fp)
+
+    if not updated:  # 기록 중에 세션이 만료·삭제된 경우
+        raise UploadError('Upload session is no longer active.', status=410)
+    if received < session.size:
+        _remember_hasher(session, received, sha)
+
+    for name, value in fields.items():
+        setattr(session, name, value)
+    return session
+
+
+def _adopt(session):
+    """받은 파일을 내용 해시 blob으로 이동 (이전 finalize가 롤백돼 이미 옮겨졌으면 그대로 사용)"""
+    ext = os.path.splitext(session.filename)[1].lower()
+    path = temp_path(session)
+    if os.path.exists(path):
+        return image_storage.adopt(path, session.sha256, ext)
+    name = blob_name(session.sha256, ext)
+    if not image_storage.exists(name):
+        raise UploadError(f'Upload {session.pk} data is missing, start a new upload.', status=410)
+    return name
+
+
+def store_files(files):
+    """
+    업로드 파일들을 스레드 풀에서 동시에 blob 저장소에 기록 (해시 계산 + 디스크 쓰기)
+    - 반환: 입력 순서의 [(blob 경로, 크기), ...]
+    """
+    if len(files) <= 1:
+        return [(image_storage.save(f.name, f), f.size) for f in files]
+    with ThreadPoolExecutor(max_workers=min(settings.IMAGE_UPLOAD_WRITE_THREADS, len(files))) as pool:
+        names = list(pool.map(lambda f: image_storage.save(f.name, f), files))
+    return [(name, f.size) for name, f in zip(names, files)]
+
+
+def create_images(user, stored, note, diet_date):
+    """
+    store_files 결과로 IntakeImage를 bulk_create 한 번에 생성 (호출 측 트랜잭션 안에서)
+    - bulk_create는 save()를 거치지 않으므로 blob 참조 수는 acquire_many로 직접 올림
+    - 롤백되면 이미 쓴 blob 파일은 남지만, 같은 내용이 다시 올라오면 그대로 재사용됨
+    - 저장 직후 다른 요청이 같은 blob을 지웠으면 409 (다시 올리면 됨)
+    """
+    if not stored:
+        return []
+    try:
+        blob_ids = ImageBlob.acquire_many(stored)
+    except BlobMissing as e:
+        raise UploadError(f'{e} Please upload again.', status=409) from e
+    blobs = ImageBlob.objects.in_bulk(set(blob_ids))
+    return IntakeImage.objects.bulk_create([
+        IntakeImage(user=user, image=name, blob=blobs[blob_id], note=note, date=diet_date)
+        for (name, _), blob_id in zip(stored, blob_ids)
+    ])
+
+
+def finalize_uploads(user, upload_ids, note=''):
+    """
+    수신 완료된 업로드들을 image_analyze와 같은 방식으로 기록 (IntakeImage + IntakeRecord 요약)
+    - 이미 finalize된 업로드는 기존 IntakeImage를 그대로 반환 (재시도해도 중복 기록 없음)
+    - 반환: (images, record 또는 None)
+    """
+    upload_ids = list(dict.fromkeys(str(upload_id) for upload_id in upload_ids))
+    sessions = {str(s.pk): s for s in UploadSession.objects.filter(user=user, pk__in=upload_ids)}
+    missing = [upload_id for upload_id in upload_ids if upload_id not in sessions]
+    if missing:
+        raise UploadError(f'Unknown upload id(s): {", ".join(missing)}.', status=404)
+    incomplete = [s for s in sessions.values() if s.status == UploadSession.STATUS_UPLOADING]
+    if incomplete:
+        raise UploadError(f'Upload(s) not complete: {", ".join(str(s.pk) for s in incomplete)}.', status=409)
+
+    def is_pending(session):
+        return not (session.status == UploadSession.STATUS_FINALIZED and session.image_id)
+
+    pending = [s for s in sessions.values() if is_pending(s)]
+    diet_date = business_date()
+    stored = {s.pk: (_adopt(s), s.size) for s in pending}  # 파일 이동은 트랜잭션 밖에서
+    with transaction.atomic():
+        # 같은 업로드를 동시에 finalize해도 한 번만 기록 — 행을 잠근 뒤 다시 확인
+        # (SQLite는 BEGIN IMMEDIATE로 트랜잭션 전체가 직렬화되므로 select_for_update 없이도 같음)
+        sessions.update(
+            (str(s.pk), s) for s in UploadSession.objects.select_for_update().filter(pk__in=stored)
+        )
+        pending = [sessions[str(pk)] for pk in stored if is_pending(sessions[str(pk)])]
+        created = create_images(user, [stored[s.pk] for s in pending], note, diet_date)
+        for session, image in zip(pending, created):
+            session.status = UploadSession.STATUS_FINALIZED
+            session.image = image
+            session.updated_at = timezone.now()
+        UploadSession.objects.bulk_update(pending, ['status', 'image', 'updated_at'])
+
+        record = None
+        if created:
+            record = IntakeRecord.objects.create(
+                user=user,
+                content=f"[Image] {len(created)} image(s) uploaded." + (f" Note: {note}" if note else ""),
+                date=diet_date,
+            )
+    return [sessions[upload_id].image for upload_id in upload_ids], record
+
+
+def expire_sessions():
+    """UPLOAD_SESSION_TTL(초) 동안 갱신되지 않은 세션과 임시 파일 삭제"""
+    cutoff = timezone.now() - timezone.timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    expired = list(UploadSession.objects.filter(updated_at__lt=cutoff))
+    for session in expired:
+        try:
+            os.remove(temp_path(session))
+        except FileNotFoundError:
+            pass
+        with _hashers_lock:
+            _hashers.pop(session.pk, None)
+        with _local_locks_lock:
+            _local_locks.pop(session.pk, None)
+    UploadSession.objects.filter(pk__in=[s.pk for s in expired]).delete()
+    return len(expired)
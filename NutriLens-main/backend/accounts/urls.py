@@ -1,13 +1,22 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path('register/', views.register_view, name='register'),
     path('login/', views.login_view, name='login'),
+    path('logout/', views.logout_view, name='logout'),
     path('my-info/', views.my_info_view, name='my-info'),
     path('chat/', views.chat_api, name='chat'),
+    path('chat/batch/', views.chat_batch_api, name='chat-batch'),
     path('evaluate/', views.evaluate_daily_intake, name='evaluate'),
-    path('image-analyze/', views.image_analyze, name='image_analyze'),
-    path('hybrid-analyze/', views.hybrid_analyze, name='hybrid_analyze'),
+    path('evaluate/now/', async_views.evaluate_now, name='evaluate-now'),
+    path('evaluate/stream/', views.evaluate_stream, name='evaluate-stream'),
+    path('evaluate/<int:job_id>/', views.evaluate_status, name='evaluate-status'),
+    path('image-analyze/', async_views.image_analyze, name='image_analyze'),
+    path('hybrid-analyze/', async_views.hybrid_analyze, name='hybrid_analyze'),
+    path('uploads/', views.upload_init, name='upload-init'),
+    path('uploads/finalize/', views.upload_finalize, name='upload-finalize'),
+    path('uploads/<uuid:upload_id>/', views.upload_chunk, name='upload-chunk'),
     path('history/', views.daily_history_list, name='history'),
+    path('dashboard/summary/', views.dashboard_summary, name='dashboard-summary'),
 ]
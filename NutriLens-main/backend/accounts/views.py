@@ -1,4 +1,3 @@
-import openai
 from django.conf import settings
 from django.contrib.auth import authenticate
 from django.utils import timezone
@@ -7,16 +6,20 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 
-from .models import CustomUser, IntakeRecord, DailyHistory
+from django.db import transaction
+
+from .models import CustomUser, IntakeRecord, DailyHistory, business_date
+from . import conditional, metrics
+from .authentication import issue_token
 from .serializers import (
     RegisterSerializer,
     LoginSuccessSerializer,
     UserInfoSerializer,
     IntakeRecordSerializer,
+    IntakeBatchEntrySerializer,
     DailyHistorySerializer,
 )
 
-openai.api_key = settings.OPENAI_API_KEY
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -39,23 +42,35 @@ def login_view(request):
         )
     user = authenticate(request, username=username, password=password)
     if user is not None:
-        token, _ = Token.objects.get_or_create(user=user)
+        token = issue_token(user)
         return Response({
             'token': token.key,
             'user': LoginSuccessSerializer(user).data
         })
     return Response({'error': '아이디 또는 비밀번호가 틀렸습니다.'}, status=400)
 
+@api_view(['POST'])
+def logout_view(request):
+    # 토큰 삭제 (post_delete 신호가 인증 캐시도 삭제) — 이후 같은 토큰은 401
+    if request.auth is not None:
+        Token.objects.filter(key=request.auth.key).delete()
+    return Response({'message': '로그아웃 완료'})
+
 @api_view(['GET', 'PUT'])
 def my_info_view(request):
     user = request.user
     if request.method == 'GET':
+        cached = conditional.validators(request, conditional.PROFILE)
+        not_modified = cached.not_modified(request)
+        if not_modified is not None:
+            return not_modified
         serializer = UserInfoSerializer(user)
-        return Response(serializer.data)
+        return cached.apply(Response(serializer.data))
     elif request.method == 'PUT':
         serializer = UserInfoSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()  # post_save에서 profile 버전 증가
             return Response({'message': '정보 수정 완료'})
         return Response(serializer.errors, status=400)
 
@@ -71,10 +86,59 @@ def chat_api(request):
         'record': IntakeRecordSerializer(record).data
     })
 
+@api_view(['POST'])
+def chat_batch_api(request):
+    """
+    여러 기록을 한 번에 저장 (오프라인 큐 재전송용)
+    - 요청: {"entries": [{"content": "...", "timestamp": "ISO-8601(옵션)"}, ...]}
+    - 사업일자는 각 항목의 timestamp 기준, 유효한 항목만 한 트랜잭션으로 bulk_create
+    - 응답: 항목별 결과(results), 저장/실패 개수
+    """
+    entries = request.data.get('entries')
+    if not isinstance(entries, list) or not entries:
+        return Response({'error': 'entries must be a non-empty list.'}, status=400)
+    if len(entries) > settings.INTAKE_BATCH_MAX_SIZE:
+        return Response(
+            {'error': f'Too many entries (max {settings.INTAKE_BATCH_MAX_SIZE}).'},
+            status=400
+        )
+
+    now = timezone.now()
+    max_skew = timezone.timedelta(seconds=settings.INTAKE_BATCH_MAX_CLOCK_SKEW)
+    results = [None] * len(entries)
+    pending = []  # (index, IntakeRecord)
+    for index, entry in enumerate(entries):
+        serializer = IntakeBatchEntrySerializer(data=entry if isinstance(entry, dict) else {})
+        if not serializer.is_valid():
+            results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
+            continue
+        timestamp = serializer.validated_data.get('timestamp') or now
+        if timestamp > now + max_skew:
+            results[index] = {'index': index, 'status': 'error', 'errors': {'timestamp': ['Timestamp is in the future.']}}
+            continue
+        # bulk_create는 save()를 거치지 않으므로 사업일자를 직접 계산
+        pending.append((index, IntakeRecord(
+            user=request.user,
+            content=serializer.validated_data['content'],
+            timestamp=timestamp,
+            date=business_date(timestamp),
+        )))
+
+    with transaction.atomic():
+        created = IntakeRecord.objects.bulk_create([record for _, record in pending])
+    for (index, _), record in zip(pending, created):
+        results[index] = {'index': index, 'status': 'created', 'record': IntakeRecordSerializer(record).data}
+
+    return Response({
+        'message': '기록 완료',
+        'created_count': len(created),
+        'error_count': len(entries) - len(created),
+        'results': results,
+    }, status=200 if created else 400)
+
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.utils import timezone
-import openai
 import json
 from .models import IntakeRecord, DailyHistory
 from .serializers import UserInfoSerializer
@@ -82,7 +146,6 @@ from .serializers import UserInfoSerializer
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.utils import timezone
-import openai
 import json
 from .models import IntakeRecord, DailyHistory
 from .serializers import UserInfoSerializer
@@ -91,7 +154,6 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.utils import timezone
 import json
-import openai
 
 from .models import IntakeRecord, DailyHistory
 from .serializers import UserInfoSerializer
@@ -101,242 +163,164 @@ from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
+from django.urls import reverse
+from django.http import StreamingHttpResponse
+from .evaluation import evaluation_payload, prepare_evaluation, NoIntakeRecords
+from .models import business_date as _business_date
+from rest_framework.decorators import renderer_classes
+from rest_framework.renderers import JSONRenderer
+from . import singleflight
+from django.core.handlers.asgi import ASGIRequest
+from .streaming import stream_evaluation, EventStreamRenderer, FlightStream, AsyncFlightStream
+from .history import history_page, history_total, InvalidCursor
+from .rollups import summary as rollup_summary
+from .jobs import enqueue_evaluation
+from .models import EvaluationJob, HistoryRollup
 # openai, json, DailyHistory, IntakeRecord, UserInfoSerializer 등은 기존 import 유지
 
-def _business_date():
-    """
-    새벽 3시 이전은 전날로 간주하는 '사업일자' 계산
-    """
-    now = timezone.localtime()
-    base_date = now.date()
-    if now.hour < 3:
-        return base_date - timedelta(days=1)
-    return base_date
-
 @api_view(['POST'])
 def evaluate_daily_intake(request):
-
+    """
+    평가 작업을 대기열에 넣고 바로 job id 반환
+    - GPT 호출은 run_eval_worker가 처리, 결과는 evaluate/<job_id>/ 에서 조회
+    """
     user = request.user
 
-    # 1) '사업일자' 규칙(새벽 3시 이전 전날) 적용
+    # 1) '사업일자' 규칙(새벽 3시 이전 전날) 적용 — 요청 시점 기준으로 고정
     target_date = _business_date()
 
-    # 2) 오늘(사업일자) 기록 조회
-    records = IntakeRecord.objects.filter(user=user, date=target_date).order_by('timestamp')
-    if not records.exists():
+    # 2) 오늘(사업일자) 기록이 없으면 작업을 만들지 않음
+    if not IntakeRecord.objects.filter(user=user, date=target_date).exists():
         return Response(
             {'error': f'No intake records found for {target_date}.'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    all_text = "\n".join([r.content for r in records])
-    profile = UserInfoSerializer(user).data
-
-    # 3) 질병 요약
-    disease_fields = [
-        k.replace('has_', '').replace('_', ' ').title()
-        for k, v in profile.items() if k.startswith('has_') and v
-    ]
-    disease_summary = ', '.join(disease_fields) if disease_fields else 'None'
-
-    # 4) GPT 프롬프트 (탄/단/지 g 수치 추가 요청)
-    prompt = f"""
-You are a professional health consultant. Below is a user's profile and today's food/supplement intake.
-
-[User Profile]
-Gender: {profile['gender']}
-Age: {profile['age']}
-Height: {profile['height']} cm
-Weight: {profile['weight']} kg
-Health Conditions: {disease_summary}
-Vegetarian: {"Yes" if profile.get('is_vegetarian') else "No"}
-Diet Goal: {profile['diet_goal']}
-
-[Intake Today]
-{all_text}
-
-Please evaluate the user's daily diet in the following three categories.
-
-Ignore any lines that are not related to food or supplement intake.
-
-For each category, return:
-- A score between 0 and 10 (integer)
-- A brief reason for the score (1–2 sentences, English only)
-- One suggestion for improvement (1 sentence, English only)
-
-Additionally for the "macro" category ONLY, estimate the user's daily intake of macronutrients in grams:
-- carbs_g, protein_g, fat_g
-These should be non-negative integers (grams) rounded to the nearest whole number. If you are unsure, provide your best estimate.
-
-Respond strictly in this JSON format:
-
-{{
-  "macro": {{
-    "score": <integer 0–10>,
-    "reason": "<why this macro score>",
-    "advice": "<tip to improve macro score>",
-    "carbs_g": <integer>,
-    "protein_g": <integer>,
-    "fat_g": <integer>
-  }},
-  "disease": {{
-    "score": <integer 0–10>,
-    "reason": "<why this disease score>",
-    "advice": "<tip to improve disease score>"
-  }},
-  "goal": {{
-    "score": <integer 0–10>,
-    "reason": "<why this goal score>",
-    "advice": "<tip to improve goal score>"
-  }}
-}}
-"""
-
-    def _to_int_safe(x, default=None):
-        try:
-            # float로 한번 받아서 반올림 후 int 처리
-            return int(round(float(x)))
-        except Exception:
-            return default
+    job = enqueue_evaluation(user, target_date)
+    return Response({
+        'job_id': job.id,
+        'status': job.status,
+        'evaluated_date': str(target_date),
+        'status_url': reverse('evaluate-status', args=[job.id]),
+    }, status=status.HTTP_202_ACCEPTED)
 
-    # 5) GPT 호출 & 파싱
-    raw_answer = None
-    try:
-        gpt_response = openai.ChatCompletion.create(
-            model='gpt-3.5-turbo',
-            messages=[{"role": "user", "content": prompt}]
-        )
-        raw_answer = gpt_response['choices'][0]['message']['content']
-        print('okay')
-        result = json.loads(raw_answer)
-
-        # --- macro ---
-        score_macro = int(result.get('macro', {}).get('score', 0))
-        reason_macro_raw = result.get('macro', {}).get('reason', '') or ''
-        advice_macro = result.get('macro', {}).get('advice', '') or ''
-
-        carbs_g = _to_int_safe(result.get('macro', {}).get('carbs_g'), default=None)
-        protein_g = _to_int_safe(result.get('macro', {}).get('protein_g'), default=None)
-        fat_g = _to_int_safe(result.get('macro', {}).get('fat_g'), default=None)
-
-        # 1줄 요약(line 1) 구성: Carbs ~~g, Protein ~~g, Fat ~~g
-        if carbs_g is not None and protein_g is not None and fat_g is not None:
-            macro_line1 = f"Carbs {carbs_g}g, Protein {protein_g}g, Fat {fat_g}g"
-        else:
-            # 백업 형식(혹시 모델이 누락한 경우)
-            c = f"{carbs_g}g" if carbs_g is not None else "N/A"
-            p = f"{protein_g}g" if protein_g is not None else "N/A"
-            f = f"{fat_g}g" if fat_g is not None else "N/A"
-            macro_line1 = f"Carbs {c}, Protein {p}, Fat {f}"
-
-        # 최종 reason_macro: 1줄 요약 + 개행 + 기존 이유(2줄째)
-        reason_macro = f"{macro_line1}\n{reason_macro_raw.strip()}"
-
-        # --- disease ---
-        score_disease = int(result.get('disease', {}).get('score', 0))
-        reason_disease = result.get('disease', {}).get('reason', '') or ''
-        advice_disease = result.get('disease', {}).get('advice', '') or ''
-
-        # --- goal ---
-        score_goal = int(result.get('goal', {}).get('score', 0))
-        reason_goal = result.get('goal', {}).get('reason', '') or ''
-        advice_goal = result.get('goal', {}).get('advice', '') or ''
-
-    except Exception as e:
-        return Response(
-            {'error': 'Failed to parse GPT response', 'raw': raw_answer, 'detail': str(e)},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
 
-    # 6) 총점 → 등급
-    score_total = score_macro + score_disease + score_goal
-    if score_total <= 4:
-        grade = 'D'
-    elif score_total <= 14:
-        grade = 'C'
-    elif score_total <= 24:
-        grade = 'B'
-    else:
-        grade = 'A'
-
-    # 7) DailyHistory 저장 (해당 사업일자 기준으로 교체 저장)
-    DailyHistory.objects.filter(user=user, date=target_date).delete()
-    DailyHistory.objects.create(
-        user=user,
-        date=target_date,
-        total_intake_text=all_text,
-        score_macro=score_macro,
-        score_disease=score_disease,
-        score_goal=score_goal,
-        total_grade=grade,
-        reason_macro=reason_macro,          # ← 2줄 형식으로 저장
-        reason_disease=reason_disease,
-        reason_goal=reason_goal,
-        advice_macro=advice_macro,
-        advice_disease=advice_disease,
-        advice_goal=advice_goal,
-
-        gender=profile['gender'],
-        age=profile['age'],
-        height=profile['height'],
-        weight=profile['weight'],
-        diet_goal=profile['diet_goal'],
-
-        has_diabetes=profile.get('has_diabetes', False),
-        has_hypertension=profile.get('has_hypertension', False),
-        has_hyperlipidemia=profile.get('has_hyperlipidemia', False),
-        has_anemia=profile.get('has_anemia', False),
-        has_obesity=profile.get('has_obesity', False),
-        has_metabolic_syndrome=profile.get('has_metabolic_syndrome', False),
-        has_gout=profile.get('has_gout', False),
-        has_hyperhomocysteinemia=profile.get('has_hyperhomocysteinemia', False),
-        has_ibs=profile.get('has_ibs', False),
-        has_gastritis_or_ulcer=profile.get('has_gastritis_or_ulcer', False),
-        has_constipation=profile.get('has_constipation', False),
-        has_fatty_liver=profile.get('has_fatty_liver', False),
+@api_view(['POST'])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def evaluate_stream(request):
+    """
+    evaluate/ 의 스트리밍 버전 (Server-Sent Events)
+    - GPT 출력 조각과 항목(macro/disease/goal)별 결과를 완성되는 대로 전송
+    - 마지막 done 이벤트 전에 DailyHistory 저장
+    """
+    target_date = _business_date()
+    # 같은 사업일자 평가가 진행 중이면 끝날 때까지 기다렸다가 그 결과를 공유
+    try:
+        flight = singleflight.Flight(request.user.pk, target_date).acquire()
+    except singleflight.FlightTimeout as e:
+        return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+    try:
+        plan = prepare_evaluation(request.user, target_date, reuse_latest=flight.waited)
+    except NoIntakeRecords as e:
+        flight.release()
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception:
+        flight.release()
+        raise
+
+    # ASGI에서는 async 반복자여야 조각이 도착하는 대로 전송됨
+    stream_class = AsyncFlightStream if isinstance(request._request, ASGIRequest) else FlightStream
+    response = StreamingHttpResponse(
+        stream_class(stream_evaluation(plan), flight), content_type='text/event-stream',
     )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx 버퍼링 해제
+    return response
 
-    # 8) 응답 (reason_macro를 2줄 형식으로 반환)
-    return Response({
-        'grade': grade,
-        'score_macro': score_macro,
-        'score_disease': score_disease,
-        'score_goal': score_goal,
-        'score_total': score_total,
-        'reason_macro': reason_macro,        # ← 2줄
-        'reason_disease': reason_disease,
-        'reason_goal': reason_goal,
-        'advice_macro': advice_macro,
-        'advice_disease': advice_disease,
-        'advice_goal': advice_goal,
-        'intake_summary': all_text,
-        'feedback_saved': True,
-        'raw_gpt_response': raw_answer,
-        'evaluated_date': str(target_date),
-    }, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+def evaluate_status(request, job_id):
+    """
+    평가 작업 상태 조회
+    - done이면 기존 evaluate/ 응답과 같은 형식의 평가 결과를 함께 반환
+    """
+    job = EvaluationJob.objects.filter(pk=job_id, user=request.user).first()
+    if job is None:
+        return Response({'error': 'Job not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    data = {'job_id': job.id, 'status': job.status, 'evaluated_date': str(job.date)}
+    if job.status == EvaluationJob.STATUS_DONE:
+        # 이후 재평가로 교체되었으면 해당 사업일자의 최신 기록을 반환
+        history = job.history or DailyHistory.objects.filter(user=job.user, date=job.date).order_by('-id').first()
+        if history is not None:
+            data.update(evaluation_payload(history, job.raw_response or None))
+    elif job.status == EvaluationJob.STATUS_FAILED:
+        data.update({'error': 'Failed to evaluate daily intake', 'detail': job.error, 'raw': job.raw_response or None})
+    return Response(data)
 
 
 
 
 @api_view(['GET'])
 def daily_history_list(request):
+    """
+    평가 기록 목록 (최신순, 커서 기반)
+    - 쿼리: cursor(이전 응답의 next_cursor), page_size(최대 HISTORY_MAX_PAGE_SIZE), include_total=1
+    """
     user = request.user
-    page = int(request.GET.get('page', 1))
-    page_size = 10
-    histories = DailyHistory.objects.filter(user=user).order_by('-date')
-    start = (page - 1) * page_size
-    end = start + page_size
-    serializer = DailyHistorySerializer(histories[start:end], many=True)
-    return Response(serializer.data)
-
-from rest_framework.decorators import api_view, permission_classes, parser_classes
+    cached = conditional.validators(request, conditional.HISTORY)
+    not_modified = cached.not_modified(request)
+    if not_modified is not None:
+        return not_modified
+    try:
+        page_size = int(request.GET.get('page_size', settings.HISTORY_PAGE_SIZE))
+        if page_size < 1:
+            raise ValueError
+        histories, next_cursor, has_more = history_page(user, request.GET.get('cursor'), page_size)
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError:
+        return Response({'error': 'page_size must be a positive integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    data = {
+        'results': DailyHistorySerializer(histories, many=True).data,
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+    }
+    if request.GET.get('include_total') in ('1', 'true'):
+        data['total_count'] = history_total(user)
+    return cached.apply(Response(data))
+
+
+@api_view(['GET'])
+def dashboard_summary(request):
+    """
+    주/월별 평가 요약 (최신순) — 집계 표(HistoryRollup)만 읽음
+    - 쿼리: period=week|month (기본 week), limit(최대 DASHBOARD_SUMMARY_MAX_PERIODS)
+    """
+    period = request.GET.get('period', HistoryRollup.PERIOD_WEEK)
+    if period not in dict(HistoryRollup.PERIOD_CHOICES):
+        return Response({'error': 'period must be "week" or "month".'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = int(request.GET.get('limit', settings.DASHBOARD_SUMMARY_PERIODS))
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return Response({'error': 'limit must be a positive integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    cached = conditional.validators(request, conditional.HISTORY)
+    not_modified = cached.not_modified(request)
+    if not_modified is not None:
+        return not_modified
+    return cached.apply(Response({'period': period, 'results': rollup_summary(request.user, period, limit)}))
+
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.parsers import MultiPartParser, FormParser
 from django.utils import timezone
-from .models import IntakeRecord, IntakeImage
-from .serializers import IntakeRecordSerializer, IntakeImageSerializer
+from .models import IntakeRecord
+from .serializers import IntakeRecordSerializer
 
 def _logical_today():
     now = timezone.localtime()
@@ -344,124 +328,135 @@ def _logical_today():
 
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
+from .authentication import CachedTokenAuthentication
 from rest_framework.response import Response
 from django.utils import timezone
 from django.conf import settings
 
-from .models import IntakeRecord, IntakeImage, CustomUser  # 모델 경로는 프로젝트 구조에 맞게
+from .models import IntakeRecord, CustomUser  # 모델 경로는 프로젝트 구조에 맞게
 from .serializers import UserInfoSerializer  # 이미 사용 중인 걸로 보임
+from .imaging import image_payload
+
+from django.core.exceptions import ValidationError
+
+from .uploads import start_upload, write_chunk, finalize_uploads, UploadError
+from .models import UploadSession
+
+
+def _upload_status(session):
+    return {
+        'upload_id': str(session.pk),
+        'filename': session.filename,
+        'size': session.size,
+        'offset': session.received,
+        'status': session.status,
+    }
+
+
+def _upload_error(e):
+    data = {'error': str(e)}
+    if e.offset is not None:
+        data['offset'] = e.offset
+    response = Response(data, status=e.status)
+    if e.offset is not None:
+        response['Upload-Offset'] = str(e.offset)
+    return response
 
-def _today_by_3am_rule():
-    now = timezone.localtime()
-    date = now.date()
-    if now.hour < 3:
-        # 새벽 3시 이전은 전날로 귀속
-        date = date - timezone.timedelta(days=1)
-    return date
 
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
-def image_analyze(request):
+def upload_init(request):
     """
-    이미지 업로드 전용(텍스트는 선택적 note)
-    - 프런트: images (여러개), note(옵션)
-    - 응답: ingested_count, images[], record
+    이어받기 업로드 시작
+    - 요청: {"filename": "meal.jpg", "size": 바이트 수}
+    - 응답: upload_id, offset(0), chunk_size(권장 청크 크기), upload_url
     """
-    user = request.user
-    files = request.FILES.getlist('images')
-    note = request.data.get('note', '').strip()
+    try:
+        size = int(request.data.get('size', 0))
+        session = start_upload(request.user, request.data.get('filename', ''), size)
+    except (TypeError, ValueError):
+        return Response({'error': 'size must be an integer.'}, status=400)
+    except UploadError as e:
+        return _upload_error(e)
 
-    if not files:
-        return Response({'error': 'No images uploaded.'}, status=400)
+    data = _upload_status(session)
+    data.update(chunk_size=settings.UPLOAD_CHUNK_SIZE, upload_url=reverse('upload-chunk', args=[session.pk]))
+    return Response(data, status=201)
 
-    diet_date = _today_by_3am_rule()
 
-    saved_images = []
-    for f in files:
-        obj = IntakeImage.objects.create(
-            user=user,
-            image=f,
-            note=note,
-            date=diet_date,
-        )
-        saved_images.append({
-            'id': obj.id,
-            'image': obj.image.url if hasattr(obj.image, 'url') else str(obj.image),
-            'note': obj.note,
-            'date': obj.date.isoformat(),
-            'created_at': obj.created_at.isoformat(),
-        })
+@api_view(['GET', 'PUT'])
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAuthenticated])
+def upload_chunk(request, upload_id):
+    """
+    GET: 받은 위치(offset) 조회 — 연결이 끊긴 뒤 이어서 보낼 위치 확인
+    PUT: 본문(application/octet-stream)을 Upload-Offset 헤더 위치에 이어서 기록
+    """
+    session = UploadSession.objects.filter(pk=upload_id, user=request.user).first()
+    if session is None:
+        return Response({'error': 'Upload not found.'}, status=404)
 
-    # 이미지 업로드 내역을 IntakeRecord에도 기록
-    record_text = f"[Image] {len(saved_images)} image(s) uploaded." + (f" Note: {note}" if note else "")
-    record = IntakeRecord.objects.create(
-        user=user,
-        content=record_text,
-        date=diet_date,
-    )
+    if request.method == 'PUT':
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return Response({'error': 'Upload-Offset and Content-Length headers are required.'}, status=400)
+        try:
+            # request.data를 거치지 않고 본문 스트림을 직접 읽음 (파서/메모리 버퍼링 없음)
+            session = write_chunk(session, offset, request.stream, length)
+        except UploadError as e:
+            return _upload_error(e)
+        metrics.UPLOAD_BYTES.inc(session.received - offset, kind='chunked')
+        if session.status == UploadSession.STATUS_COMPLETE:
+            metrics.UPLOAD_FILES.inc(kind='chunked')
 
-    return Response({
-        'ingested_count': len(saved_images),
-        'images': saved_images,
-        'record': {
-            'id': record.id,
-            'content': record.content,
-            'date': record.date.isoformat(),
-        }
-    }, status=200)
+    response = Response(_upload_status(session))
+    response['Upload-Offset'] = str(session.received)
+    return response
 
 
 @api_view(['POST'])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 @permission_classes([IsAuthenticated])
-def hybrid_analyze(request):
+def upload_finalize(request):
     """
-    하이브리드(텍스트 + 이미지)
-    - 프런트: images (0개 이상), text(옵션)
-    - 응답: images[], record
+    수신 완료된 업로드들을 기록 (image_analyze와 같은 응답 형식)
+    - 요청: {"upload_ids": [...], "note": "옵션"}
     """
-    user = request.user
-    files = request.FILES.getlist('images')
-    text = request.data.get('text', '').strip()
-    diet_date = _today_by_3am_rule()
-
-    saved_images = []
-    for f in files:
-        obj = IntakeImage.objects.create(
-            user=user,
-            image=f,
-            note=text,  # 하이브리드에서는 업로드 시 텍스트를 note로도 남김
-            date=diet_date,
-        )
-        saved_images.append({
-            'id': obj.id,
-            'image': obj.image.url if hasattr(obj.image, 'url') else str(obj.image),
-            'note': obj.note,
-            'date': obj.date.isoformat(),
-            'created_at': obj.created_at.isoformat(),
-        })
+    upload_ids = request.data.get('upload_ids')
+    if not isinstance(upload_ids, list) or not upload_ids:
+        return Response({'error': 'upload_ids must be a non-empty list.'}, status=400)
+    if len(upload_ids) > settings.UPLOAD_MAX_BATCH:
+        return Response({'error': f'Too many uploads (max {settings.UPLOAD_MAX_BATCH}).'}, status=400)
 
-    # 텍스트/이미지 내용을 IntakeRecord에 합쳐 기록
-    parts = []
-    if text:
-        parts.append(f"Text: {text}")
-    if saved_images:
-        parts.append(f"Images: {len(saved_images)} uploaded")
-    record_text = "[Hybrid] " + " | ".join(parts) if parts else "[Hybrid] (no content)"
-
-    record = IntakeRecord.objects.create(
-        user=user,
-        content=record_text,
-        date=diet_date,
-    )
+    try:
+        images, record = finalize_uploads(request.user, upload_ids, (request.data.get('note') or '').strip())
+    except UploadError as e:
+        return _upload_error(e)
+    except ValidationError:
+        return Response({'error': 'upload_ids must be UUIDs.'}, status=400)
 
     return Response({
-        'images': saved_images,
-        'record': {
+        'ingested_count': len(images),
+        'images': [image_payload(image) for image in images],
+        'record': record and {
             'id': record.id,
             'content': record.content,
             'date': record.date.isoformat(),
-        }
-    }, status=200)
\ No newline at end of file
+        },
+    }, status=200)
+
+
+from django.http import HttpResponse
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAdminUser
+
+
+@api_view(['GET'])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """Prometheus 수집용 지표 (staff 계정의 토큰 또는 admin 로그인 세션 필요)"""
+    return HttpResponse(metrics.registry.expose(), content_type='text/plain; version=0.0.4; charset=utf-8')
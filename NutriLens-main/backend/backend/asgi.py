@@ -0,0 +1,20 @@
+import os
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.exceptions import ImproperlyConfigured
+
+# ASGI에서는 영구 DB 연결(CONN_MAX_AGE > 0)을 쓰지 않음
+# - 동기 코드(sync_to_async)가 도는 스레드마다 연결이 따로 생기고(PRAGMA도 다시 실행),
+#   요청 종료 시 정리는 그 스레드의 연결에만 적용되어 나머지는 닫히지 않고 남음
+# - 그래서 DB_CONN_MAX_AGE=0이 기본, 다른 값으로 띄우면 시작할 때 거부
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+application = get_asgi_application()
+
+for alias, database in settings.DATABASES.items():
+    if database.get('CONN_MAX_AGE', 0) != 0:
+        raise ImproperlyConfigured(
+            f"DATABASES['{alias}']['CONN_MAX_AGE'] must be 0 under ASGI (persistent connections leak per thread)."
+        )
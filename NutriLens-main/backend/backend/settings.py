@@ -26,6 +26,7 @@ INSTALLED_APPS = [
 # --- 미들웨어 ---
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # CORS가 먼저 와야 함
+    'accounts.middleware.MetricsMiddleware',  # 요청/SQL 지표 (/metrics) — 나머지 미들웨어 시간까지 포함
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,21 +56,48 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+# ASGI 실행 (async 뷰가 GPT 응답을 기다리는 동안 스레드를 잡지 않음):
+#   uvicorn backend.asgi:application --workers 2
+#   gunicorn backend.asgi:application -k uvicorn.workers.UvicornWorker
+# ASGI에서는 영구 DB 연결을 쓰지 않음 (CONN_MAX_AGE=0, backend/asgi.py 참고)
+ASGI_APPLICATION = 'backend.asgi.application'
 
 # --- DB ---
+# backend.sqlite: 기본 sqlite3 + WAL/PRAGMA, atomic()은 BEGIN IMMEDIATE (PRAGMA 기본값은 backend/sqlite/base.py)
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'backend.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # WSGI 워커별 연결 재사용(초) — ASGI(backend/asgi.py)는 DB_CONN_MAX_AGE=0으로 요청마다 연결을 닫음
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# --- 캐시 ---
+# default: 프로세스별 (평가 결과/목록 개수 등 — 조금 늦게 반영돼도 되는 값)
+# auth: 토큰 인증 결과 — 로그아웃/비활성화가 모든 워커에 바로 반영되도록 프로세스 간 공유 필수
+#   (서버가 여러 대면 RedisCache 등으로 교체, LocMemCache면 system check 오류)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'auth': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'auth',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
 # --- 인증 관련 ---
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',  # TokenAuthentication + 인증 결과 캐시
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -105,3 +133,89 @@ CORS_ALLOW_ALL_ORIGINS = True
 from dotenv import load_dotenv
 load_dotenv(BASE_DIR / '.env_exam')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+
+# --- LLM 클라이언트 (accounts.llm) ---
+# 'openai' 또는 'fake'(네트워크 없이 고정 JSON 응답, 부하 테스트용)
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'openai')
+LLM_MODEL = 'gpt-3.5-turbo'
+LLM_TIMEOUT = 30.0          # 응답 대기(초)
+LLM_CONNECT_TIMEOUT = 5.0   # 연결(초)
+LLM_MAX_RETRIES = 3         # 429/5xx/네트워크 오류 재시도 횟수
+LLM_POOL_SIZE = 10          # 프로세스당 유지할 HTTP 연결 수
+LLM_ASYNC_POOL_SIZE = 100   # ASGI(async 뷰)에서 프로세스당 동시 연결 수 — httpx 설치 시
+LLM_FAKE_RESPONSE = None    # None이면 accounts.llm.FAKE_EVALUATION
+LLM_FAKE_LATENCY = float(os.getenv('LLM_FAKE_LATENCY', '0'))  # 가짜 백엔드 응답 지연(초)
+
+# --- 평가 작업 큐 (python manage.py run_eval_worker) ---
+EVAL_WORKER_POLL_INTERVAL = 1.0  # 대기열이 비었을 때 재조회 간격(초)
+EVAL_JOB_TIMEOUT = 300           # running 상태로 이 시간(초)을 넘기면 워커 장애로 보고 재시도
+EVAL_JOB_MAX_ATTEMPTS = 3
+
+# --- 같은 (사용자, 사업일자) 평가 단일 실행 (accounts.singleflight) ---
+EVAL_FLIGHT_LEASE = 180          # 실행권 유효 시간(초) — 넘기면 프로세스 장애로 보고 다른 요청이 이어받음
+EVAL_FLIGHT_WAIT_TIMEOUT = 90    # 앞선 평가를 기다리는 최대 시간(초)
+EVAL_FLIGHT_POLL_INTERVAL = 0.5  # 대기 중 재확인 간격(초)
+
+# --- 평가 결과 캐시 (python manage.py eval_cache 로 적중률 확인) ---
+EVAL_CACHE_ENABLED = True
+EVAL_CACHE_TTL = 7 * 24 * 60 * 60  # 초
+EVAL_CACHE_MAX_ENTRIES = 10000
+
+# --- 증분 평가: 마지막 평가 이후 추가된 기록만 GPT에 전송 ---
+EVAL_INCREMENTAL_ENABLED = True
+EVAL_INCREMENTAL_MAX_STEPS = 5  # 연속 증분 평가가 이 횟수에 도달하면 전체 재평가로 오차 누적 방지
+
+# --- 일괄 평가 (python manage.py evaluate_all) — OpenAI 계정 한도에 맞게 조정 ---
+EVAL_BULK_CONCURRENCY = 4
+EVAL_BULK_REQUESTS_PER_MINUTE = 500
+EVAL_BULK_TOKENS_PER_MINUTE = 150000
+
+# --- 평가 기록 목록 (history/ 커서 페이지네이션) ---
+HISTORY_PAGE_SIZE = 10
+HISTORY_MAX_PAGE_SIZE = 50
+HISTORY_TOTAL_CACHE_TTL = 300  # include_total=1 전체 개수 캐시(초)
+
+# --- 대시보드 주/월 요약 (dashboard/summary/, accounts.rollups) ---
+DASHBOARD_SUMMARY_PERIODS = 12      # 기본으로 돌려주는 기간 수
+DASHBOARD_SUMMARY_MAX_PERIODS = 60
+
+# --- 기록 일괄 업로드 (chat/batch/) ---
+INTAKE_BATCH_MAX_SIZE = 100
+INTAKE_BATCH_MAX_CLOCK_SKEW = 300  # 클라이언트 시각이 서버보다 이만큼(초) 넘게 미래면 거부
+
+# --- 업로드 이미지 파생본 (accounts.imaging, run_image_worker) ---
+IMAGE_DERIVATIVE_SIZES = {'thumb': 320, 'medium': 1280}  # 긴 변 기준 최대 px
+IMAGE_DERIVATIVE_FORMATS = ['webp', 'jpeg']
+IMAGE_DERIVATIVE_QUALITY = 80
+IMAGE_WORKER_PROCESSES = 2          # 디코딩/리사이즈 프로세스 수
+IMAGE_WORKER_BATCH_SIZE = 8
+IMAGE_WORKER_POLL_INTERVAL = 2.0    # 대기 중인 이미지가 없을 때 재조회 간격(초)
+IMAGE_WORKER_TIMEOUT = 300          # processing 상태로 이 시간(초)을 넘기면 다시 대기로
+
+# --- 이어받기(청크) 업로드 (accounts.uploads) ---
+UPLOAD_TEMP_DIR = BASE_DIR / 'upload_tmp'  # MEDIA_ROOT 밖 — 받는 중인 파일은 공개되지 않음
+UPLOAD_MAX_SIZE = 20 * 1024 * 1024         # 파일당 최대 크기(바이트)
+UPLOAD_CHUNK_SIZE = 1024 * 1024            # 클라이언트에 안내하는 권장 청크 크기
+UPLOAD_BUFFER_SIZE = 64 * 1024             # 본문을 읽어 디스크에 쓰는 단위
+UPLOAD_MAX_BATCH = 20                      # finalize 한 번에 기록할 최대 업로드 수
+UPLOAD_SESSION_TTL = 24 * 3600             # 이 시간(초) 동안 갱신이 없으면 cleanup_uploads가 삭제
+
+# --- 멀티파트 이미지 업로드 (image-analyze/, hybrid-analyze/) ---
+IMAGE_UPLOAD_WRITE_THREADS = 4  # 파일을 동시에 쓰는 스레드 수
+
+# --- 이미지 음식 인식 (accounts.recognition, run_image_worker에서 파생본 생성 후 실행) ---
+IMAGE_RECOGNITION_ENABLED = False
+IMAGE_RECOGNITION_MODEL = 'gpt-4o-mini'  # 이미지 입력을 지원하는 모델
+IMAGE_RECOGNITION_MAX_DISTANCE = 6       # pHash 해밍 거리가 이 값 이하면 같은 음식 사진으로 보고 결과 재사용 (최대 7)
+
+# --- 평가 프롬프트 (accounts.prompting) ---
+EVAL_PROMPT_MAX_TOKENS = 3000              # system + 프로필 + 기록 전체 상한 (넘치면 오래된 기록부터 생략)
+EVAL_PROMPT_MAX_LINE_TOKENS = 200          # 기록 한 줄 상한
+
+# --- 토큰 인증 (accounts.authentication) ---
+AUTH_TOKEN_CACHE_TTL = 60   # 토큰 → (사용자, 발급 시각) 캐시(초, 'auth' 캐시), 로그아웃/사용자 저장 시 즉시 삭제
+AUTH_TOKEN_TTL = None       # 토큰 유효 기간(초), None이면 만료 없음 (만료 후 로그인하면 새 토큰 발급)
+
+# --- 지표 (/metrics, accounts.metrics) ---
+METRICS_SLOW_REQUEST_MS = None         # 이 시간(ms)을 넘긴 요청을 SQL 내역과 함께 로그, None이면 끔
+METRICS_SLOW_REQUEST_TOP_QUERIES = 5   # 느린 요청 로그에 남길 SQL 수 (느린 순)
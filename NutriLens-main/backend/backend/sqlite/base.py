@@ -0,0 +1,44 @@
+"""
+SQLite DB 백엔드 (ENGINE 'backend.sqlite') — django.db.backends.sqlite3 + 운영용 설정
+- 연결할 때 PRAGMA 적용 (WAL, synchronous=NORMAL, busy_timeout, mmap, cache) — CONN_MAX_AGE로 연결을 재사용하면 한 번만
+- atomic()은 BEGIN IMMEDIATE: 시작할 때 쓰기 잠금을 잡고, 다른 쓰기가 있으면 busy_timeout 동안 기다림
+  (기본 BEGIN(DEFERRED)은 읽다가 쓰기로 올라갈 때 겹치면 기다리지 않고 바로 "database is locked")
+
+OPTIONS
+- pragmas: PRAGMAS에 덮어쓸 값 {'busy_timeout': 30000, ...}
+- transaction_mode: DEFERRED / IMMEDIATE(기본) / EXCLUSIVE
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    'journal_mode': 'WAL',  # 읽기와 쓰기가 서로 막지 않음 (DB 파일에 저장되는 설정)
+    'synchronous': 'NORMAL',  # WAL에서는 체크포인트 때만 fsync — 전원 장애 시 마지막 커밋 일부 손실 가능, 손상은 없음
+    'busy_timeout': 20000,  # ms
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -32000,  # 음수는 KiB (32MB)
+    'temp_store': 'MEMORY',
+}
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # sqlite3.connect 인자가 아닌 옵션은 빼서 보관
+        self.pragmas = {**PRAGMAS, **params.pop('pragmas', {})}
+        self.transaction_mode = params.pop('transaction_mode', 'IMMEDIATE').upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}, not {self.transaction_mode!r}."
+            )
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
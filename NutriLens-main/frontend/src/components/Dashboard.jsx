@@ -18,9 +18,9 @@ const Dashboard = () => {
 
   const fetchTodayHistory = async () => {
     try {
-      const res = await api.get('accounts/history/?page=1');
+      const res = await api.get('accounts/history/');
       const today = new Date().toISOString().split('T')[0];
-      const todayRecord = res.data.find((record) => record.date === today);
+      const todayRecord = res.data.results.find((record) => record.date === today);
       if (todayRecord) {
         setHistory(todayRecord);
       }
@@ -51,6 +51,42 @@ const TypewriterMessage = React.memo(({ text, messageId, onComplete }) => {
   );
 });
 
+// evaluate/stream/ (Server-Sent Events) 를 읽으면서 이벤트마다 onEvent(name, data) 호출
+// - macro/disease/goal 항목은 완성되는 즉시 도착, 마지막 done 이벤트가 전체 결과
+const streamEvaluation = async (onEvent) => {
+  const token = localStorage.getItem('token');
+  const res = await fetch(`${api.defaults.baseURL}accounts/evaluate/stream/`, {
+    method: 'POST',
+    headers: token ? { Authorization: `Token ${token}` } : {},
+  });
+  if (!res.ok || !res.body) throw new Error(`Evaluation failed (${res.status})`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result = null;
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let sep;
+    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      const event = block.match(/^event: (.*)$/m)?.[1];
+      const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] ?? 'null');
+      if (event === 'error') throw new Error(data?.detail || data?.error || 'Evaluation failed');
+      if (event === 'done') result = data;
+      onEvent(event, data);
+    }
+  }
+  if (!result) throw new Error('Evaluation stream ended early');
+  return result;
+};
+
+const CATEGORY_LABELS = { macro: 'Macro', disease: 'Disease', goal: 'Goal' };
+
 const FoodAnalyze = () => {
   const [mode, setMode] = useState('chat'); // 'chat', 'image', 'hybrid'
   const [input, setInput] = useState('');
@@ -155,24 +191,28 @@ const FoodAnalyze = () => {
       });
       
       try {
-        const res = await api.post('accounts/evaluate/');
-        setEvaluation(res.data);
-        
-        const evalText = 
-          `Today's evaluation score: ${res.data.grade}\n\n` +
-          `✅ Macro (${res.data.score_macro}/10): ${res.data.reason_macro}\n` +
-          `💡 Improvement Tips: ${res.data.advice_macro}\n\n` +
-          `✅ Disease (${res.data.score_disease}/10): ${res.data.reason_disease}\n` +
-          `💡 Improvement Tips: ${res.data.advice_disease}\n\n` +
-          `✅ Goal (${res.data.score_goal}/10): ${res.data.reason_goal}\n` +
-          `💡 Improvement Tips: ${res.data.advice_goal}`;
-        
-        addMessage('bot', evalText, true, true);
-        
+        // 항목별 결과가 도착하는 대로 표시 (첫 항목이 오면 로딩 창 닫기)
+        const data = await streamEvaluation((event, section) => {
+          if (!CATEGORY_LABELS[event]) return;
+          if (Swal.isVisible()) Swal.close();
+          const grams = event === 'macro' && section.carbs_g != null
+            ? `Carbs ${section.carbs_g}g, Protein ${section.protein_g}g, Fat ${section.fat_g}g\n`
+            : '';
+          addMessage(
+            'bot',
+            `✅ ${CATEGORY_LABELS[event]} (${section.score}/10): ${grams}${section.reason}\n` +
+            `💡 Improvement Tips: ${section.advice}`,
+            true,
+            true
+          );
+        });
+        setEvaluation(data);
+        addMessage('bot', `Today's evaluation score: ${data.grade}`, true, true);
+
         // Close loading and show success
         Swal.fire({
           title: 'Evaluation Complete!',
-          text: `Your daily nutrition score: ${res.data.grade}`,
+          text: `Your daily nutrition score: ${data.grade}`,
           icon: 'success',
           background: '#1a1a2e',
           color: '#ffffff',
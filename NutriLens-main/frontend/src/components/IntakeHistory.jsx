@@ -6,7 +6,7 @@ import './IntakeHistory.css';
 const IntakeHistory = () => {
   const [history, setHistory] = useState([]);
   const [expanded, setExpanded] = useState({});
-  const [page, setPage] = useState(1);
+  const [cursor, setCursor] = useState(null);
   const [hasMore, setHasMore] = useState(true);
   const [loading, setLoading] = useState(true);
   const [fetching, setFetching] = useState(false);
@@ -34,15 +34,12 @@ const IntakeHistory = () => {
     
     setFetching(true);
     try {
-      const res = await api.get(`accounts/history/?page=${page}`);
-      if (res.data.length === 0) {
+      const res = await api.get('accounts/history/', { params: cursor ? { cursor } : {} });
+      setHistory((prev) => [...prev, ...res.data.results]);
+      setCursor(res.data.next_cursor);
+      if (!res.data.has_more) {
         setHasMore(false);
-        setLoading(false);
-        setFetching(false);
-        return;
       }
-      setHistory((prev) => [...prev, ...res.data]);
-      setPage((prev) => prev + 1);
       setLoading(false);
     } catch (err) {
       console.error('Failed to load data', err);
@@ -3,6 +3,7 @@ import { Link, useNavigate, useLocation } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import Swal from 'sweetalert2';
 import Logo from '../assets/image/favicon.png';
+import api from '../api/axios';
 import './NavBar.css';
 
 const NavBar = () => {
@@ -32,6 +33,8 @@ const NavBar = () => {
     });
 
     if (result.isConfirmed) {
+      // 서버 토큰도 폐기 (실패해도 로컬 로그아웃은 진행)
+      await api.post('accounts/logout/').catch(() => {});
       localStorage.removeItem('token');
       localStorage.removeItem('user');
       